@@ -1,7 +1,13 @@
-import pandas as pd
+import os
+import sys
 
-df = pd.read_csv("C:/github/tennis_tracker/Analises/07_jul - Alan/S1-1_6.csv", sep=";", decimal=",", dtype={'event_code': str})
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "..", "video_tagger"))
+from event_query import EventStore
 
-df = df.groupby("point_id")["event_code"].count()
+store = EventStore.from_paths([os.path.join(HERE, "S1-1_6.csv")])
 
-print(df.sort_values().head(10))
\ No newline at end of file
+# Pontos com menos eventos marcados
+points = sorted(store.rows(), key=lambda row: row["event_count"])
+for row in points[:10]:
+    print(f"{row['point']:4d} {row['event_count']:3d}")
@@ -0,0 +1,39 @@
+"""
+Geradores de dados compartilhados pelos testes.
+"""
+import random
+import cv2
+
+
+def make_point(point_id, codes, frames):
+    """Monta um ponto no formato do analisador a partir dos códigos e frames dos eventos."""
+    events = [{"point_id": point_id, "event_code": code, "event_frame": frame, "event_timestamp_sec": frame / 30}
+              for code, frame in zip(codes, frames)]
+    return {"point_id": point_id, "server": codes[0], "events": events}
+
+
+def frame_count(path):
+    """Conta os frames de um vídeo decodificando-o inteiro."""
+    capture = cv2.VideoCapture(path)
+    count = 0
+    while capture.grab():
+        count += 1
+    capture.release()
+    return count
+
+
+def random_points(num_points, seed=7):
+    """Gera pontos no formato do analisador: sacador, golpes e W/E no final."""
+    rng = random.Random(seed)
+    points, frame = [], 0
+    for point_id in range(1, num_points + 1):
+        codes = [rng.choice("AB"), rng.choice("12")]
+        codes += [rng.choice("FBDMVS") for _ in range(rng.randint(0, 5))]
+        codes.append(rng.choice("WE"))
+        events = []
+        for code in codes:
+            frame += rng.randint(10, 60)
+            events.append({"point_id": point_id, "event_code": code,
+                           "event_frame": frame, "event_timestamp_sec": frame / 30})
+        points.append({"point_id": point_id, "server": codes[0], "events": events})
+    return points
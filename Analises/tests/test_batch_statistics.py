@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from batch_statistics import BatchStatistics, discover_matches, opponent_from_path
+
+MATCH_CSV = (
+    "point_id;event_code;event_frame;event_timestamp_sec\n"
+    "1;A;10;0,3\n1;1;20;0,6\n1;W;30;1,0\n"
+    "2;A;40;1,3\n2;2;50;1,6\n2;E;60;2,0\n"
+)
+
+
+class TestBatchStatistics(unittest.TestCase):
+    """
+    Testes do relatório consolidado de uma pasta de partidas.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        for folder, name, content in [("01_jul - Ana", "S1-6_0.csv", MATCH_CSV),
+                                      ("01_jul - Ana", "S2-6_0.csv", MATCH_CSV),
+                                      ("02_jul - Bia", "S1-6_0.csv", MATCH_CSV),
+                                      ("02_jul - Bia", "S2-0_6.csv", '"quebrado\n')]:
+            os.makedirs(os.path.join(self.root, folder), exist_ok=True)
+            with open(os.path.join(self.root, folder, name), "w", encoding="utf-8") as f:
+                f.write(content)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_discovery_and_opponent(self):
+        """Encontra os sets de cada pasta e o adversário pelo nome da pasta."""
+        paths = discover_matches(self.root)
+        self.assertEqual(len(paths), 4)
+        self.assertEqual(opponent_from_path(paths[0]), "Ana")
+
+    def test_corrupt_file_does_not_stop_run(self):
+        """Um arquivo corrompido é listado como erro e os demais são somados."""
+        batch = BatchStatistics(self.root, "Eu", workers=2)
+        batch.run()
+        self.assertEqual(len(batch.results), 3)
+        self.assertEqual(len(batch.errors), 1)
+
+        head_to_head = batch.head_to_head()
+        self.assertEqual(head_to_head["Ana"]["A"]["matches"], 2)
+        self.assertEqual(head_to_head["Ana"]["A"]["points_won"], 2)
+        self.assertEqual(head_to_head["Ana"]["B"]["points_won"], 2)
+        self.assertEqual(batch.career_totals()["Eu"]["total_points_played"], 6)
+        self.assertIn("ARQUIVOS IGNORADOS", batch.generate_report())
+
+
+if __name__ == "__main__":
+    unittest.main()
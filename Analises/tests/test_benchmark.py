@@ -0,0 +1,57 @@
+import json
+import tempfile
+import unittest
+from benchmark import DEFAULT_BASELINE, compare_to_baseline, run_benchmarks, synthetic_points
+
+
+class TestBenchmark(unittest.TestCase):
+    """
+    Testes da suíte de benchmarks (dados sintéticos e comparação com a linha de base).
+    """
+
+    def test_run_small(self):
+        """Todas as medições rodam com dados pequenos e dão valores positivos."""
+        with tempfile.TemporaryDirectory() as work_dir:
+            results = run_benchmarks(work_dir, num_points=320, num_frames=40, size=(160, 90),
+                                     num_seeks=5, repeat=1)
+        self.assertEqual(results["meta"]["points"], 320)
+        expected = {"render_loop_fps", "seek_p50_ms", "seek_p99_ms", "overlay_mean_ms", "csv_save_ms",
+                    "csv_load_ms", "score_lookup_us", "undo_us", "redo_us", "statistics_ms"}
+        self.assertTrue(expected <= set(results["metrics"]))
+        for metric in results["metrics"].values():
+            self.assertGreater(metric["value"], 0)
+            self.assertIn(metric["better"], ("higher", "lower"))
+
+        # A linha de base versionada cobre as mesmas métricas
+        with open(DEFAULT_BASELINE, encoding="utf-8") as f:
+            baseline = json.load(f)
+        self.assertEqual(set(baseline["metrics"]), set(results["metrics"]))
+
+    def test_synthetic_points_span_video(self):
+        points = synthetic_points(50, total_frames=3000)
+        frames = [e["event_frame"] for p in points for e in p["events"]]
+        self.assertEqual(frames, sorted(frames))
+        self.assertLess(frames[-1], 3000)
+        self.assertGreater(frames[-1], 2800)
+        self.assertTrue(all(p["events"][-1]["event_code"] in "WE" for p in points))
+
+    def test_compare_to_baseline(self):
+        """Só pioras acima do limite contam, no sentido de cada métrica."""
+        baseline = {"metrics": {
+            "render_loop_fps": {"value": 100.0, "unit": "fps", "better": "higher"},
+            "seek_p50_ms": {"value": 10.0, "unit": "ms", "better": "lower"},
+            "undo_us": {"value": 5.0, "unit": "us", "better": "lower"},
+        }}
+        results = {"metrics": {
+            "render_loop_fps": {"value": 70.0, "unit": "fps", "better": "higher"},
+            "seek_p50_ms": {"value": 11.0, "unit": "ms", "better": "lower"},
+            "undo_us": {"value": 2.0, "unit": "us", "better": "lower"},
+        }}
+        regressions = compare_to_baseline(results, baseline, threshold=0.2)
+        self.assertEqual([r["metric"] for r in regressions], ["render_loop_fps"])
+        self.assertAlmostEqual(regressions[0]["change"], -0.3)
+        self.assertEqual(compare_to_baseline(results, baseline, threshold=0.5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
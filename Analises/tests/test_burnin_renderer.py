@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from burnin_renderer import BurnInRenderer
+from helpers import frame_count, make_point
+
+
+class TestBurnInRenderer(unittest.TestCase):
+    """
+    Testes da renderização do placar sobre o vídeo, sem interface.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmp_dir.name, "jogo.mp4")
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (640, 360))
+        for _ in range(90):
+            writer.write(np.zeros((360, 640, 3), dtype=np.uint8))
+        writer.release()
+        # A ganha os dois primeiros pontos (15-0 no frame 30, 30-0 no frame 60)
+        self.points = [make_point(1, ["A", "1", "W"], [5, 20, 30]), make_point(2, ["A", "1", "W"], [40, 50, 60])]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _read_frames(self, path):
+        capture = cv2.VideoCapture(path)
+        frames = []
+        while True:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            frames.append(frame)
+        capture.release()
+        return frames
+
+    def test_scoreboard_follows_timeline(self):
+        """O placar muda nos frames em que os pontos terminam, e só neles."""
+        output = os.path.join(self.tmp_dir.name, "placar.mp4")
+        renderer = BurnInRenderer(self.video_path, self.points, {"A": "Alan", "B": "Bia"}, queue_frames=4)
+        stats = renderer.render(output)
+
+        self.assertNotIn("errors", stats)
+        self.assertEqual(stats["frames"], 90)
+        self.assertGreater(stats["fps"], 0)
+        self.assertEqual(frame_count(output), 90)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir.name, "placar.part.mp4")))
+
+        frames = self._read_frames(output)
+        # Região do placar (canto inferior esquerdo) desenhada em todos os frames
+        regions = [frame[-130:-20, 20:470].astype(np.int16) for frame in frames]
+        self.assertTrue(all(region.mean() > 20 for region in regions))
+
+        def changed(a, b):
+            # Pixels do texto que mudaram (o ruído da compressão é bem menor)
+            return np.count_nonzero(np.abs(regions[a] - regions[b]) > 60) > 100
+
+        self.assertFalse(changed(0, 29))
+        self.assertTrue(changed(29, 30))
+        self.assertFalse(changed(30, 59))
+        self.assertTrue(changed(59, 60))
+
+    def test_frame_range_and_scale(self):
+        """Intervalo de frames e escala do vídeo gerado."""
+        output = os.path.join(self.tmp_dir.name, "trecho.mp4")
+        renderer = BurnInRenderer(self.video_path, self.points, {"A": "Alan", "B": "Bia"}, scale_percent=50)
+        stats = renderer.render(output, start_frame=30, end_frame=60)
+        self.assertEqual(stats["frames"], 30)
+        capture = cv2.VideoCapture(output)
+        self.assertEqual((capture.get(cv2.CAP_PROP_FRAME_WIDTH), capture.get(cv2.CAP_PROP_FRAME_HEIGHT)), (320, 180))
+        capture.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
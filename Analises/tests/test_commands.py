@@ -0,0 +1,119 @@
+import random
+import unittest
+from app_state import AppState
+from commands import (Command, StartPointCommand, AddEventCommand, EndPointCommand,
+                      DeleteLastPointCommand, CommandHistory)
+
+
+def _event_info(code):
+    return {"code": code, "desc": code}
+
+
+class TestCommandHistory(unittest.TestCase):
+    """
+    Garante que desfazer/refazer em O(1) produz exatamente o mesmo estado que
+    recalcular a partida inteira do zero (o comportamento anterior).
+    """
+
+    def setUp(self):
+        self.rng = random.Random(42)
+        self.state = AppState("Player A", "Player B", total_frames=10**7)
+        self.history = CommandHistory(self.state)
+
+    def _play_point(self):
+        """Marca um ponto completo com golpes aleatórios."""
+        self.state.current_frame_num += 30
+        self.history.execute(StartPointCommand(self.state, _event_info(self.rng.choice("AB"))))
+        for _ in range(self.rng.randint(1, 6)):
+            self.state.current_frame_num += 15
+            self.history.execute(AddEventCommand(self.state, _event_info(self.rng.choice("12FBDMVS"))))
+        self.state.current_frame_num += 15
+        self.history.execute(EndPointCommand(self.state, _event_info(self.rng.choice("WE"))))
+
+    def _signature(self, state):
+        """Resumo comparável de todo o estado relevante da sessão."""
+        current = state.current_point_data
+        return (
+            state.game.snapshot(),
+            tuple(state.score_timeline.frames),
+            tuple(state.score_timeline.snapshots),
+            tuple((p["point_id"], len(p["events"])) for p in state.all_points_data),
+            (current["point_id"], len(current["events"])) if current else None,
+            state.current_state,
+            state.current_player,
+            state.point_counter,
+        )
+
+    def _replayed_signature(self):
+        """Estado obtido recalculando a partida do zero a partir dos pontos."""
+        reference = AppState("Player A", "Player B", total_frames=10**7)
+        reference.all_points_data = list(self.state.all_points_data)
+        reference.rebuild_history()
+        reference.point_counter = self.state.point_counter
+        reference.current_point_data = self.state.current_point_data
+        reference.current_state = self.state.current_state
+        reference.current_player = self.state.current_player
+        return self._signature(reference)
+
+    def test_delete_last_point_matches_full_replay(self):
+        """Apagar pontos restaura o placar igual ao recálculo completo."""
+        for _ in range(80):
+            self._play_point()
+        for _ in range(30):
+            self.history.execute(DeleteLastPointCommand(self.state))
+            self.assertEqual(self._signature(self.state), self._replayed_signature())
+
+    def test_undo_redo_round_trip(self):
+        """Desfazer tudo e refazer tudo volta exatamente ao mesmo estado."""
+        signatures = [self._signature(self.state)]
+        for _ in range(40):
+            self._play_point()
+        self.history.execute(DeleteLastPointCommand(self.state))
+        final = self._signature(self.state)
+
+        steps = 0
+        while self.history.undo():
+            steps += 1
+            self.assertEqual(self._signature(self.state), self._replayed_signature())
+        self.assertEqual(self._signature(self.state), signatures[0])
+
+        for _ in range(steps):
+            self.assertTrue(self.history.redo())
+        self.assertEqual(self._signature(self.state), final)
+
+    def test_undo_event_and_cancelled_point(self):
+        """Desfaz o último golpe e o cancelamento de um ponto em andamento."""
+        self._play_point()
+        self.history.execute(StartPointCommand(self.state, _event_info("A")))
+        self.history.execute(AddEventCommand(self.state, _event_info("1")))
+        before = self._signature(self.state)
+
+        self.history.undo()
+        self.assertEqual(len(self.state.current_point_data["events"]), 1)
+        self.history.redo()
+        self.assertEqual(self._signature(self.state), before)
+
+        self.history.execute(DeleteLastPointCommand(self.state))
+        self.assertEqual(self.state.current_state, "IDLE")
+        self.history.undo()
+        self.assertEqual(self._signature(self.state), before)
+
+    def test_new_command_clears_redo(self):
+        """Executar um novo comando descarta o que poderia ser refeito."""
+        self._play_point()
+        self.history.undo()
+        self.history.execute(EndPointCommand(self.state, _event_info("E")))
+        self.assertFalse(self.history.redo())
+
+    def test_command_requires_undo(self):
+        """Um comando sem undo() falha ao ser criado, e não no meio de um desfazer."""
+        class NoUndoCommand(Command):
+            def execute(self):
+                return True
+
+        with self.assertRaises(TypeError):
+            NoUndoCommand(self.state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from csv_handler import CSVHandler
+
+
+class TestCSVHandler(unittest.TestCase):
+    """
+    Testes do leitor/gravador de CSV da sessão (separador ';', decimal ',').
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "sessao.csv")
+        self.handler = CSVHandler(self.csv_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, text):
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_round_trip(self):
+        """Gravar e ler de volta preserva pontos, códigos e timestamps exatos."""
+        points = [
+            {"point_id": 1, "server": "A", "events": [
+                {"point_id": 1, "event_code": "A", "event_frame": 416, "event_timestamp_sec": 13.86925620185472},
+                {"point_id": 1, "event_code": "1", "event_frame": 747, "event_timestamp_sec": 24.904649958618933},
+                {"point_id": 1, "event_code": "W", "event_frame": 810, "event_timestamp_sec": 27.0},
+            ]},
+            {"point_id": 2, "server": "B", "events": [
+                {"point_id": 2, "event_code": "B", "event_frame": 1435, "event_timestamp_sec": 47.842},
+            ]},
+        ]
+        self.assertTrue(self.handler.save_csv(points))
+        with open(self.csv_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "point_id;event_code;event_frame;event_timestamp_sec")
+        self.assertEqual(lines[1], "1;A;416;13,86925620185472")
+        self.assertEqual(self.handler.load_csv(), points)
+
+    def test_legacy_columns(self):
+        """CSVs antigos com colunas extras continuam sendo lidos."""
+        self._write(
+            "point_id;server;point_start_time_sec;event_timestamp_sec;event_frame;event_code;event_description\n"
+            "2;B;32,03;38,5;1141;2;2nd Serve\n"
+            "1;A;11,86;15,86;476;1;1st Serve\n"
+            "1;A;11,86;18,2;546;W;Winner\n"
+        )
+        points = self.handler.load_csv()
+        self.assertEqual([p["point_id"] for p in points], [1, 2])
+        event = points[0]["events"][1]
+        self.assertEqual(event["event_code"], "W")
+        self.assertEqual(event["event_frame"], 546)
+        self.assertEqual(event["event_timestamp_sec"], 18.2)
+        self.assertEqual(event["event_description"], "Winner")
+
+    def test_rows_without_point_id_are_skipped(self):
+        """Linhas sem point_id (ou com valores inválidos) são ignoradas sem descartar os demais pontos."""
+        self._write(
+            "point_id;event_code;event_frame;event_timestamp_sec\n"
+            "1;A;10;0,3\n"
+            ";1;20;0,6\n"
+            "1;W;30;1\n"
+            "x;B;40;1,3\n"
+            "2;B;50;1,6\n"
+        )
+        points = self.handler.load_csv()
+        self.assertEqual([(p["point_id"], [e["event_code"] for e in p["events"]]) for p in points],
+                         [(1, ["A", "W"]), (2, ["B"])])
+
+    def test_missing_or_empty_file(self):
+        """Arquivo inexistente ou só com cabeçalho resulta em nenhum ponto."""
+        self.assertEqual(self.handler.load_csv(), [])
+        self._write("point_id;event_code;event_frame;event_timestamp_sec\n")
+        self.assertEqual(self.handler.load_csv(), [])
+        self.assertFalse(self.handler.save_csv([]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import cv2
+import numpy as np
+from display_pipeline import DisplayPipeline
+
+
+class TestDisplayPipeline(unittest.TestCase):
+    """
+    A pipeline de exibição escreve sempre no mesmo buffer e produz o mesmo
+    resultado que redimensionar e inverter em novos arrays.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.frames = [rng.integers(0, 256, (90, 160, 3), dtype=np.uint8) for _ in range(20)]
+
+    def _reference(self, frame, size, flip_code):
+        out = cv2.resize(frame, size, interpolation=cv2.INTER_AREA) if size != (frame.shape[1], frame.shape[0]) else frame.copy()
+        return cv2.flip(out, flip_code) if flip_code is not None else out
+
+    def test_single_allocation_and_output(self):
+        for scale, flip_code in ((60, 1), (100, 0), (50, None)):
+            pipeline = DisplayPipeline(scale, flip_code)
+            size = (int(160 * scale / 100), int(90 * scale / 100)) if scale < 100 else (160, 90)
+            buffers = set()
+            for frame in self.frames:
+                original = frame.copy()
+                out = pipeline.process(frame)
+                buffers.add(id(out))
+                np.testing.assert_array_equal(out, self._reference(frame, size, flip_code))
+                # O frame de origem não é alterado
+                np.testing.assert_array_equal(frame, original)
+            stats = pipeline.get_stats()
+            self.assertEqual(stats["allocations"], 1)
+            self.assertEqual(stats["frames"], 20)
+            self.assertEqual(len(buffers), 1)
+
+    def test_source_size(self):
+        """Frames já reduzidos (ex.: do proxy) na escala final são só copiados."""
+        pipeline = DisplayPipeline(50, None, source_size=(320, 180))
+        out = pipeline.process(self.frames[0])
+        np.testing.assert_array_equal(out, self.frames[0])
+        out = pipeline.process(np.zeros((180, 320, 3), dtype=np.uint8))
+        self.assertEqual(out.shape, (90, 160, 3))
+        self.assertEqual(pipeline.get_stats()["allocations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
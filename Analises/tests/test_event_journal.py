@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from csv_handler import CSVHandler
+from event_journal import EventJournal
+from helpers import make_point
+
+
+class TestEventJournal(unittest.TestCase):
+    """
+    Testes do diário de eventos usado na recuperação após quedas.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_handler = CSVHandler(os.path.join(self.tmp_dir.name, "sessao_analisado.csv"))
+        # CSV já compactado com dois pontos
+        self.csv_points = [make_point(1, ["A", "1", "W"], [10, 20, 30]), make_point(2, ["B", "2", "F", "E"], [40, 50, 60, 70])]
+        self.csv_handler.save_csv(self.csv_points)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _journal(self):
+        return EventJournal(self.csv_handler, batch_size=2, compact_every=2)
+
+    def _record_session(self, journal):
+        """Ponto 3 completo, ponto 2 apagado e ponto 4 em andamento com um evento desfeito."""
+        point_3 = make_point(3, ["A", "1", "B", "W"], [80, 90, 100, 110])
+        for event in point_3["events"]:
+            journal.record_event(3, event)
+        journal.record_point(point_3)
+        journal.record_delete(2)
+        point_4 = make_point(4, ["B", "1", "F"], [120, 130, 140])
+        for event in point_4["events"]:
+            journal.record_event(4, event)
+        journal.record_pop_event(4)
+        return point_3
+
+    def _summary(self, points, current):
+        return ([(p["point_id"], [e["event_code"] for e in p["events"]]) for p in points],
+                [e["event_code"] for e in current["events"]] if current else None)
+
+    def test_replay_over_csv(self):
+        """Eventos, fim de ponto, ponto apagado e evento desfeito são reaplicados sobre o CSV."""
+        journal = self._journal()
+        self.assertFalse(journal.has_records())
+        self._record_session(journal)
+        journal.close()
+
+        recovered = self._journal()
+        self.assertTrue(recovered.has_records())
+        points, current = recovered.replay(self.csv_handler.load_csv())
+        self.assertEqual(self._summary(points, current),
+                         ([(1, ["A", "1", "W"]), (3, ["A", "1", "B", "W"])], ["B", "1"]))
+
+    def test_replay_is_idempotent(self):
+        """Reaplicar o diário sobre o resultado de uma reaplicação não muda nada."""
+        journal = self._journal()
+        self._record_session(journal)
+        journal.close()
+
+        first = journal.replay(self.csv_handler.load_csv())
+        second = journal.replay(first[0])
+        self.assertEqual(self._summary(*first), self._summary(*second))
+
+    def test_reopen_point(self):
+        """Desfazer o fim de um ponto o devolve ao estado em andamento."""
+        journal = self._journal()
+        point_3 = self._record_session(journal)
+        reopened = dict(point_3, events=point_3["events"][:-1])
+        journal.record_delete(4)
+        journal.record_reopen(reopened)
+        journal.close()
+        points, current = journal.replay(self.csv_handler.load_csv())
+        self.assertEqual(self._summary(points, current), ([(1, ["A", "1", "W"])], ["A", "1", "B"]))
+
+    def test_torn_last_line(self):
+        """Uma última linha incompleta (queda durante a escrita) é ignorada."""
+        journal = self._journal()
+        self._record_session(journal)
+        journal.close()
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"op": "point", "point": {"point_id": 4, "eve')
+
+        points, current = self._journal().replay(self.csv_handler.load_csv())
+        self.assertEqual(self._summary(points, current),
+                         ([(1, ["A", "1", "W"]), (3, ["A", "1", "B", "W"])], ["B", "1"]))
+
+    def test_compaction(self):
+        """A compactação grava o CSV, descarta o diário incorporado e mantém o ponto em andamento."""
+        journal = self._journal()
+        point_3 = self._record_session(journal)
+        self.assertFalse(journal.should_compact())
+        journal.record_point(make_point(5, ["A", "2", "E"], [150, 160, 170]))
+        self.assertTrue(journal.should_compact())
+
+        all_points = [self.csv_points[0], point_3, make_point(5, ["A", "2", "E"], [150, 160, 170])]
+        current = make_point(4, ["B", "1"], [120, 130])
+        journal.compact(all_points, current, background=False)
+        self.assertFalse(os.path.exists(journal.old_path))
+        self.assertFalse(journal.should_compact())
+        journal.close()
+
+        self.assertEqual([p["point_id"] for p in self.csv_handler.load_csv()], [1, 3, 5])
+        points, recovered_current = self._journal().replay(self.csv_handler.load_csv())
+        self.assertEqual(self._summary(points, recovered_current),
+                         ([(1, ["A", "1", "W"]), (3, ["A", "1", "B", "W"]), (5, ["A", "2", "E"])], ["B", "1"]))
+
+    def test_interrupted_compaction_concatenates_old_journal(self):
+        """Se a compactação anterior não terminou, o .old é mantido e o novo diário é concatenado a ele."""
+        journal = self._journal()
+        self._record_session(journal)
+        # Rotação sem a gravação do CSV (queda durante a compactação)
+        journal._rotate()
+        journal.record_event(4, make_point(4, ["F"], [145])["events"][0])
+        journal._rotate()
+        journal.record_delete(1)
+        journal.close()
+
+        self.assertTrue(os.path.exists(journal.old_path))
+        with open(journal.old_path, encoding="utf-8") as f:
+            ops = [line.split('"op": "')[1].split('"')[0] for line in f]
+        self.assertEqual(ops, ["event"] * 4 + ["point", "delete"] + ["event"] * 3 + ["pop_event", "event"])
+
+        points, current = self._journal().replay(self.csv_handler.load_csv())
+        self.assertEqual(self._summary(points, current), ([(3, ["A", "1", "B", "W"])], ["B", "1", "F"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
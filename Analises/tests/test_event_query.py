@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from csv_handler import CSVHandler
+from event_query import EventStore
+from helpers import random_points
+
+
+class TestEventStore(unittest.TestCase):
+    """
+    Testes da base de consultas indexada sobre os pontos marcados.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.points = {}
+        for i, player in enumerate(["Ana", "Bia", "Ana"]):
+            folder = os.path.join(cls.tmp_dir.name, f"0{i}_jul - {player}")
+            os.makedirs(folder)
+            points = random_points(80, seed=i)
+            CSVHandler(os.path.join(folder, "S1.csv")).save_csv(points)
+            cls.points[(player, i)] = points
+        cls.store = EventStore.load(cls.tmp_dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def _brute_force(self, player=None, serve_type=None):
+        """Mesma consulta percorrendo os pontos um a um."""
+        lengths = {}
+        for (name, _), points in self.points.items():
+            if player is not None and name != player:
+                continue
+            for point in points:
+                codes = [e["event_code"] for e in point["events"]]
+                if serve_type is not None and codes[1] != serve_type:
+                    continue
+                lengths[len(codes) - 2] = lengths.get(len(codes) - 2, 0) + 1
+        return lengths
+
+    def test_distribution_matches_brute_force(self):
+        """Distribuição do número de golpes no 2º saque, geral e por adversário."""
+        self.assertEqual(len(self.store), 240)
+        self.assertEqual(self.store.distribution("strokes", serve_type="2"),
+                         self._brute_force(serve_type="2"))
+        self.assertEqual(self.store.distribution("strokes", player="Ana", serve_type="2"),
+                         self._brute_force(player="Ana", serve_type="2"))
+
+    def test_filters_and_cache(self):
+        """Filtros combinados, listas de valores e reaproveitamento do cache."""
+        both = self.store.count(final_stroke=["F", "B"], outcome="W")
+        self.assertEqual(both, self.store.count(final_stroke="F", outcome="W") +
+                         self.store.count(final_stroke="B", outcome="W"))
+        self.assertEqual(self.store.count(player="Ninguém"), 0)
+        self.assertEqual(self.store.count(player=[]), 0)
+        self.assertEqual(self.store.distribution("strokes", final_stroke=set(), outcome="W"), {})
+        self.assertIs(self.store.select(player="Bia", server="A"), self.store.select(server="A", player="Bia"))
+        for row in self.store.rows(player="Bia", winner="B"):
+            self.assertEqual((row["player"], row["winner"]), ("Bia", "B"))
+        with self.assertRaises(KeyError):
+            self.store.select(event_frame=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from frame_cache import FrameReplayBuffer
+from video_stream import VideoStream
+
+FRAME_SHAPE = (48, 64, 3)
+FRAME_MB = np.prod(FRAME_SHAPE) / (1024 * 1024)
+
+
+def _frame(value):
+    return np.full(FRAME_SHAPE, value, dtype=np.uint8)
+
+
+class TestFrameReplayBuffer(unittest.TestCase):
+    """
+    Testes do buffer de replay (frames recentes guardados em RAM).
+    """
+
+    def test_memory_budget_eviction(self):
+        """Com o limite em MB atingido, os frames mais antigos dão lugar aos novos."""
+        buffer = FrameReplayBuffer(max_mb=5 * FRAME_MB)
+        for i in range(10):
+            buffer.put(i, _frame(i))
+        self.assertEqual(buffer.capacity, 5)
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual([i for i in range(10) if i in buffer], [5, 6, 7, 8, 9])
+        stats = buffer.get_stats()
+        self.assertAlmostEqual(stats["memory_mb"], 5 * FRAME_MB)
+        self.assertEqual(buffer.get(7)[0, 0, 0], 7)
+
+    def test_seconds_limit(self):
+        buffer = FrameReplayBuffer(max_mb=100, max_seconds=0.1, fps=30)
+        for i in range(10):
+            buffer.put(i, _frame(i))
+        self.assertEqual([i for i in range(10) if i in buffer], [7, 8, 9])
+        with self.assertRaises(ValueError):
+            FrameReplayBuffer()
+
+    def test_hits_misses_and_copy_on_put(self):
+        """O buffer guarda uma cópia e contabiliza acertos e falhas."""
+        buffer = FrameReplayBuffer(max_mb=10 * FRAME_MB)
+        source = _frame(1)
+        buffer.put(0, source)
+        source[:] = 99
+        self.assertEqual(buffer.get(0)[0, 0, 0], 1)
+        self.assertIsNone(buffer.get(1))
+        self.assertIsNone(buffer.get(2))
+        stats = buffer.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertAlmostEqual(stats["hit_rate"], 1 / 3)
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+
+
+class TestReplayThroughVideoStream(unittest.TestCase):
+    """
+    Saltos para trás servidos pelo buffer de replay do VideoStream.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmp_dir.name, "jogo.mp4")
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+        for i in range(60):
+            writer.write(_frame((i // 10) * 40))
+        writer.release()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_at_frame_returns_copy(self):
+        """O frame vindo do buffer é uma cópia: não muda quando o anel é sobrescrito."""
+        stream = VideoStream(self.video_path, replay_buffer_mb=8 * FRAME_MB)
+        for _ in range(20):
+            stream.read_sequential()
+        buffer = stream.replay_buffer
+        misses = buffer.misses
+
+        ret, frame = stream.read_at_frame(15)
+        self.assertTrue(ret)
+        self.assertEqual(buffer.hits, 1)
+        self.assertEqual(buffer.misses, misses)
+        cached = buffer.get(15)
+        self.assertFalse(np.shares_memory(frame, cached))
+        np.testing.assert_array_equal(frame, cached)
+
+        expected = frame.copy()
+        for _ in range(30):
+            stream.read_sequential()
+        self.assertNotIn(15, buffer)
+        np.testing.assert_array_equal(frame, expected)
+
+        # Fora do buffer: decodificado de novo (falha contabilizada)
+        ret, frame = stream.read_at_frame(2)
+        self.assertTrue(ret)
+        self.assertEqual(buffer.misses, misses + 1)
+        self.assertAlmostEqual(frame.mean(), 0, delta=6)
+        stream.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from frame_index import FrameIndex
+
+
+class TestFrameIndex(unittest.TestCase):
+    """
+    Testes do índice de frames (keyframes, timestamps e arquivo ao lado do vídeo).
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmp_dir.name, "jogo.mp4")
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+        for i in range(45):
+            writer.write(np.full((48, 64, 3), i * 5, dtype=np.uint8))
+        writer.release()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_keyframe_before(self):
+        index = FrameIndex(np.arange(40) / 30, [0, 12, 24])
+        self.assertEqual([index.keyframe_before(f) for f in (0, 11, 12, 23, 24, 39, 500)],
+                         [0, 0, 12, 12, 24, 24, 24])
+        # Sem keyframes (índice do OpenCV), a busca começa do início
+        self.assertEqual(FrameIndex(np.arange(40) / 30, []).keyframe_before(30), 0)
+
+    def test_timestamps(self):
+        """PTS reais, limitados ao intervalo do vídeo."""
+        pts = np.array([0.0, 0.04, 0.07, 0.11])
+        index = FrameIndex(pts, [0])
+        self.assertEqual(index.frame_count, 4)
+        self.assertAlmostEqual(index.timestamp(2), 0.07)
+        self.assertAlmostEqual(index.timestamp(-3), 0.0)
+        self.assertAlmostEqual(index.timestamp(99), 0.11)
+
+    def test_opencv_fallback(self):
+        """Sem ffprobe, o vídeo é percorrido com grab: contagem e timestamps exatos, sem keyframes."""
+        index = FrameIndex._build_with_opencv(self.video_path)
+        self.assertEqual(index.frame_count, 45)
+        self.assertEqual(len(index.keyframes), 0)
+        np.testing.assert_allclose(index.pts, np.arange(45) / 30, atol=1e-3)
+
+    def test_sidecar_invalidation(self):
+        """O índice salvo só vale enquanto tamanho e data de modificação do vídeo não mudam."""
+        self.assertIsNone(FrameIndex.load(self.video_path))
+        FrameIndex(np.arange(45) / 30, [0, 12, 24, 36]).save(self.video_path)
+        self.assertTrue(os.path.exists(FrameIndex.sidecar_path(self.video_path)))
+        loaded = FrameIndex.load(self.video_path)
+        self.assertEqual(loaded.frame_count, 45)
+        np.testing.assert_array_equal(loaded.keyframes, [0, 12, 24, 36])
+
+        stat = os.stat(self.video_path)
+        os.utime(self.video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(FrameIndex.load(self.video_path))
+
+        # Mesmo mtime, tamanho diferente
+        os.utime(self.video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNotNone(FrameIndex.load(self.video_path))
+        with open(self.video_path, "ab") as f:
+            f.write(b"\0" * 16)
+        os.utime(self.video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(FrameIndex.load(self.video_path))
+
+    def test_corrupt_sidecar(self):
+        with open(FrameIndex.sidecar_path(self.video_path), "wb") as f:
+            f.write(b"not an npz")
+        self.assertIsNone(FrameIndex.load(self.video_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
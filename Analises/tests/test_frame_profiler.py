@@ -0,0 +1,80 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from frame_profiler import FrameProfiler, STAGES
+from ui_handler import UIHandler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms / 1000
+
+
+class TestFrameProfiler(unittest.TestCase):
+    """
+    Testes da instrumentação do laço de exibição, com um relógio controlado.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.tmp_dir.name, "perfil.jsonl")
+        self.clock = FakeClock()
+        patcher = mock.patch("frame_profiler.time.perf_counter", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _frame(self, profiler, frame_num, playing, **stage_ms):
+        profiler.start_frame()
+        for stage in STAGES:
+            self.clock.advance(stage_ms.get(stage, 0))
+            profiler.mark(stage)
+        profiler.end_frame(frame_num, playing)
+
+    def test_counters_and_trace(self):
+        """Atrasos só contam na reprodução e ignoram a espera por tecla."""
+        profiler = FrameProfiler(fps=50, window=2, trace_path=self.trace_path)
+        self._frame(profiler, 10, True, decode=5, overlay=30, input=10)   # 35 ms > 20 ms: atrasado
+        self._frame(profiler, 11, True, decode=4, imshow=6, input=90)     # 10 ms de trabalho
+        self._frame(profiler, 11, False, score=50, input=500)             # pausado
+        self._frame(profiler, 12, True, resize=45)                        # 45 ms: 2 períodos
+        profiler.close()
+
+        summary = profiler.summary()
+        self.assertEqual((summary["frames"], summary["window"]), (4, 2))
+        self.assertEqual((summary["late_frames"], summary["dropped_frames"]), (2, 3))
+        self.assertAlmostEqual(summary["stages"]["score"]["mean_ms"], 25)
+        self.assertAlmostEqual(summary["work_mean_ms"], 47.5)
+        self.assertEqual(sum(summary["stages"]["input"]["histogram"]), 2)
+
+        with open(self.trace_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["frame"] for r in records], [10, 11, 11, 12])
+        self.assertEqual([r["late"] for r in records], [True, False, False, True])
+        self.assertAlmostEqual(records[0]["stages"]["overlay"], 30)
+        self.assertAlmostEqual(records[1]["work_ms"], 10)
+
+    def test_panel(self):
+        profiler = FrameProfiler(fps=30)
+        ui_handler = UIHandler()
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        ui_handler.draw_profiler_panel(frame, profiler)
+        self._frame(profiler, 0, True, decode=8, overlay=3, input=20)
+        ui_handler.draw_profiler_panel(frame, profiler, refresh_frames=1)
+        self.assertGreater(np.count_nonzero(frame[160:, :400]), 500)
+        self.assertEqual(frame[:150].max(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
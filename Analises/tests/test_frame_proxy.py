@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from frame_proxy import FrameProxy, ProxyBuilder
+from video_stream import VideoStream
+
+FRAME_MB = 32 * 24 * 3 / (1024 * 1024)
+
+
+class TestFrameProxy(unittest.TestCase):
+    """
+    Testes do proxy de frames mapeado em memória e do seu uso no VideoStream.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmp_dir.name, "jogo.mp4")
+        # Vídeo sintético: o brilho muda a cada 10 frames
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+        for i in range(100):
+            writer.write(np.full((48, 64, 3), (i // 10) * 25, dtype=np.uint8))
+        writer.release()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_budget_keeps_point_regions(self):
+        """Com o disco cheio, os frames em torno dos pontos substituem os demais."""
+        proxy = FrameProxy(self.video_path, (32, 24), 100, max_mb=30 * FRAME_MB, margin_frames=2)
+        self.assertEqual(proxy.capacity, 30)
+        proxy.set_protected_ranges([(70, 80)])
+        builder = ProxyBuilder(self.video_path, proxy)
+        builder.build()
+
+        self.assertTrue(proxy.complete)
+        self.assertEqual(builder.progress, 1.0)
+        self.assertEqual(len(proxy), 30)
+        self.assertTrue(all(frame in proxy for frame in range(68, 83)))
+        self.assertEqual(sum(frame in proxy for frame in range(30)), 15)
+        self.assertFalse(any(frame in proxy for frame in range(30, 68)))
+        self.assertAlmostEqual(proxy.get(75).mean(), 7 * 25, delta=6)
+        self.assertIsNone(proxy.get(50))
+        proxy.flush()
+
+        # Reaberto na sessão seguinte: nada é refeito
+        reopened = FrameProxy(self.video_path, (32, 24), 100, max_mb=30 * FRAME_MB, margin_frames=2)
+        self.assertTrue(reopened.complete)
+        self.assertEqual(len(reopened), 30)
+        np.testing.assert_array_equal(reopened.get(70), proxy.get(70))
+        # Outra escala (ou outro orçamento) invalida o proxy
+        self.assertFalse(FrameProxy(self.video_path, (16, 12), 100, max_mb=30 * FRAME_MB).complete)
+
+    def test_video_stream_reads_from_proxy(self):
+        """Buscas e leitura sequencial saem do proxy; frames ausentes são decodificados."""
+        for threaded in (False, True):
+            stream = VideoStream(self.video_path, threaded=threaded, proxy_mb=40 * FRAME_MB, proxy_scale_percent=50)
+            self.assertFalse(stream.proxy_builder.is_alive())
+            stream.set_protected_ranges([])
+            self.assertTrue(stream.proxy_builder.idle.wait(10))
+            self.assertEqual(len(stream.proxy), 40)
+
+            ret, frame = stream.read_at_frame(25)
+            self.assertTrue(ret)
+            self.assertEqual(frame.shape, (24, 32, 3))
+            self.assertAlmostEqual(frame.mean(), 2 * 25, delta=6)
+            ret, frame = stream.read_at_frame(5)
+            self.assertEqual(frame.shape, (24, 32, 3))
+
+            shapes = []
+            for _ in range(40):
+                ret, frame = stream.read_sequential()
+                shapes.append(frame.shape)
+            self.assertEqual(shapes[:34], [(24, 32, 3)] * 34)
+            self.assertEqual(shapes[34:], [(48, 64, 3)] * 6)
+            self.assertEqual(stream.next_frame, 46)
+            self.assertAlmostEqual(frame.mean(), 4 * 25, delta=6)
+            stream.stop()
+            for path in (FrameProxy.sidecar_path(self.video_path), f"{self.video_path}.proxy.json"):
+                os.remove(path)
+
+    def test_new_points_are_proxied_after_scan(self):
+        """Pontos marcados depois da passada completa ainda são guardados, substituindo frames fora dos pontos."""
+        stream = VideoStream(self.video_path, proxy_mb=30 * FRAME_MB, proxy_scale_percent=50, proxy_margin_sec=0)
+        stream.set_protected_ranges([(70, 80)])
+        self.assertTrue(stream.proxy_builder.idle.wait(10))
+        proxy = stream.proxy
+        self.assertTrue(proxy.complete)
+        self.assertTrue(all(frame in proxy for frame in range(70, 81)))
+        self.assertFalse(any(frame in proxy for frame in range(40, 45)))
+
+        stream.set_protected_ranges([(40, 44), (70, 80)])
+        self.assertTrue(stream.proxy_builder.idle.wait(10))
+        self.assertTrue(all(frame in proxy for frame in list(range(40, 45)) + list(range(70, 81))))
+        self.assertEqual(len(proxy), 30)
+        self.assertAlmostEqual(proxy.get(42).mean(), 4 * 25, delta=6)
+        stream.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import itertools
+import unittest
+import numpy as np
+from game_logic import determine_winner, point_offsets, point_outcomes, point_winner
+from helpers import random_points
+
+
+def _point(*codes):
+    return {"events": [{"event_code": code} for code in codes]}
+
+
+class TestPointOutcomes(unittest.TestCase):
+    """
+    Testes do núcleo vetorizado que decide sacador e vencedor de cada ponto.
+    """
+
+    def test_determine_winner(self):
+        """Winner/erro do último golpe, contando golpes a partir do sacador."""
+        self.assertEqual(determine_winner(_point("A", "1", "W")), "A")   # ace
+        self.assertEqual(determine_winner(_point("A", "1", "F", "W")), "B")
+        self.assertEqual(determine_winner(_point("A", "2", "E")), "B")   # dupla falta
+        self.assertEqual(determine_winner(_point("B", "1", "F", "E")), "B")
+        self.assertIsNone(determine_winner(_point("A", "1", "F")))
+        self.assertIsNone(determine_winner(_point("1", "F", "W")))       # sem sacador
+        self.assertIsNone(determine_winner({"events": []}))
+
+    def test_vectorized_matches_single_point(self):
+        """O cálculo em lote coincide com o cálculo ponto a ponto."""
+        points = [_point("A", "1", "W"), _point("B", "2", "F", "B", "E"),
+                  _point("A"), _point("B", "1", "S", "W"), _point("A", "2", "E")]
+        codes = np.array([e["event_code"] for p in points for e in p["events"]], dtype=object)
+        point_ids = np.repeat(np.arange(len(points)), [len(p["events"]) for p in points])
+        offsets = point_offsets(point_ids)
+        self.assertEqual(offsets.tolist(), [0, 3, 8, 9, 13, 16])
+
+        servers, winners = point_outcomes(codes, offsets)
+        self.assertEqual(servers.tolist(), [0, 1, 0, 1, 0])
+        expected = [determine_winner(p) for p in points]
+        self.assertEqual([("A", "B")[w] if w >= 0 else None for w in winners], expected)
+
+        # Também em uma partida aleatória inteira
+        points = random_points(300, seed=11)
+        codes = np.array([e["event_code"] for p in points for e in p["events"]], dtype=object)
+        offsets = np.cumsum([0] + [len(p["events"]) for p in points])
+        _, winners = point_outcomes(codes, offsets)
+        self.assertEqual([("A", "B")[w] for w in winners], [determine_winner(p) for p in points])
+
+    def test_vectorized_uses_point_winner(self):
+        """Todas as combinações de sacador, número de eventos e último código seguem point_winner."""
+        points = [_point(server, *["F"] * (count - 2), last)
+                  for server, count, last in itertools.product("AB1", range(2, 8), "WEF")]
+        codes = np.array([e["event_code"] for p in points for e in p["events"]], dtype=object)
+        offsets = np.cumsum([0] + [len(p["events"]) for p in points])
+        _, winners = point_outcomes(codes, offsets)
+        expected = [point_winner("AB".find(p["events"][0]["event_code"]), len(p["events"]), p["events"][-1]["event_code"])
+                    for p in points]
+        self.assertEqual(winners.tolist(), expected)
+        self.assertEqual([("A", "B")[w] if w >= 0 else None for w in winners], [determine_winner(p) for p in points])
+
+
+if __name__ == "__main__":
+    unittest.main()
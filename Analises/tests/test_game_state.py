@@ -0,0 +1,60 @@
+import random
+import unittest
+from game_state import GameState, _apply_point, transition_table
+
+
+class TestGameState(unittest.TestCase):
+    """
+    Testes da máquina de estados pré-calculada do placar.
+    """
+
+    def _check(self, winners, server):
+        """A tabela acompanha as regras aplicadas sem normalização, ponto a ponto."""
+        state = GameState.initial(server)
+        key = state.key
+        for winner in winners:
+            state = state.won_by(winner)
+            key = _apply_point(key, winner)
+            self.assertEqual(state.points + state.games + state.sets, key[:6])
+            self.assertEqual((state.server, state.is_tiebreak, state.is_super_tiebreak, state.match_over),
+                             (key[6], bool(key[7]), bool(key[8]), bool(key[9])))
+        return state
+
+    def test_matches_reference_rules(self):
+        """Partidas aleatórias, com iguais longos e sets no tie-break."""
+        rng = random.Random(7)
+        for _ in range(100):
+            winners, length = [], rng.randint(0, 400)
+            while len(winners) < length:
+                if rng.random() < 0.1:
+                    winners.extend([0, 1] * rng.randint(1, 15))
+                winners.append(int(rng.random() > 0.5))
+            self._check(winners, rng.randint(0, 1))
+
+    def test_long_deuce_keeps_table_finite(self):
+        """Iguais intermináveis reaproveitam os mesmos estados da tabela."""
+        size = len(transition_table().keys)
+        state = self._check([0, 0, 0, 1, 1, 1] + [0, 1] * 500 + [0, 0], 0)
+        self.assertEqual(state.games, (1, 0))
+        self.assertEqual(state.points, (0, 0))
+        self.assertEqual(len(transition_table().keys), size)
+
+    def test_states_are_shared_and_restorable(self):
+        """Estados são imutáveis, hashable e remontáveis a partir dos campos."""
+        start = GameState.initial(1)
+        after = start.won_by(0)
+        self.assertEqual(start.points, (0, 0))
+        self.assertEqual(after.won_by(1), start.won_by(1).won_by(0))
+        self.assertEqual(len({start, after, GameState.initial(1)}), 2)
+
+        state = self._check([0] * 24 + [1, 0] * 20, 0)
+        rebuilt = GameState.from_fields(state.points, state.games, state.sets, state.server,
+                                        state.is_tiebreak, state.is_super_tiebreak, state.match_over,
+                                        state.sets_history)
+        self.assertEqual(rebuilt, state)
+        with self.assertRaises(ValueError):
+            GameState.from_fields((0, 0), (9, 0), (0, 0), 0, False, False, False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from highlight_exporter import HighlightExporter, concatenate_clips, plan_clips, select_points
+from score_replay import replay_scores
+from game_logic import point_outcomes
+from helpers import frame_count, make_point, random_points
+
+
+class TestHighlightExporter(unittest.TestCase):
+    """
+    Testes da exportação dos trechos dos pontos em uma passada pelo vídeo.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmp_dir.name, "jogo.mp4")
+        # Vídeo sintético: o brilho muda a cada 20 frames
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+        for i in range(200):
+            writer.write(np.full((48, 64, 3), (i // 20) * 25, dtype=np.uint8))
+        writer.release()
+        self.points = [
+            make_point(1, ["A", "1", "W"], [40, 60, 79]),
+            make_point(2, ["B", "1", "F", "B", "W"], [60, 70, 80, 90, 99]),
+            make_point(3, ["A", "2", "F", "E"], [140, 160, 170, 179]),
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_filters(self):
+        """Winners, ralis longos e break points."""
+        self.assertEqual([p["point_id"] for p in select_points(self.points, winners_only=True)], [1, 2])
+        self.assertEqual([p["point_id"] for p in select_points(self.points, min_shots=2)], [2])
+
+        points = random_points(150, seed=5)
+        codes = np.array([e["event_code"] for p in points for e in p["events"]], dtype=object)
+        offsets = np.cumsum([0] + [len(p["events"]) for p in points])
+        expected = int(np.sum(replay_scores(point_outcomes(codes, offsets)[1])["break_point"][:-1]))
+        self.assertEqual(len(select_points(points, break_points=True)), expected)
+
+    def test_export_single_pass(self):
+        """Cada trecho tem exatamente os frames do ponto, com trechos sobrepostos."""
+        exporter = HighlightExporter(self.video_path, workers=2)
+        clips = plan_clips(self.points, self.tmp_dir.name, exporter.fps, exporter.total_frames,
+                           pad_before=0, pad_after=0)
+        stats = exporter.export(clips)
+
+        self.assertNotIn("errors", stats)
+        self.assertEqual(stats["frames_written"], 3 * 40)
+        # Uma passada a partir do primeiro trecho, sem voltar para os sobrepostos
+        self.assertEqual(stats["frames_decoded"] + stats["frames_skipped"], 180 - 40)
+        for clip in clips:
+            self.assertEqual(frame_count(clip.path), clip.end - clip.start + 1)
+            capture = cv2.VideoCapture(clip.path)
+            _, first = capture.read()
+            capture.release()
+            self.assertAlmostEqual(first.mean(), (clip.start // 20) * 25, delta=8)
+
+        reel_path = os.path.join(self.tmp_dir.name, "reel.mp4")
+        concatenate_clips([clip.path for clip in clips], reel_path)
+        self.assertEqual(frame_count(reel_path), 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
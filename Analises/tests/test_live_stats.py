@@ -0,0 +1,74 @@
+import os
+import random
+import tempfile
+import unittest
+from app_state import AppState
+from commands import DeleteLastPointCommand, CommandHistory
+from csv_handler import CSVHandler
+from live_stats import LiveStats
+from statistics_generator import StatisticsGenerator
+from helpers import random_points
+
+
+def _as_plain(stats):
+    """Converte os contadores para dicts simples, ignorando o nome do jogador."""
+    return {key: dict(value) if isinstance(value, dict) else value
+            for key, value in stats.items() if key != "name"}
+
+
+class TestLiveStats(unittest.TestCase):
+    """
+    Testes das estatísticas incrementais mantidas pelos comandos.
+    """
+
+    def setUp(self):
+        self.points = random_points(120, seed=3)
+
+    def test_matches_statistics_generator(self):
+        """Os contadores incrementais coincidem com o relatório do CSV."""
+        live = LiveStats()
+        for point in self.points:
+            live.add_point(point)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "S1.csv")
+            CSVHandler(csv_path).save_csv(self.points)
+            generator = StatisticsGenerator(csv_path, "A", "B")
+            generator._calculate_stats()
+
+        for code in ("A", "B"):
+            self.assertEqual(_as_plain(live.stats[code]), _as_plain(generator.stats[code]))
+
+    def test_remove_is_inverse_of_add(self):
+        """Remover pontos em qualquer ordem devolve os contadores ao estado anterior."""
+        live = LiveStats()
+        live.rebuild(self.points[:60])
+        expected = {code: _as_plain(live.stats[code]) for code in ("A", "B")}
+
+        extra = self.points[60:]
+        for point in extra:
+            live.add_point(point)
+        random.Random(5).shuffle(extra)
+        for point in extra:
+            live.remove_point(point)
+        self.assertEqual({code: _as_plain(live.stats[code]) for code in ("A", "B")}, expected)
+
+    def test_delete_and_undo_keep_stats_in_sync(self):
+        """Apagar e desfazer pelos comandos equivale a recalcular do zero."""
+        state = AppState("Player A", "Player B", total_frames=10**7)
+        state.all_points_data = list(self.points)
+        state.rebuild_history()
+        history = CommandHistory(state)
+        for _ in range(10):
+            history.execute(DeleteLastPointCommand(state))
+        history.undo()
+        history.undo()
+
+        reference = LiveStats()
+        reference.rebuild(state.all_points_data)
+        for code in ("A", "B"):
+            self.assertEqual(_as_plain(state.live_stats.stats[code]), _as_plain(reference.stats[code]))
+
+
+if __name__ == "__main__":
+    unittest.main()
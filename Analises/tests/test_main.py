@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+import cv2
+import numpy as np
+from config import CONFIG
+from app_state import AppState
+from display_pipeline import DisplayPipeline
+from video_stream import VideoStream
+from main import TennisVideoAnalyzer
+
+
+def _write_video(path, size, num_frames=10):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, size)
+    for _ in range(num_frames):
+        writer.write(np.zeros((size[1], size[0], 3), dtype=np.uint8))
+    writer.release()
+
+
+class TestOptimizedVideoSwap(unittest.TestCase):
+    """
+    Troca para o vídeo otimizado (resolução menor) durante a sessão.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.original = os.path.join(self.tmp_dir.name, "jogo.mp4")
+        self.optimized = os.path.join(self.tmp_dir.name, "jogo_otimizado.mp4")
+        _write_video(self.original, (640, 360))
+        _write_video(self.optimized, (320, 180))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_swap_updates_display_size(self):
+        """Depois da troca, o frame exibido tem a escala do novo arquivo, sem ampliação."""
+        # Só os atributos usados pela troca (sem abrir janela nem transcodificar)
+        analyzer = TennisVideoAnalyzer.__new__(TennisVideoAnalyzer)
+        analyzer.config = dict(CONFIG, THREADED_DECODE=False, FRAME_INDEX=False, PROXY_DISK_MB=0)
+        analyzer.args = SimpleNamespace(proxy_mb=None, scale=50)
+        analyzer.vs = analyzer._open_video_stream(self.original)
+        analyzer.state = AppState("A", "B", analyzer.vs.total_frames)
+        analyzer.display_pipeline = DisplayPipeline(50, None, source_size=(analyzer.vs.width, analyzer.vs.height))
+        analyzer._ranges_cache = (None, [])
+        analyzer.transcoder = SimpleNamespace(output_path=self.optimized)
+
+        _, frame = analyzer.vs.read_at_frame(0)
+        self.assertEqual(analyzer.display_pipeline.process(frame).shape, (180, 320, 3))
+
+        analyzer._swap_to_optimized_video()
+        self.assertIsInstance(analyzer.vs, VideoStream)
+        _, frame = analyzer.vs.read_at_frame(analyzer.state.jump_target)
+        self.assertEqual(frame.shape, (180, 320, 3))
+        self.assertEqual(analyzer.display_pipeline.process(frame).shape, (90, 160, 3))
+        analyzer.vs.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from app_state import AppState
+from match_archive import MatchArchive
+from helpers import random_points
+
+
+class TestMatchArchive(unittest.TestCase):
+    """
+    Testes do arquivo binário colunar .tmatch.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "partida.tmatch")
+        self.points = random_points(150)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip_points(self):
+        """Os pontos lidos do arquivo são iguais aos gravados."""
+        archive = MatchArchive.write(self.path, self.points)
+        self.assertIsInstance(archive.points, np.memmap)
+        self.assertEqual(archive.to_points(), self.points)
+
+    def test_checkpoints_match_replay(self):
+        """Os placares gravados são os mesmos que o recálculo da partida."""
+        archive = MatchArchive.write(self.path, self.points, initial_server="B")
+        state = AppState("Player A", "Player B", total_frames=10**7, initial_server="B")
+        state.all_points_data = self.points
+        state.rebuild_history()
+
+        frames, snapshots = archive.score_checkpoints()
+        self.assertEqual(frames, state.score_timeline.frames)
+        self.assertEqual(snapshots, state.score_timeline.snapshots)
+
+        loaded = AppState("Player A", "Player B", total_frames=10**7, initial_server="B")
+        loaded.load_score_history(frames, snapshots)
+        self.assertEqual(loaded.game.snapshot(), state.game.snapshot())
+
+    def test_overwrite(self):
+        """Regravar o arquivo substitui o conteúdo anterior por completo."""
+        MatchArchive.write(self.path, self.points)
+        archive = MatchArchive.write(self.path, self.points[:10])
+        self.assertEqual(len(archive), 10)
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
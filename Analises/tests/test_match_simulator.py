@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from csv_handler import CSVHandler
+from game_state import GameState
+from match_simulator import ServeModel, simulate_matches
+from statistics_generator import StatisticsGenerator
+from helpers import random_points
+
+
+class TestMatchSimulator(unittest.TestCase):
+    """
+    Testes do simulador vetorizado de partidas.
+    """
+
+    def test_serve_model_matches_statistics(self):
+        """As taxas estimadas são as mesmas do relatório de estatísticas."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "S1.csv")
+            CSVHandler(csv_path).save_csv(random_points(200, seed=4))
+            model = ServeModel.from_matches([csv_path])
+            generator = StatisticsGenerator(csv_path, "A", "B")
+            generator._calculate_stats()
+
+        for index, code in enumerate("AB"):
+            stats = generator.stats[code]
+            self.assertAlmostEqual(model.first_serve_won[index], stats["1st_serve_pts_won"] / stats["1st_serves_in"])
+            self.assertAlmostEqual(model.second_serve_won[index], stats["2nd_serve_pts_won"] / stats["2nd_serves_in"])
+            self.assertAlmostEqual(model.first_serve_in[index], stats["1st_serves_in"] / stats["serves_total"])
+
+        better = model.adjusted(0, first_serve_won=0.05)
+        self.assertAlmostEqual(better.first_serve_won[0], model.first_serve_won[0] + 0.05)
+        self.assertEqual(better.first_serve_won[1], model.first_serve_won[1])
+
+    def test_dominant_player_always_wins(self):
+        """Quem ganha todos os pontos vence 6-0 6-0, em 48 pontos."""
+        result = simulate_matches([1.0, 0.0], 1000, seed=1)
+        self.assertEqual(result.match_win, 1.0)
+        self.assertEqual(result.set_scores, {"2-0": 1.0})
+        self.assertEqual(result.current_set_scores, {"6-0": 1.0})
+        self.assertEqual(result.average_points, 48)
+
+    def test_symmetric_players_and_score_state(self):
+        """Jogadores iguais dividem as vitórias; um match point pesa a favor."""
+        result = simulate_matches([0.6, 0.6], 200_000, seed=2, chunk_size=50_000)
+        self.assertAlmostEqual(result.match_win, 0.5, delta=0.01)
+        self.assertAlmostEqual(sum(result.set_scores.values()), 1.0)
+
+        # A sacando em 40-0, 5-0 e um set à frente
+        state = GameState.from_fields((3, 0), (5, 0), (1, 0), 0, False, False, False, ((6, 0),))
+        result = simulate_matches([0.6, 0.6], 50_000, state=state, seed=3)
+        self.assertGreater(result.game_win, 0.9)
+        self.assertGreater(result.match_win, result.game_win)
+        with self.assertRaises(ValueError):
+            simulate_matches([0.6, 0.6], 10, state=GameState.from_fields(
+                (0, 0), (0, 0), (2, 0), 1, False, False, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import random
+import unittest
+from game import TennisGame
+from score_replay import replay_scores, snapshot_from_record
+
+
+class TestScoreReplay(unittest.TestCase):
+    """
+    Compara o replay em lote com o TennisGame ponto a ponto, incluindo os
+    marcadores de game, break, set e match point.
+    """
+
+    def _check(self, winners, initial_server):
+        table = replay_scores(winners, initial_server)
+        self.assertEqual(len(table), len(winners) + 1)
+        game = TennisGame(initial_server=initial_server)
+        for i, winner in enumerate(winners + [-1]):
+            before = game.snapshot()
+            row = table[i]
+            self.assertEqual(snapshot_from_record(row), before)
+
+            # Marcadores esperados: quem fecha game/set/partida ganhando este ponto
+            expected = {"game_point": -1, "set_point": -1, "match_point": -1}
+            for p, code in enumerate("AB"):
+                trial = TennisGame(initial_server=initial_server)
+                trial.restore(before)
+                trial.point_won_by(code)
+                after = trial.snapshot()
+                if before.match_over:
+                    continue
+                if after.games[p] > before.games[p] or after.sets[p] > before.sets[p]:
+                    expected["game_point"] = p
+                if after.sets[p] > before.sets[p]:
+                    expected["set_point"] = p
+                if after.match_over:
+                    expected["match_point"] = p
+            for field, value in expected.items():
+                self.assertEqual(row[field], value, (i, field, before))
+            in_tiebreak = before.is_tiebreak or before.is_super_tiebreak
+            expected_break = expected["game_point"] not in (-1, "AB".index(before.server)) and not in_tiebreak
+            self.assertEqual(bool(row["break_point"]), expected_break)
+
+            if winner >= 0:
+                game.point_won_by("AB"[winner])
+
+    def test_matches_tennis_game(self):
+        """Partidas aleatórias (com tie-breaks e pontos sem vencedor)."""
+        rng = random.Random(11)
+        for _ in range(60):
+            bias = rng.uniform(0.3, 0.7)
+            winners = [-1 if rng.random() < 0.05 else int(rng.random() > bias)
+                       for _ in range(rng.randint(0, 300))]
+            self._check(winners, rng.choice("AB"))
+
+    def test_tiebreak_and_super_tiebreak(self):
+        """Sets decididos no tie-break e partida no super tie-break."""
+        alternating_games = ([0] * 4 + [1] * 4) * 6
+        winners = alternating_games + [0] * 7 + alternating_games + [1] * 7 + [1] * 9 + [0] * 10
+        self._check(winners, "A")
+        table = replay_scores(winners, "A")
+        self.assertTrue(table[-1]["match_over"])
+        self.assertEqual(table[-1]["winner_code"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
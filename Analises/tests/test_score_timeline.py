@@ -0,0 +1,49 @@
+import unittest
+from game import TennisGame
+from scoreboard import Scoreboard
+from score_timeline import ScoreTimeline
+
+
+class TestScoreTimeline(unittest.TestCase):
+    """
+    Testes do índice de placares por frame usado na navegação pelo vídeo.
+    """
+
+    def setUp(self):
+        self.game = TennisGame("Player A", "Player B")
+        self.timeline = ScoreTimeline(self.game)
+        self.scoreboard = Scoreboard()
+        # Um ponto a cada 100 frames, terminando nos frames 100, 200, ..., 1000
+        self.games_after_point = []
+        for i in range(10):
+            self.game.point_won_by("A" if i % 3 else "B")
+            self.timeline.append((i + 1) * 100, self.game.snapshot())
+            self.games_after_point.append(self.scoreboard.get_score_data(self.game))
+
+    def test_before_first_point(self):
+        """Antes do primeiro ponto, o placar exibido é o inicial."""
+        initial = self.scoreboard.get_score_data(TennisGame("Player A", "Player B"))
+        self.assertEqual(self.timeline.score_data_for_frame(0), initial)
+        self.assertEqual(self.timeline.score_data_for_frame(99), initial)
+
+    def test_lookup_matches_point_end(self):
+        """O placar de um frame é o do último ponto encerrado até ele."""
+        self.assertEqual(self.timeline.score_data_for_frame(100), self.games_after_point[0])
+        self.assertEqual(self.timeline.score_data_for_frame(550), self.games_after_point[4])
+        self.assertEqual(self.timeline.score_data_for_frame(5000), self.games_after_point[-1])
+
+    def test_result_is_reused_within_point(self):
+        """Frames dentro do mesmo ponto reaproveitam o dicionário formatado."""
+        first = self.timeline.score_data_for_frame(310)
+        self.assertIs(self.timeline.score_data_for_frame(399), first)
+        self.assertIsNot(self.timeline.score_data_for_frame(400), first)
+
+    def test_pop_invalidates_cache(self):
+        """Remover o último ponto atualiza o placar exibido."""
+        self.timeline.score_data_for_frame(1000)
+        self.timeline.pop()
+        self.assertEqual(self.timeline.score_data_for_frame(1000), self.games_after_point[-2])
+
+
+if __name__ == "__main__":
+    unittest.main()
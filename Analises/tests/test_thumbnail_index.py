@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from thumbnail_index import ThumbnailIndex, point_ranges
+from ui_handler import UIHandler
+from helpers import make_point
+
+
+class TestThumbnailIndex(unittest.TestCase):
+    """
+    Testes das miniaturas mapeadas em memória e da linha do tempo.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmp_dir.name, "jogo.mp4")
+        # Vídeo sintético: o brilho muda a cada 15 frames (0,5 s a 30 fps)
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (320, 180))
+        for i in range(100):
+            writer.write(np.full((180, 320, 3), (i // 15) * 30, dtype=np.uint8))
+        writer.release()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_build_and_reuse(self):
+        """Uma miniatura por 0,5 s em cada nível da pirâmide, reaproveitadas do disco."""
+        self.assertIsNone(ThumbnailIndex.load(self.video_path))
+        index = ThumbnailIndex.build(self.video_path, interval_sec=0.5)
+        self.assertEqual((index.step, index.count), (15, 7))
+        self.assertEqual([level.shape for level in index.levels],
+                         [(7, 90, 160, 3), (7, 45, 80, 3), (7, 22, 40, 3)])
+        self.assertIsInstance(index.levels[0].base, np.memmap)
+        for frame_num in (0, 14, 15, 50, 99):
+            for level in range(3):
+                self.assertAlmostEqual(index.thumbnail(frame_num, level).mean(), (frame_num // 15) * 30, delta=6)
+
+        loaded = ThumbnailIndex.load(self.video_path)
+        self.assertEqual(loaded.count, 7)
+        np.testing.assert_array_equal(loaded.levels[1], index.levels[1])
+        self.assertEqual(loaded.level_for_width(64), 1)
+
+        # Vídeo alterado: as miniaturas antigas deixam de valer
+        os.utime(self.video_path, ns=(0, 0))
+        self.assertIsNone(ThumbnailIndex.load(self.video_path))
+
+    def test_timeline(self):
+        """Faixa de miniaturas, marcas dos pontos e prévia sob o mouse."""
+        index = ThumbnailIndex.build(self.video_path)
+        points = [make_point(1, ["A", "1", "W"], [10, 20, 30]), make_point(2, ["B", "1", "E"], [60, 70, 80])]
+        ranges = point_ranges(points)
+        self.assertEqual(ranges, [(10, 30), (60, 80)])
+
+        ui_handler = UIHandler()
+        frame = np.zeros((360, 500, 3), dtype=np.uint8)
+        height = ui_handler.draw_timeline(frame, index, ranges, 0, 50, 100, hover_x=400)
+        self.assertEqual(height, 45 + 8)
+        self.assertEqual(ui_handler.timeline_frame_at(400), 80)
+        self.assertTrue(ui_handler.timeline_contains(10, 359))
+        self.assertFalse(ui_handler.timeline_contains(10, 300))
+        # Marca do primeiro ponto (frames 10-30 -> x 50-150) e nada fora dos pontos
+        band = frame[-53:-45]
+        self.assertGreater(band[:, 60:140].mean(), 100)
+        self.assertEqual(band[:, 160:240].max(), 0)
+        # Prévia do frame 80 (brilho 150) acima da faixa
+        self.assertAlmostEqual(frame[-53 - 80:-53 - 20, 340:460].mean(), 150, delta=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import time
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from video_stream import VideoStream
+
+
+class TestThreadedPrefetch(unittest.TestCase):
+    """
+    O prefetch em thread entrega os mesmos frames, na mesma ordem, que a leitura direta.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmp_dir.name, "jogo.mp4")
+        # Cada frame tem um conteúdo diferente (quadrado em movimento)
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (96, 64))
+        for i in range(80):
+            frame = np.zeros((64, 96, 3), dtype=np.uint8)
+            cv2.rectangle(frame, (i, 10), (i + 12, 30), (255, 255, 255), -1)
+            writer.write(frame)
+        writer.release()
+        reader = VideoStream(self.video_path)
+        self.expected = []
+        while True:
+            ret, frame = reader.read_sequential()
+            if not ret:
+                break
+            self.expected.append(frame.copy())
+        reader.stop()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _find(self, frame):
+        return next(i for i, expected in enumerate(self.expected) if np.array_equal(frame, expected))
+
+    def test_same_frames_in_order(self):
+        stream = VideoStream(self.video_path, threaded=True, prefetch_size=4)
+        frames = []
+        while True:
+            ret, frame = stream.read_sequential()
+            if not ret:
+                break
+            # O anel reutiliza os buffers: guarda uma cópia
+            frames.append(frame.copy())
+        stream.stop()
+        self.assertEqual(len(frames), len(self.expected))
+        for frame, expected in zip(frames, self.expected):
+            np.testing.assert_array_equal(frame, expected)
+
+    def test_seek_flushes_ring(self):
+        """Depois de uma busca, nenhum frame pré-decodificado antes dela é entregue."""
+        stream = VideoStream(self.video_path, threaded=True, prefetch_size=8)
+        for _ in range(3):
+            stream.read_sequential()
+        # Dá tempo ao produtor para encher o anel a partir do frame 3
+        deadline = time.monotonic() + 5
+        while stream.queue_depth < 7 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertEqual(stream.queue_depth, 7)
+
+        ret, frame = stream.read_at_frame(50)
+        self.assertTrue(ret)
+        self.assertEqual(self._find(frame), 50)
+        for expected_num in range(51, 60):
+            ret, frame = stream.read_sequential()
+            self.assertTrue(ret)
+            self.assertEqual(self._find(frame), expected_num)
+        self.assertEqual(stream.next_frame, 60)
+
+        # Busca para trás também reinicia o anel
+        ret, frame = stream.read_at_frame(5)
+        self.assertEqual(self._find(frame), 5)
+        ret, frame = stream.read_sequential()
+        self.assertEqual(self._find(frame), 6)
+        stream.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
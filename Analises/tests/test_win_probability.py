@@ -0,0 +1,70 @@
+import csv
+import os
+import tempfile
+import unittest
+import numpy as np
+from app_state import AppState
+from csv_handler import CSVHandler
+from game_state import transition_table
+from helpers import random_points
+from win_probability import WinProbability, export_curve, win_probabilities
+
+
+class TestWinProbability(unittest.TestCase):
+    """
+    Testes da probabilidade exata de vitória sobre a tabela de transições.
+    """
+
+    def test_matches_value_iteration(self):
+        """A programação dinâmica coincide com a iteração da cadeia de Markov."""
+        fsm = transition_table()
+        exact = win_probabilities(0.65, 0.55)
+        a_wins = np.where(fsm.states[:, 6] == 0, 0.65, 1 - 0.55)
+        over = fsm.states[:, 9] == 1
+        values = np.where(over, fsm.states[:, 4] > fsm.states[:, 5], 0.5)
+        for _ in range(5000):
+            values = np.where(over, values, a_wins * values[fsm.next_state[:, 0]]
+                              + (1 - a_wins) * values[fsm.next_state[:, 1]])
+        np.testing.assert_allclose(exact, values, atol=1e-12)
+
+    def test_extreme_rates(self):
+        """Quem ganha todos os pontos vence com certeza; ciclos sem saída ficam em 50%."""
+        self.assertEqual(win_probabilities(1.0, 0.0)[0], 1.0)
+        self.assertEqual(win_probabilities(0.0, 1.0)[0], 0.0)
+        # Cada um vence todos os pontos no próprio saque: o tie-break nunca termina
+        self.assertTrue(np.all((win_probabilities(1.0, 1.0) >= 0) & (win_probabilities(1.0, 1.0) <= 1)))
+
+    def test_curve_and_live_scoreboard(self):
+        """A curva termina no resultado e o placar exibe a probabilidade atual."""
+        model = WinProbability((0.6, 0.6))
+        winners = [0] * 48
+        curve = model.curve(winners)
+        self.assertEqual(len(curve), 49)
+        self.assertTrue(np.all(np.diff(curve) >= 0))
+        self.assertEqual(curve[-1], 1.0)
+
+        state = AppState("Player A", "Player B", total_frames=10**7)
+        self.assertAlmostEqual(state.display_score_data["win_prob"], win_probabilities(0.6, 0.6)[0])
+        state.all_points_data = random_points(40, seed=9)
+        state.rebuild_history()
+        state.current_frame_num = 10**6
+        state.update_display_game_for_frame()
+        self.assertAlmostEqual(state.display_score_data["win_prob"],
+                               state.win_model.for_state(state.game.state))
+
+    def test_export_curve(self):
+        """Uma linha por ponto, mais o início da partida."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "S1.csv")
+            CSVHandler(csv_path).save_csv(random_points(30, seed=2))
+            output = export_curve(csv_path)
+            with open(output, newline="", encoding="utf-8") as f:
+                rows = list(csv.reader(f, delimiter=";"))
+        self.assertEqual(output, os.path.join(tmp_dir, "S1_win_prob.csv"))
+        self.assertEqual(rows[0], ["point_id", "winner", "win_prob_A", "win_prob_B"])
+        self.assertEqual(len(rows), 32)
+        self.assertEqual([row[0] for row in rows[1:]], [str(i) for i in range(31)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,10 @@
-import copy
+import numpy as np
 from game import TennisGame
+from score_timeline import ScoreTimeline
+from game_logic import point_outcomes
+from score_replay import replay_scores, snapshot_from_record, snapshots_after_points
+from live_stats import LiveStats
+from win_probability import WinProbability, serve_win_from_stats
 
 class AppState:
     """
@@ -21,10 +26,21 @@ class AppState:
 
         # --- LÓGICA DO JOGO ---
         self.game = TennisGame(player_a_name, player_b_name, initial_server=initial_server)
-        self.game_history = []
-        self.display_game = TennisGame(player_a_name, player_b_name, initial_server=initial_server)
+        self.score_timeline = ScoreTimeline(self.game)
+        # Estatísticas atualizadas ponto a ponto pelos comandos
+        self.live_stats = LiveStats()
+        # Probabilidade de vitória no placar, com as taxas de saque da partida
+        self.win_model = None
+        self._win_model_version = None
+        self.update_display_game_for_frame()
+        self.show_stats_panel = False
+        self.show_timeline = False
         self.current_player = None
         self.fps = 30
+        # Diário opcional (EventJournal) onde os comandos registram cada ação
+        self.journal = None
+        # Função opcional frame -> segundos (ex.: PTS real vindo do índice de frames)
+        self.timestamp_provider = None
 
     def toggle_pause(self):
         """Alterna o estado de pausa."""
@@ -42,31 +58,85 @@ class AppState:
         self.is_paused = True # Pausa ao pular
         self.jump_target = max(0, min(frame_num, self.total_frames - 1))
 
+    def timestamp_for_frame(self, frame_num: int) -> float:
+        """Converte um número de frame no timestamp do evento, em segundos."""
+        if self.timestamp_provider is not None:
+            return self.timestamp_provider(frame_num)
+        return frame_num / self.fps if self.fps > 0 else 0
+
+    def replay_last_point(self):
+        """
+        Volta ao início do último ponto (ou do ponto em andamento) e retoma a
+        reprodução. Retorna False se não houver ponto para rever.
+        """
+        point = self.current_point_data or (self.all_points_data[-1] if self.all_points_data else None)
+        if not point or not point["events"]:
+            self.last_event_info = "Nenhum ponto para rever."
+            return False
+        self.set_jump_target(point["events"][0]["event_frame"])
+        self.is_paused = False
+        self.frame_increment = 1
+        self.last_event_info = f"Revendo ponto {point['point_id']}."
+        return True
+
     def update_display_game_for_frame(self):
         """
-        Atualiza o estado do placar a ser exibido para corresponder
-        ao frame atual do vídeo. Esta é a função chave para a navegação no tempo.
+        Atualiza o placar a ser exibido para corresponder ao frame atual do
+        vídeo. Esta é a função chave para a navegação no tempo: a busca é feita
+        por bisect no índice de placares, sem percorrer nem copiar o histórico.
+        """
+        self.update_win_model()
+        self.display_score_data = self.score_timeline.score_data_for_frame(self.current_frame_num)
+
+    def update_win_model(self):
+        """
+        Atualiza as taxas de saque do modelo de probabilidade de vitória quando
+        as estatísticas mudam (a cada ponto). Nos demais frames, só compara a versão.
         """
-        # Itera na ordem inversa para encontrar o último estado de jogo válido
-        for frame, game_state in reversed(self.game_history):
-            if self.current_frame_num >= frame:
-                # *** CORREÇÃO APLICADA AQUI ***
-                # Usa uma cópia profunda (deepcopy) para garantir que o placar de exibição
-                # seja um objeto independente e não modifique o histórico do jogo.
-                self.display_game = copy.deepcopy(game_state)
-                return
-            
-        # Se nenhum estado de jogo foi encontrado (estamos antes do primeiro ponto),
-        # reseta o placar de exibição para um estado inicial limpo.
-        self.display_game.reset_match()
+        if self.live_stats.version == self._win_model_version:
+            return
+        self._win_model_version = self.live_stats.version
+        serve_win = serve_win_from_stats(self.live_stats.stats)
+        if self.win_model is None or serve_win != self.win_model.serve_win:
+            self.win_model = WinProbability(serve_win)
+            self.score_timeline.set_win_model(self.win_model)
 
-    def add_point_to_history(self):
+    def add_point_to_history(self, frame_of_point_end: int = None):
         """
         Salva o estado atual do jogo no histórico, associado ao frame
-        final do ponto.
+        final do ponto (por padrão, o frame atual).
+        """
+        if frame_of_point_end is None:
+            frame_of_point_end = self.current_frame_num
+        self.score_timeline.append(frame_of_point_end, self.game.snapshot())
+
+    def rebuild_history(self):
+        """
+        Recalcula o placar e o histórico do zero a partir de all_points_data,
+        com o replay em lote da partida (sem aplicar ponto a ponto no TennisGame).
+        """
+        codes = np.array([e["event_code"] for p in self.all_points_data for e in p["events"]], dtype=object)
+        offsets = np.cumsum([0] + [len(p["events"]) for p in self.all_points_data])
+        _, winners = point_outcomes(codes, offsets)
+        table = replay_scores(winners, self.game.initial_server)
+
+        self.score_timeline.clear()
+        for i, snapshot in snapshots_after_points(table, winners):
+            frame_of_point_end = self.all_points_data[i]["events"][-1]["event_frame"]
+            self.score_timeline.append(frame_of_point_end, snapshot)
+        self.game.restore(snapshot_from_record(table[-1]))
+        self.live_stats.rebuild(self.all_points_data)
+
+    def load_score_history(self, frames, snapshots):
+        """
+        Preenche o histórico com placares já calculados (ex.: checkpoints de um
+        MatchArchive), sem reprocessar a partida.
         """
-        frame_of_point_end = self.current_frame_num
-        self.game_history.append((frame_of_point_end, copy.deepcopy(self.game)))
+        self.score_timeline.clear()
+        for frame, snapshot in zip(frames, snapshots):
+            self.score_timeline.append(frame, snapshot)
+        self.game.restore(self.score_timeline.last_snapshot())
+        self.live_stats.rebuild(self.all_points_data)
 
     def reset_current_point(self, cancelled: bool = False):
         """Reseta as informações do ponto atual."""
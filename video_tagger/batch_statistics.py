@@ -0,0 +1,153 @@
+import os
+import re
+import glob
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics_generator import StatisticsGenerator
+
+# Analises/<date> - <player>/S*.csv (or the binary S*.tmatch archive)
+MATCH_PATTERNS = ("S*.csv", "S*.tmatch")
+FOLDER_NAME_RE = re.compile(r"^(?P<date>[^-]+?)\s*-\s*(?P<player>.+)$")
+
+
+def discover_matches(root: str):
+    """
+    Finds every match file under root. When a set was exported to .tmatch,
+    the archive is used instead of the CSV with the same name.
+    """
+    matches = {}
+    for pattern in MATCH_PATTERNS:
+        for path in glob.glob(os.path.join(root, "**", pattern), recursive=True):
+            matches[os.path.splitext(path)[0]] = path
+    return [matches[key] for key in sorted(matches)]
+
+
+def opponent_from_path(path: str) -> str:
+    """Player name from the '<date> - <player>' folder that holds the match."""
+    folder = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    match = FOLDER_NAME_RE.match(folder)
+    return match.group("player").strip() if match else folder
+
+
+def match_stats(path: str, player_a: str, player_b: str):
+    """
+    Worker: computes the stats of one match. Returns (path, stats, error) so that
+    a corrupt file is reported without stopping the whole run.
+    """
+    try:
+        generator = StatisticsGenerator(path, player_a, player_b)
+        generator._calculate_stats()
+        return path, generator.stats, None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def _empty_stats(name: str):
+    return {'name': name, 'matches': 0}
+
+
+def merge_stats(total, stats):
+    """Adds one match's stats of a player into an accumulated total."""
+    total['matches'] += 1
+    for key, value in stats.items():
+        if key == 'name':
+            continue
+        if isinstance(value, dict):
+            counter = total.setdefault(key, defaultdict(int))
+            for stroke, count in value.items():
+                counter[stroke] += count
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+class BatchStatistics:
+    """
+    Computes the stats of every match under an Analises root in a process pool
+    and aggregates them into career totals per player and per opponent.
+    """
+    def __init__(self, root: str, player_a: str, workers: int = None):
+        self.root = root
+        self.player_a = player_a
+        self.workers = workers
+        self.results = []  # (path, opponent, stats)
+        self.errors = []   # (path, error)
+
+    def run(self):
+        paths = discover_matches(self.root)
+        if not paths:
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(match_stats, path, self.player_a, opponent_from_path(path)) for path in paths]
+            for future in as_completed(futures):
+                path, stats, error = future.result()
+                if error is not None:
+                    self.errors.append((path, error))
+                elif stats['A']['total_points_played'] == 0:
+                    self.errors.append((path, "nenhum ponto com vencedor"))
+                else:
+                    self.results.append((path, stats['B']['name'], stats))
+        self.results.sort()
+        self.errors.sort()
+
+    def career_totals(self):
+        """Totals per player name, over every match that player appears in."""
+        totals = {}
+        for _, _, stats in self.results:
+            for code in ('A', 'B'):
+                name = stats[code]['name']
+                merge_stats(totals.setdefault(name, _empty_stats(name)), stats[code])
+        return totals
+
+    def head_to_head(self):
+        """Totals of player A and of each opponent, over the matches between them."""
+        totals = {}
+        for _, opponent, stats in self.results:
+            pair = totals.setdefault(opponent, {'A': _empty_stats(self.player_a), 'B': _empty_stats(opponent)})
+            merge_stats(pair['A'], stats['A'])
+            merge_stats(pair['B'], stats['B'])
+        return totals
+
+    def generate_report(self):
+        """Builds the combined report: matches, errors, career and head-to-head totals."""
+        report = "\n=== Relatório Consolidado ===\n"
+        report += f"Raiz: {self.root}\n"
+        report += f"Partidas processadas: {len(self.results)} | Com erro: {len(self.errors)}\n"
+
+        report += "\n-- PARTIDAS --\n"
+        for path, opponent, stats in self.results:
+            won_a, won_b = stats['A']['points_won'], stats['B']['points_won']
+            report += f"- {os.path.relpath(path, self.root)}: {self.player_a} {won_a} x {won_b} {opponent} (pontos)\n"
+        if self.errors:
+            report += "\n-- ARQUIVOS IGNORADOS --\n"
+            for path, error in self.errors:
+                report += f"- {os.path.relpath(path, self.root)}: {error}\n"
+
+        report += "\n\n##### TOTAIS POR ADVERSÁRIO #####\n"
+        for opponent, pair in sorted(self.head_to_head().items()):
+            title = f"Confronto: {pair['A']['matches']} partida(s)"
+            report += StatisticsGenerator.format_report(pair, title=title)
+
+        report += "\n\n##### TOTAIS DE CARREIRA POR JOGADOR #####\n"
+        for name, totals in sorted(self.career_totals().items()):
+            report += f"- {name}: {totals['points_won']} de {totals['total_points_played']} pontos ganhos "
+            report += f"em {totals['matches']} partida(s), {totals['aces']} aces, {totals['double_faults']} duplas faltas\n"
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estatísticas consolidadas de todas as partidas de uma pasta Analises.")
+    parser.add_argument("root", help="Pasta raiz (ex.: Analises), organizada como '<data> - <jogador>/S*.csv'.")
+    parser.add_argument("--player_a", default="JOGADOR A", help="Nome do Jogador A (o mesmo em todas as partidas).")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos. Padrão: núcleos da máquina.")
+    parser.add_argument("-o", "--output", help="Arquivo do relatório consolidado. Padrão: só exibir na saída padrão.")
+    args = parser.parse_args()
+
+    batch = BatchStatistics(args.root, args.player_a, workers=args.workers)
+    batch.run()
+    report = batch.generate_report()
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"Relatório consolidado salvo em: {args.output}")
@@ -0,0 +1,329 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import contextlib
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from app_state import AppState
+from commands import StartPointCommand, AddEventCommand, EndPointCommand, CommandHistory
+from csv_handler import CSVHandler
+from display_pipeline import DisplayPipeline
+from statistics_generator import StatisticsGenerator
+from ui_handler import UIHandler
+from video_stream import VideoStream
+
+# Piora relativa tolerada em relação à linha de base antes de acusar regressão
+DEFAULT_THRESHOLD = 0.2
+# Linha de base versionada junto com o código, usada quando --baseline não é informado
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Parâmetros da execução que precisam coincidir para a comparação fazer sentido
+COMPARABLE_META = ("points", "frames", "size", "scale", "seed")
+PLAYER_NAMES = {"A": "JOGADOR A", "B": "JOGADOR B"}
+
+
+# --- DADOS SINTÉTICOS ---
+
+def write_synthetic_video(path: str, num_frames: int = 300, size=(640, 360), fps: float = 30):
+    """
+    Gera um vídeo de teste com o cv2.VideoWriter: fundo em gradiente, um
+    retângulo em movimento e o número do frame, para o codificador ter
+    movimento real a comprimir.
+    """
+    width, height = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"Não foi possível criar o vídeo em: {path}")
+    background = np.empty((height, width, 3), dtype=np.uint8)
+    background[:] = np.linspace(40, 160, width, dtype=np.uint8)[None, :, None]
+    frame = np.empty_like(background)
+    box = max(8, height // 6)
+    for i in range(num_frames):
+        np.copyto(frame, background)
+        x = (i * 7) % max(1, width - box)
+        y = (i * 3) % max(1, height - box)
+        cv2.rectangle(frame, (x, y), (x + box, y + box), (0, 220, 255), -1)
+        cv2.putText(frame, str(i), (10, height - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def synthetic_points(num_points: int, total_frames: int = None, seed: int = 7, fps: float = 30) -> List[Dict]:
+    """
+    Gera pontos no formato do analisador (sacador, saque, golpes e W/E). Com
+    total_frames, os frames dos eventos são espalhados ao longo do vídeo.
+    """
+    rng = random.Random(seed)
+    codes_per_point = []
+    for _ in range(num_points):
+        codes = [rng.choice("AB"), rng.choice("12")]
+        codes += [rng.choice("FBDMVS") for _ in range(rng.randint(0, 5))]
+        codes.append(rng.choice("WE"))
+        codes_per_point.append(codes)
+    num_events = sum(len(codes) for codes in codes_per_point)
+    spacing = max(1, (total_frames or num_events * 30) // (num_events + 1))
+
+    points, frame = [], 0
+    for point_id, codes in enumerate(codes_per_point, start=1):
+        events = []
+        for code in codes:
+            frame += spacing
+            events.append({"point_id": point_id, "event_code": code,
+                           "event_frame": frame, "event_timestamp_sec": frame / fps})
+        points.append({"point_id": point_id, "server": codes[0], "events": events})
+    return points
+
+
+# --- MEDIÇÕES ---
+
+def _summary(samples_ms: List[float], prefix: str, metrics: Dict):
+    """Acrescenta média e percentis (ms, menor é melhor) de uma série de tempos."""
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    metrics[f"{prefix}_mean_ms"] = {"value": float(samples.mean()), "unit": "ms", "better": "lower"}
+    for pct in (50, 90, 99):
+        metrics[f"{prefix}_p{pct}_ms"] = {"value": float(np.percentile(samples, pct)), "unit": "ms", "better": "lower"}
+
+
+def _timed(fn, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _session_state(points: List[Dict], total_frames: int) -> AppState:
+    state = AppState(PLAYER_NAMES["A"], PLAYER_NAMES["B"], total_frames)
+    state.all_points_data = points
+    state.rebuild_history()
+    return state
+
+
+def bench_render_loop(video_path: str, points: List[Dict], num_frames: int, scale: int, metrics: Dict):
+    """
+    Mesmo laço do TennisVideoAnalyzer.run, sem a janela: leitura sequencial,
+    busca do placar, redimensionamento e overlays (placar e estatísticas).
+    """
+    stream = VideoStream(video_path, threaded=True)
+    try:
+        state = _session_state(points, stream.total_frames)
+        pipeline = DisplayPipeline(scale, None, source_size=(stream.width, stream.height))
+        ui_handler = UIHandler()
+        frames = 0
+        start = time.perf_counter()
+        for frame_num in range(min(num_frames, stream.total_frames)):
+            ret, frame = stream.read_sequential()
+            if not ret:
+                break
+            state.current_frame_num = frame_num
+            state.update_display_game_for_frame()
+            display_frame = pipeline.process(frame)
+            ui_handler.draw_overlay(display_frame, state.current_state, False, 1, state.last_event_info,
+                                    f"Frame: {frame_num}/{stream.total_frames}")
+            ui_handler.draw_scoreboard(display_frame, state.display_score_data)
+            ui_handler.draw_stats_panel(display_frame, state.live_stats, PLAYER_NAMES)
+            frames += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        stream.stop()
+    metrics["render_loop_fps"] = {"value": frames / elapsed if elapsed > 0 else 0.0, "unit": "fps", "better": "higher"}
+
+
+def bench_seek(video_path: str, num_seeks: int, seed: int, metrics: Dict):
+    """Latência de read_at_frame em posições aleatórias (sem buffer de replay)."""
+    stream = VideoStream(video_path)
+    try:
+        rng = random.Random(seed)
+        targets = [rng.randrange(stream.total_frames) for _ in range(num_seeks)]
+        samples = []
+        for target in targets:
+            start = time.perf_counter()
+            stream.read_at_frame(target)
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        stream.stop()
+    _summary(samples, "seek", metrics)
+
+
+def bench_overlay(points: List[Dict], size, repeat: int, metrics: Dict):
+    """Custo dos overlays por frame (HUD, placar e painel), com o texto do frame mudando."""
+    state = _session_state(points, 10 ** 7)
+    state.update_display_game_for_frame()
+    ui_handler = UIHandler()
+    frame = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    counter = iter(range(10 ** 9))
+
+    def draw():
+        ui_handler.draw_overlay(frame, state.current_state, False, 1, state.last_event_info, f"Frame: {next(counter)}")
+        ui_handler.draw_scoreboard(frame, state.display_score_data)
+        ui_handler.draw_stats_panel(frame, state.live_stats, PLAYER_NAMES)
+
+    _summary(_timed(draw, repeat), "overlay", metrics)
+
+
+def bench_csv(points: List[Dict], work_dir: str, repeat: int, metrics: Dict):
+    """Gravação e leitura do CSV da sessão."""
+    handler = CSVHandler(os.path.join(work_dir, "bench_analisado.csv"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        save = _timed(lambda: handler.save_csv(points), repeat)
+        load = _timed(handler.load_csv, repeat)
+    metrics["csv_save_ms"] = {"value": float(np.median(save)), "unit": "ms", "better": "lower"}
+    metrics["csv_load_ms"] = {"value": float(np.median(load)), "unit": "ms", "better": "lower"}
+    return handler.csv_path
+
+
+def bench_score_lookup(points: List[Dict], repeat: int, seed: int, metrics: Dict):
+    """Custo de update_display_game_for_frame em frames aleatórios da partida."""
+    state = _session_state(points, 10 ** 7)
+    last_frame = points[-1]["events"][-1]["event_frame"]
+    rng = random.Random(seed)
+    targets = [rng.randrange(last_frame + 1) for _ in range(repeat)]
+    start = time.perf_counter()
+    for target in targets:
+        state.current_frame_num = target
+        state.update_display_game_for_frame()
+    elapsed = time.perf_counter() - start
+    metrics["score_lookup_us"] = {"value": elapsed / repeat * 1e6, "unit": "us", "better": "lower"}
+
+
+def bench_undo(points: List[Dict], metrics: Dict):
+    """
+    Marca a partida pelos comandos (como na interface) e mede desfazer e
+    refazer cada comando, do último ao primeiro.
+    """
+    state = AppState(PLAYER_NAMES["A"], PLAYER_NAMES["B"], 10 ** 7)
+    history = CommandHistory(state, max_size=sum(len(p["events"]) for p in points))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for point in points:
+            for i, event in enumerate(point["events"]):
+                state.current_frame_num = event["event_frame"]
+                info = {"code": event["event_code"], "desc": event["event_code"]}
+                if i == 0:
+                    command = StartPointCommand(state, info)
+                elif i == len(point["events"]) - 1:
+                    command = EndPointCommand(state, info)
+                else:
+                    command = AddEventCommand(state, info)
+                history.execute(command)
+        count = len(history.undo_stack)
+        undo = _timed(history.undo, count)
+        redo = _timed(history.redo, count)
+    metrics["undo_us"] = {"value": float(np.mean(undo)) * 1000, "unit": "us", "better": "lower"}
+    metrics["redo_us"] = {"value": float(np.mean(redo)) * 1000, "unit": "us", "better": "lower"}
+
+
+def bench_statistics(csv_path: str, repeat: int, metrics: Dict):
+    """Geração das estatísticas da partida a partir do CSV (leitura e cálculo)."""
+    def generate():
+        generator = StatisticsGenerator(csv_path, PLAYER_NAMES["A"], PLAYER_NAMES["B"])
+        generator._calculate_stats()
+        generator.format_report(generator.stats)
+
+    metrics["statistics_ms"] = {"value": float(np.median(_timed(generate, repeat))), "unit": "ms", "better": "lower"}
+
+
+def run_benchmarks(work_dir: str, num_points: int = 400, num_frames: int = 300, size=(640, 360),
+                   scale: int = 60, num_seeks: int = 40, repeat: int = 5, seed: int = 7) -> Dict:
+    """
+    Gera os dados sintéticos em work_dir e executa todas as medições.
+    Retorna {"meta": ..., "metrics": {nome: {"value", "unit", "better"}}}.
+    """
+    video_path = write_synthetic_video(os.path.join(work_dir, "bench.mp4"), num_frames, size)
+    points = synthetic_points(num_points, total_frames=num_frames, seed=seed)
+    metrics = {}
+    bench_render_loop(video_path, points, num_frames, scale, metrics)
+    bench_seek(video_path, num_seeks, seed, metrics)
+    bench_overlay(points, size, repeat * 40, metrics)
+    csv_path = bench_csv(points, work_dir, repeat, metrics)
+    bench_score_lookup(points, repeat * 2000, seed, metrics)
+    bench_undo(points, metrics)
+    bench_statistics(csv_path, repeat, metrics)
+    meta = {
+        "points": num_points, "events": sum(len(p["events"]) for p in points), "frames": num_frames,
+        "size": list(size), "scale": scale, "seed": seed,
+        "python": platform.python_version(), "opencv": cv2.__version__, "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+    return {"meta": meta, "metrics": metrics}
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Compara cada métrica com a linha de base. Retorna as regressões: métricas
+    que pioraram mais que 'threshold' (ex.: 0.2 = 20%) no sentido 'better'.
+    """
+    regressions = []
+    for name, base in baseline["metrics"].items():
+        current = results["metrics"].get(name)
+        if current is None or base["value"] <= 0:
+            continue
+        change = current["value"] / base["value"] - 1
+        worse = change < -threshold if base["better"] == "higher" else change > threshold
+        if worse:
+            regressions.append({"metric": name, "baseline": base["value"], "current": current["value"],
+                                "change": change, "unit": base["unit"]})
+    return regressions
+
+
+def format_results(results: Dict) -> str:
+    lines = [f"{name:<24} {metric['value']:>12.3f} {metric['unit']}"
+             for name, metric in results["metrics"].items()]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do analisador com vídeo e partida sintéticos.")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="JSON com os resultados. Padrão: benchmark_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="JSON da linha de base para comparar. Padrão: benchmark_baseline.json, ao lado deste arquivo.")
+    parser.add_argument("--save-baseline", dest="save_baseline", action="store_true",
+                        help="Grava os resultados como nova linha de base (no arquivo de --baseline), sem comparar.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Piora relativa tolerada. Padrão: 0.2 (20%%)")
+    parser.add_argument("--points", type=int, default=400, help="Pontos da partida sintética. Padrão: 400")
+    parser.add_argument("--frames", type=int, default=300, help="Frames do vídeo sintético. Padrão: 300")
+    parser.add_argument("--width", type=int, default=640, help="Largura do vídeo sintético. Padrão: 640")
+    parser.add_argument("--height", type=int, default=360, help="Altura do vídeo sintético. Padrão: 360")
+    parser.add_argument("--scale", type=int, default=60, help="Escala de exibição em %%. Padrão: 60")
+    parser.add_argument("--seeks", type=int, default=40, help="Número de buscas aleatórias. Padrão: 40")
+    parser.add_argument("--seed", type=int, default=7, help="Semente dos dados sintéticos. Padrão: 7")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_benchmarks(work_dir, args.points, args.frames, (args.width, args.height),
+                                 args.scale, args.seeks, seed=args.seed)
+    print(format_results(results))
+    for path in filter(None, (args.output, args.baseline if args.save_baseline else None)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Resultados gravados em: {path}")
+    if args.save_baseline:
+        sys.exit(0)
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"Linha de base não encontrada: {args.baseline}. Use --save-baseline para criá-la.")
+        sys.exit(0)
+    mismatched = [key for key in COMPARABLE_META if baseline["meta"].get(key) != results["meta"].get(key)]
+    if mismatched:
+        print(f"AVISO: parâmetros diferentes da linha de base ({', '.join(mismatched)}); a comparação é só indicativa.")
+    if any(baseline["meta"].get(key) != results["meta"][key] for key in ("machine", "cpus")):
+        print("AVISO: linha de base gerada em outra máquina; diferenças absolutas são esperadas.")
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    for r in regressions:
+        print(f"REGRESSÃO: {r['metric']} {r['baseline']:.3f} -> {r['current']:.3f} {r['unit']} ({r['change']:+.0%})")
+    if regressions:
+        sys.exit(1)
+    print(f"Sem regressões acima de {args.threshold:.0%} em relação a {args.baseline}.")
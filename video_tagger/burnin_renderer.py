@@ -0,0 +1,217 @@
+import os
+import time
+import queue
+import argparse
+import threading
+from typing import Dict, List
+
+import cv2
+
+from app_state import AppState
+from csv_handler import CSVHandler
+from ui_handler import UIHandler
+
+# Frames em trânsito entre duas etapas (limita a memória se uma etapa atrasar)
+QUEUE_FRAMES = 8
+FOURCC = "mp4v"
+
+
+class BurnInRenderer:
+    """
+    Gera o vídeo da partida com o placar gravado na imagem, sem abrir a
+    interface. O histórico de placares da sessão (o mesmo do analisador) é
+    reproduzido sobre o vídeo e desenhado com o UIHandler.draw_scoreboard.
+
+    A renderização é um pipeline de três threads ligadas por filas limitadas:
+    decodificação -> placar (redimensionar, inverter, desenhar) -> codificação.
+    O OpenCV libera o GIL nessas chamadas, então as etapas usam núcleos
+    diferentes e o ritmo é dado pela etapa mais lenta.
+    """
+
+    def __init__(self, video_path: str, all_points_data: List[Dict], player_names: Dict[str, str],
+                 initial_server: str = "A", scale_percent: int = 100, flip_code: int = None,
+                 queue_frames: int = QUEUE_FRAMES):
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            raise FileNotFoundError(f"Não foi possível abrir o vídeo em: {video_path}")
+        self.fps = capture.get(cv2.CAP_PROP_FPS) or 30
+        self.total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        capture.release()
+
+        self.video_path = video_path
+        self.scale_percent = scale_percent
+        self.flip_code = flip_code
+        self.queue_frames = queue_frames
+        self.state = AppState(player_names["A"], player_names["B"], self.total_frames, initial_server)
+        self.state.fps = self.fps
+        self.state.all_points_data = all_points_data
+        if all_points_data:
+            self.state.rebuild_history()
+        self.ui_handler = UIHandler()
+        self._abort = threading.Event()
+        self._errors = []
+
+    def render(self, output_path: str, start_frame: int = 0, end_frame: int = None) -> Dict:
+        """
+        Renderiza os frames [start_frame, end_frame) em output_path e retorna
+        as métricas: frames/s sustentados e tempo ocupado de cada etapa.
+        """
+        end_frame = self.total_frames if end_frame is None else min(end_frame, self.total_frames)
+        decoded = queue.Queue(maxsize=self.queue_frames)
+        drawn = queue.Queue(maxsize=self.queue_frames)
+        self._abort.clear()
+        self._errors = []
+        busy = {"decode": 0.0, "overlay": 0.0, "encode": 0.0}
+        counts = {"frames": 0}
+
+        stages = [
+            threading.Thread(target=self._guard, args=(self._decode_stage, start_frame, end_frame, decoded, busy)),
+            threading.Thread(target=self._guard, args=(self._overlay_stage, decoded, drawn, busy)),
+            threading.Thread(target=self._guard, args=(self._encode_stage, drawn, output_path, busy, counts)),
+        ]
+        start_time = time.perf_counter()
+        for stage in stages:
+            stage.start()
+        for stage in stages:
+            stage.join()
+        elapsed = time.perf_counter() - start_time
+
+        frames = counts["frames"]
+        fps = frames / elapsed if elapsed > 0 else 0.0
+        stats = {
+            "frames": frames,
+            "elapsed_sec": elapsed,
+            "fps": fps,
+            "realtime_factor": fps / self.fps if self.fps else 0.0,
+            "stage_busy_sec": busy,
+        }
+        if self._errors:
+            stats["errors"] = self._errors
+        return stats
+
+    # --- ETAPAS DO PIPELINE ---
+
+    def _guard(self, stage, *args):
+        """Executa uma etapa; um erro interrompe as demais em vez de travá-las nas filas."""
+        try:
+            stage(*args)
+        except Exception as e:
+            self._errors.append(f"{stage.__name__}: {type(e).__name__}: {e}")
+            self._abort.set()
+
+    def _put(self, jobs: queue.Queue, item) -> bool:
+        while not self._abort.is_set():
+            try:
+                jobs.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, jobs: queue.Queue):
+        while not self._abort.is_set():
+            try:
+                return jobs.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _decode_stage(self, start_frame: int, end_frame: int, out: queue.Queue, busy: Dict):
+        capture = cv2.VideoCapture(self.video_path)
+        try:
+            if start_frame > 0:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+                if int(capture.get(cv2.CAP_PROP_POS_FRAMES)) != start_frame:
+                    # Busca imprecisa: avança do início até o frame pedido
+                    capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    for _ in range(start_frame):
+                        capture.grab()
+            for frame_num in range(start_frame, end_frame):
+                stage_start = time.perf_counter()
+                # read() aloca um novo array por frame: as etapas seguintes são donas dele
+                ret, frame = capture.read()
+                busy["decode"] += time.perf_counter() - stage_start
+                if not ret or not self._put(out, (frame_num, frame)):
+                    break
+        finally:
+            capture.release()
+            self._put(out, None)
+
+    def _overlay_stage(self, source: queue.Queue, out: queue.Queue, busy: Dict):
+        try:
+            while True:
+                item = self._get(source)
+                if item is None:
+                    break
+                stage_start = time.perf_counter()
+                frame_num, frame = item
+                # Mesma busca de placar por frame usada pela interface
+                self.state.current_frame_num = frame_num
+                self.state.update_display_game_for_frame()
+                if self.scale_percent < 100:
+                    size = (int(frame.shape[1] * self.scale_percent / 100), int(frame.shape[0] * self.scale_percent / 100))
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                if self.flip_code is not None:
+                    cv2.flip(frame, self.flip_code, dst=frame)
+                self.ui_handler.draw_scoreboard(frame, self.state.display_score_data)
+                busy["overlay"] += time.perf_counter() - stage_start
+                if not self._put(out, frame):
+                    break
+        finally:
+            self._put(out, None)
+
+    def _encode_stage(self, source: queue.Queue, output_path: str, busy: Dict, counts: Dict):
+        writer = None
+        tmp_path = f"{os.path.splitext(output_path)[0]}.part{os.path.splitext(output_path)[1]}"
+        try:
+            while True:
+                frame = self._get(source)
+                if frame is None:
+                    break
+                stage_start = time.perf_counter()
+                if writer is None:
+                    writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*FOURCC), self.fps,
+                                             (frame.shape[1], frame.shape[0]))
+                    if not writer.isOpened():
+                        raise IOError(f"Não foi possível criar o vídeo em: {output_path}")
+                writer.write(frame)
+                busy["encode"] += time.perf_counter() - stage_start
+                counts["frames"] += 1
+        finally:
+            if writer is not None:
+                writer.release()
+        # Como no transcodificador, o arquivo final só aparece quando está completo
+        if writer is not None and not self._abort.is_set():
+            os.replace(tmp_path, output_path)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera o vídeo da partida com o placar gravado, sem abrir a interface.")
+    parser.add_argument("video_path", help="Caminho para o arquivo de vídeo.")
+    parser.add_argument("csv_path", help="CSV da sessão de análise.")
+    parser.add_argument("-o", "--output", help="Vídeo gerado. Padrão: '<vídeo>_placar.mp4'.")
+    parser.add_argument("--server", choices=["A", "B"], default="A", help="Jogador que inicia sacando. Padrão: A")
+    parser.add_argument("--player_a", default="JOGADOR A", help="Nome do Jogador A. Padrão: 'JOGADOR A'")
+    parser.add_argument("--player_b", default="JOGADOR B", help="Nome do Jogador B. Padrão: 'JOGADOR B'")
+    parser.add_argument("--scale", type=int, default=100, help="Escala do vídeo gerado em %%. Padrão: 100")
+    parser.add_argument("--flip", type=int, choices=[0, 1], help="Inverter vídeo verticalmente (0) ou horizontalmente (1).")
+    parser.add_argument("--start", type=int, default=0, help="Primeiro frame. Padrão: 0")
+    parser.add_argument("--end", type=int, help="Frame final (exclusivo). Padrão: fim do vídeo")
+    args = parser.parse_args()
+
+    output_path = args.output or os.path.splitext(args.video_path)[0] + "_placar.mp4"
+    renderer = BurnInRenderer(args.video_path, CSVHandler(args.csv_path).load_csv(),
+                              {"A": args.player_a, "B": args.player_b}, initial_server=args.server,
+                              scale_percent=args.scale, flip_code=args.flip)
+    result = renderer.render(output_path, args.start, args.end)
+    for error in result.get("errors", []):
+        print(f"ERRO: {error}")
+    busy = result["stage_busy_sec"]
+    print(f"{result['frames']} frames em {result['elapsed_sec']:.1f} s: {result['fps']:.1f} frames/s "
+          f"({result['realtime_factor']:.1f}x o tempo real).")
+    print(f"Tempo ocupado por etapa: decodificação {busy['decode']:.1f} s, placar {busy['overlay']:.1f} s, "
+          f"codificação {busy['encode']:.1f} s.")
+    if "errors" not in result:
+        print(f"Vídeo gerado: {output_path}")
@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
+from collections import deque
 from game_logic import determine_winner # Importa a lógica centralizada
-import copy
 
 class Command(ABC):
-    """Interface para os comandos executáveis."""
+    """
+    Interface para os comandos executáveis.
+
+    execute() retorna True quando altera o estado (e pode ser desfeito).
+    Cada comando guarda o mínimo de estado anterior de que precisa para que
+    undo() e redo() sejam O(1), sem reprocessar a partida.
+    """
     def __init__(self, app_state):
         self.app_state = app_state
 
@@ -11,19 +17,28 @@ class Command(ABC):
     def execute(self):
         pass
 
+    @abstractmethod
+    def undo(self):
+        pass
+
+    def redo(self):
+        return self.execute()
+
 class StartPointCommand(Command):
     def __init__(self, app_state, event_info):
         super().__init__(app_state)
         self.event_info = event_info
+        self._point = None
+        self._first_event = None
 
     def execute(self):
         if self.app_state.current_state == "RECORDING_POINT":
             self.app_state.last_event_info = "ERRO: Ponto atual precisa ser finalizado!"
-            return
+            return False
 
         self.app_state.point_counter += 1
         frame = self.app_state.current_frame_num
-        timestamp = frame / self.app_state.fps if self.app_state.fps > 0 else 0
+        timestamp = self.app_state.timestamp_for_frame(frame)
 
         self.app_state.current_player = self.event_info["code"]
         self.app_state.current_point_data = {
@@ -32,100 +47,236 @@ class StartPointCommand(Command):
         }
         self.app_state.current_state = "RECORDING_POINT"
         self.app_state.last_event_info = f"Ponto {self.app_state.point_counter} iniciado. Sacador: {self.event_info['desc']}"
-        
+
         # Adiciona o evento de início
-        AddEventCommand(self.app_state, self.event_info).execute()
+        self._first_event = AddEventCommand(self.app_state, self.event_info)
+        self._first_event.execute()
+        self._point = self.app_state.current_point_data
+        return True
+
+    def undo(self):
+        self._first_event.undo()
+        if self.app_state.journal is not None:
+            self.app_state.journal.record_delete(self._point["point_id"])
+        self.app_state.point_counter -= 1
+        self.app_state.current_state = "IDLE"
+        self.app_state.current_point_data = None
+        self.app_state.current_player = None
+        self.app_state.last_event_info = f"Desfeito: início do ponto {self._point['point_id']}."
+
+    def redo(self):
+        self.app_state.point_counter += 1
+        self.app_state.current_point_data = self._point
+        self.app_state.current_state = "RECORDING_POINT"
+        self.app_state.current_player = self.event_info["code"]
+        self._first_event.redo()
+        self.app_state.last_event_info = f"Refeito: início do ponto {self._point['point_id']}."
+        return True
 
 class AddEventCommand(Command):
     def __init__(self, app_state, event_info):
         super().__init__(app_state)
         self.event_info = event_info
+        self.event = None
+        self._previous_player = None
 
     def execute(self):
         if self.app_state.current_state != "RECORDING_POINT":
             self.app_state.last_event_info = "ERRO: Inicie um ponto primeiro (A ou B)!"
-            return
+            return False
 
         frame = self.app_state.current_frame_num
-        timestamp = frame / self.app_state.fps if self.app_state.fps > 0 else 0
-        
-        self.app_state.current_point_data["events"].append({
+        timestamp = self.app_state.timestamp_for_frame(frame)
+
+        self.event = {
             "event_code": self.event_info["code"],
             "event_timestamp_sec": timestamp,
             "event_frame": frame,
-        })
+        }
+        self._previous_player = self.app_state.current_player
+        self._append_event()
         self.app_state.last_event_info = f"Golpe: {self.event_info['desc']}"
+        return True
+
+    def _append_event(self):
+        point = self.app_state.current_point_data
+        point["events"].append(self.event)
+        if self.app_state.journal is not None:
+            self.app_state.journal.record_event(point["point_id"], self.event)
         # Alterna o jogador para o próximo golpe
-        self.app_state.current_player = "B" if self.app_state.current_player == "A" else "A"
+        self.app_state.current_player = "B" if self._previous_player == "A" else "A"
+
+    def undo(self):
+        point = self.app_state.current_point_data
+        point["events"].pop()
+        if self.app_state.journal is not None:
+            self.app_state.journal.record_pop_event(point["point_id"])
+        self.app_state.current_player = self._previous_player
+        self.app_state.last_event_info = f"Desfeito: {self.event_info['desc']}"
+
+    def redo(self):
+        self._append_event()
+        self.app_state.last_event_info = f"Refeito: {self.event_info['desc']}"
+        return True
 
 class EndPointCommand(Command):
     def __init__(self, app_state, event_info):
         super().__init__(app_state)
         self.event_info = event_info
+        self._end_event = None
+        self._point = None
+        self._winner = None
+        self._score_before = None
 
     def execute(self):
         if self.app_state.current_state != "RECORDING_POINT":
             self.app_state.last_event_info = "ERRO: Nenhum ponto ativo para finalizar!"
-            return
-        
-        AddEventCommand(self.app_state, self.event_info).execute()
-        
+            return False
+
+        self._end_event = AddEventCommand(self.app_state, self.event_info)
+        self._end_event.execute()
+        self._point = self.app_state.current_point_data
+
         # Usa a função de lógica centralizada
-        point_winner = determine_winner(self.app_state.current_point_data)
-        
-        self.app_state.game.point_won_by(point_winner)
-        self.app_state.add_point_to_history()
-        
-        self.app_state.all_points_data.append(self.app_state.current_point_data)
+        self._winner = determine_winner(self._point)
+        self._complete_point()
         self.app_state.last_event_info = f"Ponto {self.app_state.point_counter} finalizado: {self.event_info['desc']}"
-        
+        return True
+
+    def _complete_point(self, frame_of_point_end=None):
+        # Guarda o placar anterior ao ponto: desfazer é apenas restaurá-lo
+        self._score_before = self.app_state.game.snapshot()
+        self.app_state.game.point_won_by(self._winner)
+        self.app_state.add_point_to_history(frame_of_point_end)
+
+        self.app_state.all_points_data.append(self._point)
+        self.app_state.live_stats.add_point(self._point)
+        if self.app_state.journal is not None:
+            self.app_state.journal.record_point(self._point)
+
         self.app_state.reset_current_point()
 
-    def _determine_winner(self):
-        point_data = self.app_state.current_point_data
-        server = point_data["events"][0]["event_code"]
-        receiver = "B" if server == "A" else "A"
-        num_shots = len(point_data["events"])
-        last_shot_by_server = num_shots % 2 == 1
-        last_event_code = point_data["events"][-1]["event_code"]
-
-        if last_event_code == "W":  # Winner
-            return server if last_shot_by_server else receiver
-        else:  # Error ("E")
-            return receiver if last_shot_by_server else server
-        
+    def undo(self):
+        self.app_state.all_points_data.pop()
+        self.app_state.live_stats.remove_point(self._point)
+        self.app_state.score_timeline.pop()
+        self.app_state.game.restore(self._score_before)
+        # Reabre o ponto sem o evento final
+        self.app_state.current_point_data = self._point
+        self.app_state.current_state = "RECORDING_POINT"
+        self._end_event.undo()
+        if self.app_state.journal is not None:
+            self.app_state.journal.record_reopen(self._point)
+        self.app_state.last_event_info = f"Desfeito: fim do ponto {self._point['point_id']}."
+
+    def redo(self):
+        self._end_event.redo()
+        # O ponto volta a terminar no frame do evento final, e não no frame atual
+        self._complete_point(self._end_event.event["event_frame"])
+        self.app_state.last_event_info = f"Refeito: fim do ponto {self._point['point_id']}."
+        return True
+
 class DeleteLastPointCommand(Command):
     """
     Comando para apagar o último ponto registrado (destrutivo).
+    O placar é restaurado a partir do histórico em O(1), sem recalcular a partida.
     """
+    def __init__(self, app_state):
+        super().__init__(app_state)
+        self._cancelled_point = None
+        self._previous_player = None
+        self._deleted_point = None
+        self._timeline_entry = None
+
     def execute(self):
+        self._cancelled_point = self._deleted_point = self._timeline_entry = None
+
         if self.app_state.current_state == "RECORDING_POINT":
             # Cancela o ponto em andamento
+            self._cancelled_point = self.app_state.current_point_data
+            self._previous_player = self.app_state.current_player
+            if self.app_state.journal is not None:
+                self.app_state.journal.record_delete(self._cancelled_point["point_id"])
             self.app_state.reset_current_point(cancelled=True)
             print("--- Ponto em andamento foi CANCELADO. ---")
-            return
+            return True
 
         if not self.app_state.all_points_data:
             self.app_state.last_event_info = "Nenhum ponto para apagar."
             print("--- Nenhum ponto concluído para apagar. ---")
-            return
-        
+            return False
+
         # Apaga o último ponto e seu histórico
         deleted_point = self.app_state.all_points_data.pop()
-        if self.app_state.game_history:
-            self.app_state.game_history.pop()
+        self.app_state.live_stats.remove_point(deleted_point)
+        if self.app_state.journal is not None:
+            self.app_state.journal.record_delete(deleted_point["point_id"])
+        self._deleted_point = deleted_point
 
         self.app_state.point_counter -= 1
-        
-        # Recalcula todo o estado do jogo do zero para garantir consistência
-        self.app_state.game.reset_match()
-        self.app_state.game_history = []
-        for point_data in self.app_state.all_points_data:
-            winner = determine_winner(point_data)
-            if winner:
-                self.app_state.game.point_won_by(winner)
-                frame_of_point_end = point_data["events"][-1]["event_frame"]
-                self.app_state.game_history.append((frame_of_point_end, copy.deepcopy(self.app_state.game)))
+
+        # Pontos sem vencedor não entram no histórico de placares
+        if determine_winner(deleted_point):
+            self._timeline_entry = self.app_state.score_timeline.pop()
+            self.app_state.game.restore(self.app_state.score_timeline.last_snapshot())
 
         self.app_state.last_event_info = f"Ponto {deleted_point['point_id']} foi APAGADO."
         print(f"--- Último ponto (Ponto {deleted_point['point_id']}) foi APAGADO. O placar foi recalculado. ---")
+        return True
+
+    def undo(self):
+        if self._cancelled_point is not None:
+            point = self._cancelled_point
+            self.app_state.point_counter += 1
+            self.app_state.current_point_data = point
+            self.app_state.current_state = "RECORDING_POINT"
+            self.app_state.current_player = self._previous_player
+            if self.app_state.journal is not None:
+                self.app_state.journal.record_reopen(point)
+            self.app_state.last_event_info = f"Desfeito: cancelamento do ponto {point['point_id']}."
+            return
+
+        point = self._deleted_point
+        self.app_state.all_points_data.append(point)
+        self.app_state.live_stats.add_point(point)
+        self.app_state.point_counter += 1
+        if self._timeline_entry is not None:
+            frame, snapshot = self._timeline_entry
+            self.app_state.score_timeline.append(frame, snapshot)
+            self.app_state.game.restore(snapshot)
+        if self.app_state.journal is not None:
+            self.app_state.journal.record_point(point)
+        self.app_state.last_event_info = f"Desfeito: ponto {point['point_id']} restaurado."
+
+class CommandHistory:
+    """
+    Pilhas de desfazer/refazer. Cada comando executado com sucesso vai para a
+    pilha de desfazer; um novo comando limpa a pilha de refazer.
+    """
+    def __init__(self, app_state, max_size: int = 500):
+        self.app_state = app_state
+        self.undo_stack = deque(maxlen=max_size)
+        self.redo_stack = []
+
+    def execute(self, command):
+        if command.execute():
+            self.undo_stack.append(command)
+            self.redo_stack.clear()
+
+    def undo(self):
+        if not self.undo_stack:
+            self.app_state.last_event_info = "Nada para desfazer."
+            return False
+        command = self.undo_stack.pop()
+        command.undo()
+        self.redo_stack.append(command)
+        return True
+
+    def redo(self):
+        if not self.redo_stack:
+            self.app_state.last_event_info = "Nada para refazer."
+            return False
+        command = self.redo_stack.pop()
+        command.redo()
+        self.undo_stack.append(command)
+        return True
@@ -5,6 +5,21 @@ CONFIG = {
     
     # --- OTIMIZAÇÃO DE DESEMPENHO ---
     "ANALYSIS_SCALE_PERCENT": 60,  # Reduz para 60% para análise, mais rápido
+    "THREADED_DECODE": True,  # Decodifica os próximos frames em uma thread separada
+    "PREFETCH_FRAMES": 8,  # Tamanho do anel de frames pré-decodificados
+    "REPLAY_BUFFER_MB": 512,  # Memória máxima para frames recentes (voltar sem decodificar)
+    "REPLAY_BUFFER_SECONDS": 10,  # Duração máxima guardada no buffer de replay (0 desativa o limite)
+    "TRANSCODE_PROFILE": "scrub",  # "scrub" (GOP curto, buscas rápidas) ou "default"
+    "FRAME_INDEX": True,  # Índice de frames/keyframes salvo ao lado do vídeo para buscas exatas
+    "COLD_START_BUDGET_MS": 1500,  # Tempo máximo esperado da abertura do programa até o primeiro frame
+    "PROXY_DISK_MB": 0,  # Proxy de frames sem compressão na escala de exibição (0 desativa)
+    "PROXY_POINT_MARGIN_SEC": 2.0,  # Margem em torno dos pontos preservada quando o proxy enche
+    "THUMBNAILS": True,  # Miniaturas do vídeo (salvas ao lado dele) para a linha do tempo
+    "THUMBNAIL_INTERVAL_SEC": 0.5,  # Intervalo entre miniaturas
+
+    # --- DIÁRIO DE EVENTOS (RECUPERAÇÃO APÓS QUEDAS) ---
+    "JOURNAL_FSYNC_BATCH": 8,  # fsync a cada N registros (e sempre ao finalizar/apagar um ponto)
+    "JOURNAL_COMPACT_EVERY": 25,  # Reescreve o CSV em segundo plano a cada N pontos
 
     # --- JOGADORES ---
     "PLAYER_A_NAME": "JOGADOR A",
@@ -1,9 +1,50 @@
-import pandas as pd
+import csv
+import numbers
 from typing import List, Dict
 import os
 
+# Colunas gravadas pelo analisador, na ordem do arquivo
+CSV_COLUMNS = ["point_id", "event_code", "event_frame", "event_timestamp_sec"]
+# Colunas com tipo fixo; as demais (de versões antigas do CSV) são lidas como
+# número decimal quando possível, ou mantidas como texto
+INT_COLUMNS = ("point_id", "event_frame")
+STR_COLUMNS = ("event_code", "server", "event_description")
+
+
+def _parse_value(column: str, value: str):
+    """Converte um campo do CSV (separador ';', decimal ',') para o tipo da coluna."""
+    if value == "":
+        return None
+    if column in STR_COLUMNS:
+        return value
+    number = value.replace(",", ".")
+    if column in INT_COLUMNS:
+        return int(float(number))
+    try:
+        return float(number)
+    except ValueError:
+        return value
+
+
+def _format_value(value) -> str:
+    """Formata um valor para o CSV, usando vírgula como separador decimal."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    if isinstance(value, numbers.Real):
+        return repr(float(value)).replace(".", ",")
+    return str(value)
+
+
 class CSVHandler:
-    """Gerencia a leitura e escrita de arquivos CSV para análise de tênis."""
+    """
+    Gerencia a leitura e escrita de arquivos CSV para análise de tênis.
+    Usa apenas o módulo csv da biblioteca padrão, lendo e gravando linha a linha,
+    para não carregar o pandas na inicialização do analisador.
+    """
 
     def __init__(self, csv_path: str):
         self.csv_path = csv_path
@@ -14,71 +55,121 @@ class CSVHandler:
         Retorna uma lista de dicionários, onde cada dicionário representa um ponto.
         """
         try:
-            # Garante que as colunas sejam lidas como string para evitar erros de tipo
-            df = pd.read_csv(self.csv_path, sep=";", decimal=",", dtype={'event_code': str})
-            if df.empty:
+            points = {}
+            with open(self.csv_path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f, delimiter=";")
+                header = next(reader, None)
+                if header is None:
+                    return []
+                for row in reader:
+                    if not row:
+                        continue
+                    try:
+                        event = {column: _parse_value(column, value) for column, value in zip(header, row)}
+                    except ValueError as e:
+                        print(f"Linha {reader.line_num} do CSV ignorada (valor inválido): {e}")
+                        continue
+                    point_id = event.get("point_id")
+                    if point_id is None:
+                        # Linhas sem point_id não pertencem a nenhum ponto
+                        print(f"Linha {reader.line_num} do CSV ignorada (sem point_id).")
+                        continue
+                    point = points.get(point_id)
+                    if point is None:
+                        # O primeiro evento de um ponto determina o sacador
+                        point = points[point_id] = {
+                            "point_id": point_id,
+                            "server": event.get("event_code"),
+                            "events": [],
+                        }
+                    point["events"].append(event)
+            if not points:
                 return []
-            
-            # Agrupa os eventos por 'point_id'
-            grouped_points = df.groupby("point_id")
-            points = []
-            for point_id, events_df in grouped_points:
-                # O primeiro evento de um ponto determina o sacador
-                server = events_df.iloc[0]["event_code"]
-                
-                point_data = {
-                    "point_id": int(point_id),
-                    "server": server,
-                    "events": events_df.to_dict("records"),
-                }
-                points.append(point_data)
             print(f"Análise anterior carregada com sucesso de: {self.csv_path}")
-            return points
+            # Mesma ordem do agrupamento anterior: pontos ordenados por point_id
+            return [points[point_id] for point_id in sorted(points)]
         except FileNotFoundError:
             print("Nenhum arquivo CSV encontrado. Iniciando uma nova análise.")
             return []
-        except Exception as e:
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
             print(f"Erro ao carregar o arquivo CSV: {e}")
             return []
 
     def save_csv(self, all_points_data: List[Dict]):
         """
         Salva todos os dados da análise da sessão atual em um arquivo CSV,
-        sobrescrevendo qualquer arquivo existente.
+        sobrescrevendo qualquer arquivo existente. Retorna True se o arquivo foi salvo.
         """
         if not all_points_data:
             print("Nenhum ponto foi gravado. Nenhum arquivo CSV será gerado.")
-            return
+            return False
+
+        if not any(point["events"] for point in all_points_data):
+            print("Nenhum evento para salvar.")
+            return False
 
         # Garante que o diretório de saída exista
         output_dir = os.path.dirname(self.csv_path)
-        if not os.path.exists(output_dir):
+        if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        # Transforma a lista de pontos em um formato plano para o DataFrame
-        flat_data = []
-        for point in all_points_data:
-            for event in point["events"]:
-                # Cria um dicionário para cada evento
-                event_row = {
-                    "point_id": point["point_id"],
-                    # Adiciona os outros campos do evento
-                    "event_code": event.get("event_code"),
-                    "event_frame": event.get("event_frame"),
-                    "event_timestamp_sec": event.get("event_timestamp_sec"),
-                }
-                flat_data.append(event_row)
-        
-        if not flat_data:
-            print("Nenhum evento para salvar.")
-            return
-
-        new_df = pd.DataFrame(flat_data)
-        
-        # Salva o DataFrame no CSV, sobrescrevendo o arquivo
+        # A escrita vai para um arquivo temporário e só então substitui o CSV,
+        # para nunca deixá-lo pela metade.
+        tmp_path = f"{self.csv_path}.tmp"
         try:
-            new_df.to_csv(self.csv_path, index=False, sep=";", decimal=",",
-                          columns=["point_id", "event_code", "event_frame", "event_timestamp_sec"])
+            with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f, delimiter=";", lineterminator="\n")
+                writer.writerow(CSV_COLUMNS)
+                for point in all_points_data:
+                    for event in point["events"]:
+                        writer.writerow([
+                            _format_value(point["point_id"]),
+                            _format_value(event.get("event_code")),
+                            _format_value(event.get("event_frame")),
+                            _format_value(event.get("event_timestamp_sec")),
+                        ])
+            os.replace(tmp_path, self.csv_path)
             print(f"Análise salva com sucesso em: {self.csv_path}")
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar o arquivo CSV: {e}")
+            return False
+
+    # --- ARQUIVO BINÁRIO (.tmatch) ---
+
+    def export_archive(self, all_points_data: List[Dict] = None, archive_path: str = None,
+                       initial_server: str = "A"):
+        """
+        Grava os pontos (ou, se não informados, os do CSV) no formato binário
+        colunar .tmatch. Retorna o caminho do arquivo gerado, ou None.
+        """
+        from match_archive import MatchArchive, archive_path_for
+
+        if all_points_data is None:
+            all_points_data = self.load_csv()
+        if not all_points_data:
+            print("Nenhum ponto para exportar.")
+            return None
+        archive_path = archive_path or archive_path_for(self.csv_path)
+        try:
+            MatchArchive.write(archive_path, all_points_data, initial_server=initial_server)
+            print(f"Arquivo de partida salvo em: {archive_path}")
+            return archive_path
+        except Exception as e:
+            print(f"Erro ao salvar o arquivo de partida: {e}")
+            return None
+
+    def import_archive(self, archive_path: str) -> List[Dict]:
+        """Carrega os pontos de um arquivo .tmatch, no mesmo formato de load_csv."""
+        from match_archive import MatchArchive
+
+        try:
+            points = MatchArchive(archive_path).to_points()
+            print(f"Arquivo de partida carregado de: {archive_path}")
+            return points
+        except FileNotFoundError:
+            print(f"Arquivo de partida não encontrado: {archive_path}")
+            return []
         except Exception as e:
-            print(f"Erro ao salvar o arquivo CSV: {e}")
\ No newline at end of file
+            print(f"Erro ao carregar o arquivo de partida: {e}")
+            return []
@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+
+
+class DisplayPipeline:
+    """
+    Prepara o frame decodificado para exibição (redimensionamento e flip)
+    escrevendo sempre no mesmo buffer pré-alocado. Depois do primeiro frame,
+    o laço de renderização não aloca mais nenhum array de frame inteiro.
+
+    Com source_size (largura, altura do vídeo), a escala é calculada sobre o
+    tamanho original mesmo que o frame recebido já venha reduzido (ex.: do
+    proxy de frames), que então é apenas copiado.
+    """
+
+    def __init__(self, scale_percent: int = 100, flip_code: int = None, source_size=None):
+        self.scale_percent = scale_percent
+        self.flip_code = flip_code
+        self.source_size = source_size
+        self._buffer = None
+        self.frames_processed = 0
+        self.allocations = 0
+
+    def _output_size(self, frame):
+        if self.source_size is not None:
+            width, height = self.source_size
+        else:
+            height, width = frame.shape[:2]
+        if self.scale_percent < 100:
+            width = int(width * self.scale_percent / 100)
+            height = int(height * self.scale_percent / 100)
+        return width, height
+
+    def process(self, frame):
+        """
+        Retorna o frame pronto para desenhar o overlay. O array retornado é
+        reutilizado na próxima chamada e o frame de origem não é alterado.
+        """
+        width, height = self._output_size(frame)
+        if self._buffer is None or self._buffer.shape != (height, width, 3):
+            # Só acontece no primeiro frame ou se a resolução do vídeo mudar
+            self._buffer = np.empty((height, width, 3), dtype=np.uint8)
+            self.allocations += 1
+
+        if (width, height) != (frame.shape[1], frame.shape[0]):
+            cv2.resize(frame, (width, height), dst=self._buffer, interpolation=cv2.INTER_AREA)
+        else:
+            np.copyto(self._buffer, frame)
+
+        if self.flip_code is not None:
+            cv2.flip(self._buffer, self.flip_code, dst=self._buffer)
+
+        self.frames_processed += 1
+        return self._buffer
+
+    def get_stats(self):
+        """Retorna o número de alocações por frame processado (deve tender a zero)."""
+        frames = self.frames_processed
+        return {
+            "frames": frames,
+            "allocations": self.allocations,
+            "allocations_per_frame": self.allocations / frames if frames else 0.0,
+        }
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class EventJournal:
+    """
+    Diário (journal) append-only das ações de marcação da sessão.
+
+    Cada evento, ponto finalizado e ponto apagado é gravado em uma linha JSON
+    assim que acontece, com fsync em lotes. Ao reabrir a sessão, o diário é
+    reaplicado sobre o último CSV compactado, de modo que uma queda do programa
+    não perde o trabalho. A compactação (reescrita do CSV) roda em segundo plano.
+
+    Operações gravadas:
+        event  - evento adicionado ao ponto em andamento
+        point  - ponto finalizado (dados completos do ponto)
+        delete - ponto (finalizado ou em andamento) apagado
+        pop_event - último evento do ponto em andamento desfeito
+        reopen - ponto finalizado volta a ficar em andamento (fim desfeito)
+    As operações "point", "delete" e "reopen" são idempotentes por point_id,
+    então reaplicar o diário sobre um CSV que já as contém não duplica pontos.
+    """
+
+    def __init__(self, csv_handler, batch_size: int = 8, compact_every: int = 25):
+        self.csv_handler = csv_handler
+        self.path = f"{csv_handler.csv_path}.journal"
+        self.old_path = f"{self.path}.old"
+        self.batch_size = batch_size
+        self.compact_every = compact_every
+        self._file = None
+        self._pending_sync = 0
+        self._points_since_compaction = 0
+        self._lock = threading.Lock()
+        self._compaction_thread = None
+
+    # --- GRAVAÇÃO ---
+
+    def open(self):
+        """Abre o diário para acrescentar registros."""
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _append(self, record: Dict, sync: bool = False):
+        with self._lock:
+            if self._file is None:
+                self.open()
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self._pending_sync += 1
+            if sync or self._pending_sync >= self.batch_size:
+                os.fsync(self._file.fileno())
+                self._pending_sync = 0
+
+    def record_event(self, point_id: int, event: Dict):
+        self._append({"op": "event", "point_id": point_id, "event": event})
+
+    def record_point(self, point_data: Dict):
+        # O fim de um ponto força o fsync do lote pendente
+        self._append({"op": "point", "point": point_data}, sync=True)
+        self._points_since_compaction += 1
+
+    def record_delete(self, point_id: int):
+        self._append({"op": "delete", "point_id": point_id}, sync=True)
+
+    def record_pop_event(self, point_id: int):
+        self._append({"op": "pop_event", "point_id": point_id})
+
+    def record_reopen(self, point_data: Dict):
+        self._append({"op": "reopen", "point": point_data}, sync=True)
+
+    def close(self):
+        """Fecha o diário, removendo o arquivo se ele não tiver registros."""
+        if self.is_compacting():
+            self._compaction_thread.join()
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path) and os.path.getsize(self.path) == 0:
+                os.remove(self.path)
+
+    # --- RECUPERAÇÃO ---
+
+    def has_records(self) -> bool:
+        return any(os.path.exists(p) and os.path.getsize(p) > 0 for p in (self.old_path, self.path))
+
+    def replay(self, points: List[Dict]) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Reaplica o diário sobre os pontos carregados do CSV. Retorna a lista de
+        pontos finalizados e o ponto que estava em andamento (ou None).
+        """
+        completed = {p["point_id"]: p for p in points}
+        in_progress = {}
+        for path in (self.old_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última linha incompleta (queda durante a escrita)
+                        break
+                    op = record["op"]
+                    if op == "event":
+                        point_id = record["point_id"]
+                        point = in_progress.setdefault(point_id, {"point_id": point_id, "events": []})
+                        point["events"].append(record["event"])
+                    elif op == "point":
+                        point = record["point"]
+                        completed[point["point_id"]] = point
+                        in_progress.pop(point["point_id"], None)
+                    elif op == "delete":
+                        completed.pop(record["point_id"], None)
+                        in_progress.pop(record["point_id"], None)
+                    elif op == "pop_event":
+                        point = in_progress.get(record["point_id"])
+                        if point and point["events"]:
+                            point["events"].pop()
+                    elif op == "reopen":
+                        point = record["point"]
+                        completed.pop(point["point_id"], None)
+                        in_progress[point["point_id"]] = point
+
+        all_points = [completed[point_id] for point_id in sorted(completed)]
+        current_point = in_progress[max(in_progress)] if in_progress else None
+        return all_points, current_point
+
+    # --- COMPACTAÇÃO ---
+
+    def should_compact(self) -> bool:
+        return self._points_since_compaction >= self.compact_every and not self.is_compacting()
+
+    def is_compacting(self) -> bool:
+        return self._compaction_thread is not None and self._compaction_thread.is_alive()
+
+    def _rotate(self):
+        """Move o diário atual para o arquivo .old e começa um diário vazio."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                if os.path.exists(self.old_path):
+                    # Sobra de uma compactação interrompida: concatena os dois
+                    with open(self.old_path, "a", encoding="utf-8") as old, open(self.path, encoding="utf-8") as cur:
+                        old.write(cur.read())
+                        old.flush()
+                        os.fsync(old.fileno())
+                    os.remove(self.path)
+                else:
+                    os.replace(self.path, self.old_path)
+            self._points_since_compaction = 0
+            self.open()
+
+    def _write_compacted(self, points_snapshot: List[Dict]):
+        # Sem pontos, o CSV existente não é tocado; o diário .old continua
+        # valendo (ex.: registra que todos os pontos foram apagados).
+        if not points_snapshot or not self.csv_handler.save_csv(points_snapshot):
+            return
+        if os.path.exists(self.old_path):
+            os.remove(self.old_path)
+
+    def compact(self, all_points_data: List[Dict], current_point: Dict = None, background: bool = True):
+        """
+        Reescreve o CSV com o estado atual e descarta o diário já incorporado.
+        A cópia dos pontos é feita aqui, na thread que chama, para que o CSV
+        corresponda exatamente ao momento da rotação do diário. Os eventos do
+        ponto em andamento (que não vão para o CSV) são regravados no novo diário.
+        """
+        if self.is_compacting():
+            self._compaction_thread.join()
+        points_snapshot = [dict(p, events=list(p["events"])) for p in all_points_data]
+        self._rotate()
+        if current_point:
+            for event in current_point["events"]:
+                self.record_event(current_point["point_id"], event)
+        if background:
+            self._compaction_thread = threading.Thread(target=self._write_compacted, args=(points_snapshot,), daemon=True)
+            self._compaction_thread.start()
+        else:
+            self._write_compacted(points_snapshot)
@@ -0,0 +1,237 @@
+import os
+import time
+import argparse
+from typing import Dict, List
+
+import numpy as np
+
+from batch_statistics import discover_matches, opponent_from_path
+from game_logic import PLAYER_CODES, point_outcomes
+from statistics_generator import load_event_arrays
+
+# Campos de cada ponto que possuem índice (valor -> posições dos pontos)
+INDEXED_FIELDS = ("player", "match", "point", "server", "serve_type",
+                  "strokes", "final_stroke", "outcome", "winner")
+
+
+class EventStore:
+    """
+    Base de consultas em memória sobre todos os pontos marcados de um arquivo
+    de partidas (Analises). Cada ponto vira uma linha em arrays colunares, e
+    cada campo de INDEXED_FIELDS tem um índice valor -> posições ordenadas.
+    Filtros são interseções de índices e os resultados ficam em cache.
+
+    Campos por ponto:
+        player        - adversário (nome da pasta '<data> - <jogador>')
+        match         - caminho da partida, relativo à raiz
+        point         - point_id dentro da partida
+        server/winner - 'A', 'B' ou '' (indeterminado)
+        serve_type    - código do saque ('1' ou '2')
+        strokes       - golpes do ponto, saque incluído (sem as marcações do
+                        sacador e de W/E)
+        final_stroke  - golpe que decidiu o ponto ('' se foi direto do saque)
+        outcome       - 'W' (winner) ou 'E' (erro)
+        event_count   - eventos marcados no ponto
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root
+        self.columns: Dict[str, np.ndarray] = {}
+        self.indexes: Dict[str, Dict] = {}
+        self.errors = []
+        self._cache = {}
+
+    @classmethod
+    def load(cls, root: str):
+        """Carrega todas as partidas encontradas sob a raiz."""
+        store = cls(root)
+        store.add_matches(discover_matches(root))
+        return store
+
+    @classmethod
+    def from_paths(cls, paths: List[str], root: str = None):
+        store = cls(root)
+        store.add_matches(paths)
+        return store
+
+    def __len__(self):
+        return len(self.columns.get("point", ()))
+
+    def add_matches(self, paths: List[str]):
+        """Carrega as partidas, ignorando (e registrando) arquivos com erro."""
+        parts = []
+        for path in paths:
+            try:
+                parts.append(self._match_columns(path))
+            except Exception as e:
+                self.errors.append((path, f"{type(e).__name__}: {e}"))
+        if self.columns:
+            parts.insert(0, self.columns)
+        if parts:
+            self.columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        self._build_indexes()
+
+    def _match_columns(self, path: str) -> Dict[str, np.ndarray]:
+        point_ids, codes, offsets = load_event_arrays(path)
+        servers, winners = point_outcomes(codes, offsets)
+        starts, ends = offsets[:-1], offsets[1:]
+        counts = ends - starts
+        num_points = len(point_ids)
+        # Um código vazio no final evita indexar fora do array em partidas sem eventos
+        padded_codes = np.append(codes, "").astype(object)
+
+        def code_at(positions, valid):
+            return np.where(valid, padded_codes[np.clip(positions, 0, len(codes))], "").astype(object)
+
+        players = np.asarray(PLAYER_CODES + ("",), dtype=object)
+        last = code_at(ends - 1, counts > 0)
+        match_name = os.path.relpath(path, self.root) if self.root else path
+        return {
+            "player": np.full(num_points, opponent_from_path(path), dtype=object),
+            "match": np.full(num_points, match_name, dtype=object),
+            "point": point_ids.astype(np.int64),
+            "server": players[servers],
+            "winner": players[winners],
+            "serve_type": code_at(starts + 1, counts > 1),
+            "strokes": np.maximum(counts - 2, 0).astype(np.int64),
+            "final_stroke": code_at(ends - 2, counts > 3),
+            "outcome": np.where(np.isin(last, ("W", "E")), last, "").astype(object),
+            "event_count": counts.astype(np.int64),
+        }
+
+    def _build_indexes(self):
+        """Um índice por campo: valor -> posições (ordenadas) dos pontos."""
+        self.indexes = {}
+        self._cache = {}
+        for field in INDEXED_FIELDS:
+            column = self.columns.get(field)
+            if column is None or len(column) == 0:
+                self.indexes[field] = {}
+                continue
+            values, inverse = np.unique(column, return_inverse=True)
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.cumsum(np.bincount(inverse, minlength=len(values)))[:-1]
+            self.indexes[field] = {
+                value.item() if hasattr(value, "item") else value: positions
+                for value, positions in zip(values, np.split(order, bounds))
+            }
+
+    # --- CONSULTAS ---
+
+    @staticmethod
+    def _cache_key(kind, field, filters):
+        items = tuple(sorted((name, tuple(value) if isinstance(value, (list, tuple, set)) else value)
+                             for name, value in filters.items()))
+        return kind, field, items
+
+    def select(self, **filters) -> np.ndarray:
+        """
+        Posições dos pontos que atendem a todos os filtros. Cada filtro aceita
+        um valor ou uma lista de valores (qualquer um deles).
+        Ex.: select(player="Alan", serve_type="2").
+        """
+        key = self._cache_key("select", None, filters)
+        if key in self._cache:
+            return self._cache[key]
+
+        matches = []
+        for field, value in filters.items():
+            if field not in self.indexes:
+                raise KeyError(f"Campo sem índice: {field}")
+            index = self.indexes[field]
+            if isinstance(value, (list, tuple, set)):
+                # Lista vazia: nenhum valor aceito, nenhum ponto selecionado
+                positions = np.empty(0, dtype=np.int64)
+                if value:
+                    positions = np.unique(np.concatenate([index.get(v, positions) for v in value]))
+            else:
+                positions = index.get(value, np.empty(0, dtype=np.int64))
+            matches.append(positions)
+        # Começa pelos filtros mais seletivos para reduzir as interseções
+        selection = None
+        for positions in sorted(matches, key=len):
+            selection = positions if selection is None else np.intersect1d(selection, positions, assume_unique=True)
+            if len(selection) == 0:
+                break
+        if selection is None:
+            selection = np.arange(len(self), dtype=np.int64)
+
+        selection.flags.writeable = False
+        self._cache[key] = selection
+        return selection
+
+    def count(self, **filters) -> int:
+        return len(self.select(**filters))
+
+    def distribution(self, field: str, **filters) -> Dict:
+        """
+        Contagem de pontos por valor do campo, entre os pontos filtrados.
+        Ex.: distribution("strokes", serve_type="2").
+        """
+        key = self._cache_key("distribution", field, filters)
+        if key in self._cache:
+            return self._cache[key]
+        values = self.columns[field][self.select(**filters)]
+        result = {}
+        if len(values):
+            unique, counts = np.unique(values, return_counts=True)
+            result = {value.item() if hasattr(value, "item") else value: int(count)
+                      for value, count in zip(unique, counts)}
+        self._cache[key] = result
+        return result
+
+    def rows(self, **filters) -> List[Dict]:
+        """Os pontos filtrados como dicionários (para exibir ou exportar)."""
+        selection = self.select(**filters)
+        return [{field: column[i].item() if hasattr(column[i], "item") else column[i]
+                 for field, column in self.columns.items()} for i in selection]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consultas sobre os pontos marcados de uma pasta de partidas.")
+    parser.add_argument("root", help="Pasta raiz (ex.: Analises) ou um único arquivo CSV/.tmatch.")
+    parser.add_argument("--player", help="Adversário (nome da pasta '<data> - <jogador>').")
+    parser.add_argument("--match", help="Partida (caminho relativo à raiz).")
+    parser.add_argument("--point", type=int, help="point_id.")
+    parser.add_argument("--server", choices=["A", "B"], help="Sacador.")
+    parser.add_argument("--serve", dest="serve_type", choices=["1", "2"], help="Tipo de saque (1º ou 2º).")
+    parser.add_argument("--strokes", type=int, help="Número de golpes do ponto, saque incluído.")
+    parser.add_argument("--stroke", dest="final_stroke", help="Golpe final (ex.: F, B, V).")
+    parser.add_argument("--outcome", choices=["W", "E"], help="Resultado: winner (W) ou erro (E).")
+    parser.add_argument("--winner", choices=["A", "B"], help="Vencedor do ponto.")
+    parser.add_argument("--group-by", choices=INDEXED_FIELDS + ("event_count",),
+                        help="Mostra a distribuição por este campo em vez da contagem.")
+    parser.add_argument("--list", action="store_true", help="Lista os pontos encontrados.")
+    args = parser.parse_args()
+
+    load_start = time.perf_counter()
+    if os.path.isdir(args.root) and not args.root.rstrip("/\\").endswith(".tmatch"):
+        store = EventStore.load(args.root)
+    else:
+        store = EventStore.from_paths([args.root])
+    load_ms = (time.perf_counter() - load_start) * 1000
+    print(f"{len(store)} pontos carregados em {load_ms:.0f} ms.")
+    for path, error in store.errors:
+        print(f"Ignorado: {path} ({error})")
+
+    filters = {field: getattr(args, field) for field in
+               ("player", "match", "point", "server", "serve_type", "strokes", "final_stroke", "outcome", "winner")
+               if getattr(args, field) is not None}
+    query_start = time.perf_counter()
+    if args.group_by:
+        result = store.distribution(args.group_by, **filters)
+    else:
+        result = store.count(**filters)
+    query_ms = (time.perf_counter() - query_start) * 1000
+
+    if args.list:
+        for row in store.rows(**filters):
+            print(row)
+    if args.group_by:
+        total = sum(result.values())
+        print(f"\nDistribuição por {args.group_by} ({total} pontos):")
+        for value, count in sorted(result.items()):
+            print(f"  {value!s:>12}: {count:5d} ({count / total:.1%})")
+    else:
+        print(f"\n{result} pontos.")
+    print(f"Consulta em {query_ms:.3f} ms.")
@@ -0,0 +1,88 @@
+import numpy as np
+
+
+class FrameReplayBuffer:
+    """
+    Anel de frames decodificados recentemente, limitado por memória (MB) e/ou
+    por duração (segundos). Permite voltar alguns frames ou rever o último
+    ponto direto da RAM, sem passar pelo decodificador.
+    """
+
+    def __init__(self, max_mb: float = None, max_seconds: float = None, fps: float = 30):
+        if max_mb is None and max_seconds is None:
+            raise ValueError("Informe um limite em MB e/ou em segundos para o buffer de replay.")
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb is not None else None
+        self.max_frames = int(max_seconds * fps) if max_seconds is not None else None
+        self.capacity = None  # definida no primeiro frame, quando o tamanho é conhecido
+
+        self._slots = []
+        self._slot_frame_nums = []
+        self._slot_of = {}
+        self._next_slot = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def _compute_capacity(self, frame):
+        limits = []
+        if self.max_bytes is not None:
+            limits.append(self.max_bytes // max(1, frame.nbytes))
+        if self.max_frames is not None:
+            limits.append(self.max_frames)
+        return max(1, min(limits))
+
+    def __contains__(self, frame_num):
+        return frame_num in self._slot_of
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def put(self, frame_num: int, frame):
+        """Copia o frame para o anel, sobrescrevendo o mais antigo quando cheio."""
+        if frame is None or frame_num in self._slot_of:
+            return
+        if self.capacity is None:
+            self.capacity = self._compute_capacity(frame)
+
+        slot = self._next_slot
+        if slot < len(self._slots):
+            self._slot_of.pop(self._slot_frame_nums[slot], None)
+            if self._slots[slot].shape != frame.shape:
+                self._slots[slot] = np.empty_like(frame)
+            np.copyto(self._slots[slot], frame)
+            self._slot_frame_nums[slot] = frame_num
+        else:
+            # Os buffers são alocados sob demanda até atingir a capacidade
+            self._slots.append(frame.copy())
+            self._slot_frame_nums.append(frame_num)
+        self._slot_of[frame_num] = slot
+        self._next_slot = (slot + 1) % self.capacity
+
+    def get(self, frame_num: int):
+        """
+        Retorna o frame guardado (somente leitura) ou None, contabilizando acertos e falhas.
+        """
+        slot = self._slot_of.get(frame_num)
+        if slot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._slots[slot]
+
+    def clear(self):
+        """Descarta todos os frames guardados, mantendo os buffers alocados."""
+        self._slot_of.clear()
+        self._slot_frame_nums = [-1] * len(self._slot_frame_nums)
+        self._next_slot = 0
+
+    def get_stats(self):
+        """Retorna os contadores de acertos e falhas e a ocupação do buffer."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "frames": len(self._slot_of),
+            "capacity": self.capacity or 0,
+            "memory_mb": sum(s.nbytes for s in self._slots) / (1024 * 1024),
+        }
@@ -0,0 +1,126 @@
+import os
+import shutil
+import subprocess
+import threading
+import cv2
+import numpy as np
+
+
+class FrameIndex:
+    """
+    Índice de posições de um vídeo: número exato de frames, frames-chave
+    (keyframes) e o timestamp real (PTS) de cada frame. É construído uma única
+    vez e salvo em um arquivo ao lado do vídeo para ser reutilizado.
+    """
+    VERSION = 1
+
+    def __init__(self, pts: np.ndarray, keyframes: np.ndarray):
+        self.pts = np.asarray(pts, dtype=np.float64)
+        self.keyframes = np.asarray(keyframes, dtype=np.int64)
+        self.frame_count = len(self.pts)
+
+    @staticmethod
+    def sidecar_path(video_path: str) -> str:
+        return f"{video_path}.frameindex.npz"
+
+    @staticmethod
+    def _video_signature(video_path: str):
+        stat = os.stat(video_path)
+        return [FrameIndex.VERSION, stat.st_size, stat.st_mtime_ns]
+
+    @classmethod
+    def load(cls, video_path: str):
+        """Carrega o índice salvo, se existir e corresponder ao vídeo atual."""
+        path = cls.sidecar_path(video_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if data["meta"].tolist() != cls._video_signature(video_path):
+                    return None
+                return cls(data["pts"], data["keyframes"])
+        except Exception as e:
+            print(f"Índice de frames inválido ({e}); será reconstruído.")
+            return None
+
+    def save(self, video_path: str):
+        """Salva o índice ao lado do vídeo (escrita atômica)."""
+        path = self.sidecar_path(video_path)
+        tmp_path = f"{path[:-len('.npz')]}.tmp.npz"
+        np.savez(tmp_path, pts=self.pts, keyframes=self.keyframes,
+                 meta=np.array(self._video_signature(video_path), dtype=np.int64))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def build(cls, video_path: str):
+        """
+        Varre o vídeo uma vez. Usa o ffprobe (pacotes, sem decodificar) quando
+        disponível; caso contrário, percorre os frames com o OpenCV, o que
+        fornece contagem e timestamps exatos, mas não os keyframes.
+        """
+        if shutil.which("ffprobe"):
+            try:
+                return cls._build_with_ffprobe(video_path)
+            except Exception as e:
+                print(f"Alerta: ffprobe falhou ao indexar o vídeo ({e}). Usando OpenCV.")
+        return cls._build_with_opencv(video_path)
+
+    @classmethod
+    def _build_with_ffprobe(cls, video_path: str):
+        command = ["ffprobe", "-v", "error", "-select_streams", "v:0",
+                   "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video_path]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        packets = []
+        for line in output.splitlines():
+            pts_str, _, flags = line.partition(",")
+            if pts_str in ("", "N/A"):
+                raise ValueError("pacote sem PTS")
+            packets.append((float(pts_str), "K" in flags))
+        if not packets:
+            raise ValueError("nenhum pacote de vídeo encontrado")
+        # Os pacotes vêm na ordem de decodificação; a ordem de exibição segue o PTS
+        packets.sort(key=lambda p: p[0])
+        pts = np.array([p[0] for p in packets]) - packets[0][0]
+        keyframes = np.flatnonzero([p[1] for p in packets])
+        return cls(pts, keyframes)
+
+    @classmethod
+    def _build_with_opencv(cls, video_path: str):
+        stream = cv2.VideoCapture(video_path)
+        pts = []
+        while stream.grab():
+            pts.append(stream.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+        stream.release()
+        return cls(pts, [])
+
+    def keyframe_before(self, frame_num: int) -> int:
+        """Retorna o keyframe mais próximo que precede (ou é) o frame informado."""
+        pos = np.searchsorted(self.keyframes, frame_num, side="right") - 1
+        return int(self.keyframes[pos]) if pos >= 0 else 0
+
+    def timestamp(self, frame_num: int) -> float:
+        """Timestamp real do frame, em segundos a partir do início do vídeo."""
+        return float(self.pts[min(max(frame_num, 0), self.frame_count - 1)])
+
+
+class FrameIndexBuilder(threading.Thread):
+    """
+    Constrói e salva o índice de frames em segundo plano, chamando
+    on_ready(index) quando ele estiver disponível.
+    """
+
+    def __init__(self, video_path: str, on_ready):
+        super().__init__(daemon=True)
+        self.video_path = video_path
+        self.on_ready = on_ready
+
+    def run(self):
+        print("Indexando frames do vídeo em segundo plano...")
+        index = FrameIndex.build(self.video_path)
+        if index.frame_count == 0:
+            return
+        try:
+            index.save(self.video_path)
+        except OSError as e:
+            print(f"Alerta: não foi possível salvar o índice de frames: {e}")
+        self.on_ready(index)
@@ -0,0 +1,98 @@
+import json
+import time
+from typing import Dict
+
+import numpy as np
+
+# Etapas medidas em cada iteração do laço de exibição, na ordem em que ocorrem
+STAGES = ("decode", "score", "resize", "overlay", "imshow", "input")
+# Limites (ms) das faixas dos histogramas; a última faixa é "acima de 66 ms"
+HISTOGRAM_EDGES_MS = (0, 1, 2, 4, 8, 16, 33, 66, np.inf)
+WINDOW_FRAMES = 300
+
+
+class FrameProfiler:
+    """
+    Instrumentação do laço de exibição: tempo de cada etapa por frame, janelas
+    móveis (últimos WINDOW_FRAMES frames) para médias, percentis e histogramas,
+    e contadores de frames atrasados e perdidos durante a reprodução.
+
+    Uso em cada iteração: start_frame(), mark(etapa) ao fim de cada etapa e
+    end_frame(). Com trace_path, cada frame é gravado como uma linha JSON.
+    """
+
+    def __init__(self, fps: float, window: int = WINDOW_FRAMES, trace_path: str = None):
+        self.frame_budget_ms = 1000 / fps if fps > 0 else 0
+        self.window = window
+        self._samples = np.zeros((len(STAGES), window), dtype=np.float64)
+        self._work = np.zeros(window, dtype=np.float64)
+        self._stage_index = {stage: i for i, stage in enumerate(STAGES)}
+        self._current = np.zeros(len(STAGES), dtype=np.float64)
+        self._frame_start = None
+        self._last_mark = None
+        self.frames = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self._trace = open(trace_path, "w", encoding="utf-8") if trace_path else None
+
+    def start_frame(self):
+        self._current[:] = 0
+        self._frame_start = self._last_mark = time.perf_counter()
+
+    def mark(self, stage: str):
+        """Atribui à etapa o tempo decorrido desde a marca anterior."""
+        now = time.perf_counter()
+        self._current[self._stage_index[stage]] += (now - self._last_mark) * 1000
+        self._last_mark = now
+
+    def end_frame(self, frame_num: int, playing: bool):
+        """
+        Fecha o frame. Durante a reprodução, um frame cujo trabalho (tudo menos
+        a espera por tecla) passa do tempo de um frame do vídeo conta como
+        atrasado, e cada período inteiro a mais conta como um frame perdido
+        (que a reprodução em tempo real teria de pular).
+        """
+        if self._frame_start is None:
+            return
+        slot = self.frames % self.window
+        self._samples[:, slot] = self._current
+        work_ms = float(self._current.sum() - self._current[self._stage_index["input"]])
+        self._work[slot] = work_ms
+        self.frames += 1
+        late = playing and self.frame_budget_ms > 0 and work_ms > self.frame_budget_ms
+        if late:
+            self.late_frames += 1
+            self.dropped_frames += int(work_ms // self.frame_budget_ms)
+        if self._trace is not None:
+            record = {"frame": frame_num, "t": round(self._frame_start, 6), "playing": playing,
+                      "stages": {stage: round(float(ms), 4) for stage, ms in zip(STAGES, self._current)},
+                      "work_ms": round(work_ms, 4), "late": late}
+            self._trace.write(json.dumps(record) + "\n")
+        self._frame_start = None
+
+    def summary(self) -> Dict:
+        """Médias, p95 e histogramas de cada etapa na janela móvel, e os contadores."""
+        filled = min(self.frames, self.window)
+        samples = self._samples[:, :filled]
+        stages = {}
+        for stage, values in zip(STAGES, samples):
+            if filled:
+                stages[stage] = {"mean_ms": float(values.mean()), "p95_ms": float(np.percentile(values, 95)),
+                                 "histogram": np.histogram(values, HISTOGRAM_EDGES_MS)[0].tolist()}
+            else:
+                stages[stage] = {"mean_ms": 0.0, "p95_ms": 0.0, "histogram": [0] * (len(HISTOGRAM_EDGES_MS) - 1)}
+        work = self._work[:filled]
+        return {
+            "frames": self.frames,
+            "window": filled,
+            "stages": stages,
+            "work_mean_ms": float(work.mean()) if filled else 0.0,
+            "frame_budget_ms": self.frame_budget_ms,
+            "late_frames": self.late_frames,
+            "dropped_frames": self.dropped_frames,
+        }
+
+    def close(self):
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
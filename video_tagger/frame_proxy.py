@@ -0,0 +1,255 @@
+import os
+import json
+import threading
+from typing import List
+
+import cv2
+import numpy as np
+
+
+class FrameProxy:
+    """
+    Cópia dos frames do vídeo já na escala de exibição, sem compressão, em um
+    arquivo mapeado em memória ao lado do vídeo. Ler um frame guardado é só
+    copiar as páginas do arquivo, sem decodificar nem buscar keyframes.
+
+    O espaço em disco é limitado por max_mb: cada posição (slot) do arquivo
+    guarda um frame e um mapa frame -> slot indica o que está disponível.
+    Enquanto houver slots livres, qualquer frame é guardado; depois disso, só
+    entram frames das regiões em torno dos pontos marcados, que substituem
+    frames fora dessas regiões.
+    """
+    VERSION = 1
+
+    def __init__(self, video_path: str, frame_size, total_frames: int, max_mb: float, margin_frames: int = 0):
+        self.width, self.height = frame_size
+        self.total_frames = max(1, total_frames)
+        frame_bytes = self.width * self.height * 3
+        self.capacity = max(1, min(int(max_mb * 1024 * 1024) // frame_bytes, self.total_frames))
+        self.margin_frames = margin_frames
+        self.video_path = video_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._protected = np.zeros(self.total_frames, dtype=bool)
+
+        expected = self._expected_meta()
+        meta = self._read_meta()
+        shape = (self.capacity, self.height, self.width, 3)
+        if meta is not None and {k: meta.get(k) for k in expected} == expected:
+            self._data = np.memmap(self.sidecar_path(video_path), dtype=np.uint8, mode="r+", shape=shape)
+            self._slot_map = np.lib.format.open_memmap(self._map_path(video_path), mode="r+")
+            self.complete = meta.get("complete", False)
+        else:
+            # Arquivo esparso: o disco só é ocupado à medida que os slots são escritos
+            self._data = np.memmap(self.sidecar_path(video_path), dtype=np.uint8, mode="w+", shape=shape)
+            self._slot_map = np.lib.format.open_memmap(self._map_path(video_path), mode="w+",
+                                                       dtype=np.int32, shape=(self.total_frames,))
+            self._slot_map[:] = -1
+            self.complete = False
+            self._write_meta()
+
+        self._slot_frames = np.full(self.capacity, -1, dtype=np.int64)
+        stored = np.flatnonzero(self._slot_map >= 0)
+        self._slot_frames[self._slot_map[stored]] = stored
+        self._free = np.flatnonzero(self._slot_frames < 0)[::-1].tolist()
+
+    @staticmethod
+    def sidecar_path(video_path: str) -> str:
+        return f"{video_path}.proxy"
+
+    @staticmethod
+    def _map_path(video_path: str) -> str:
+        return f"{video_path}.proxy.map.npy"
+
+    @staticmethod
+    def _meta_path(video_path: str) -> str:
+        return f"{video_path}.proxy.json"
+
+    def _expected_meta(self):
+        stat = os.stat(self.video_path)
+        return {"signature": [self.VERSION, stat.st_size, stat.st_mtime_ns],
+                "size": [self.width, self.height], "capacity": self.capacity, "total_frames": self.total_frames}
+
+    def _read_meta(self):
+        try:
+            with open(self._meta_path(self.video_path), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self):
+        meta = dict(self._expected_meta(), complete=self.complete)
+        tmp_path = f"{self._meta_path(self.video_path)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path(self.video_path))
+
+    def __len__(self):
+        return self.capacity - len(self._free)
+
+    def __contains__(self, frame_num):
+        return 0 <= frame_num < self.total_frames and self._slot_map[frame_num] >= 0
+
+    def set_protected_ranges(self, ranges: List[tuple]):
+        """Define as regiões a preservar: cada ponto (início, fim) mais a margem."""
+        protected = np.zeros(self.total_frames, dtype=bool)
+        for start, end in ranges:
+            protected[max(0, start - self.margin_frames):max(0, end + self.margin_frames + 1)] = True
+        with self._lock:
+            self._protected = protected
+
+    def missing_protected(self) -> np.ndarray:
+        """Frames das regiões dos pontos que ainda não estão guardados, em ordem."""
+        with self._lock:
+            return np.flatnonzero(self._protected & (self._slot_map < 0))
+
+    def wants(self, frame_num: int) -> bool:
+        """Indica se vale a pena guardar o frame (ainda ausente e com espaço para ele)."""
+        if not 0 <= frame_num < self.total_frames or self._slot_map[frame_num] >= 0:
+            return False
+        return bool(self._free) or bool(self._protected[frame_num])
+
+    def get(self, frame_num: int, out: np.ndarray = None):
+        """Copia o frame guardado para out (ou um novo array). Retorna None se ele não estiver guardado."""
+        with self._lock:
+            if frame_num not in self:
+                self.misses += 1
+                return None
+            if out is None or out.shape != (self.height, self.width, 3):
+                out = np.empty((self.height, self.width, 3), dtype=np.uint8)
+            np.copyto(out, self._data[self._slot_map[frame_num]])
+            self.hits += 1
+            return out
+
+    def put(self, frame_num: int, frame: np.ndarray) -> bool:
+        """Guarda o frame na escala do proxy. Retorna False se não houver espaço para ele."""
+        if not self.wants(frame_num):
+            return False
+        if frame.shape[:2] != (self.height, self.width):
+            frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        with self._lock:
+            if frame_num in self:
+                return True
+            if self._free:
+                slot = self._free.pop()
+            elif self._protected[frame_num]:
+                # Orçamento atingido: substitui um frame fora das regiões dos pontos
+                candidates = np.flatnonzero(~self._protected[self._slot_frames])
+                if len(candidates) == 0:
+                    return False
+                slot = int(candidates[0])
+                self._slot_map[self._slot_frames[slot]] = -1
+            else:
+                return False
+            np.copyto(self._data[slot], frame)
+            self._slot_frames[slot] = frame_num
+            self._slot_map[frame_num] = slot
+            return True
+
+    def mark_complete(self):
+        """Registra que o vídeo inteiro já foi percorrido (a próxima sessão não refaz a varredura)."""
+        self.complete = True
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._data.flush()
+            self._slot_map.flush()
+        self._write_meta()
+
+    def get_stats(self):
+        return {"frames": len(self), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "disk_mb": len(self) * self.width * self.height * 3 / (1024 * 1024)}
+
+
+class ProxyBuilder(threading.Thread):
+    """
+    Preenche o proxy em segundo plano. Cada rodada guarda primeiro os frames
+    ausentes das regiões dos pontos (buscando cada região) e, se o vídeo
+    ainda não foi percorrido, faz uma passada completa guardando os frames
+    que o proxy aceitar; os demais são apenas avançados com grab.
+
+    A thread só é iniciada depois que as regiões dos pontos são conhecidas
+    e, terminada a rodada, espera: requeue() (pontos novos ou alterados)
+    dispara uma nova rodada.
+    """
+
+    def __init__(self, video_path: str, proxy: FrameProxy):
+        super().__init__(daemon=True)
+        self.video_path = video_path
+        self.proxy = proxy
+        self.progress = 0.0
+        # Sinalizado quando não há rodada em andamento nem pendente
+        self.idle = threading.Event()
+        self._lock = threading.Lock()
+        self._work_event = threading.Event()
+        self._work_event.set()
+        self._stop_event = threading.Event()
+
+    def requeue(self):
+        """Agenda uma nova rodada (as regiões dos pontos mudaram)."""
+        with self._lock:
+            self.idle.clear()
+            self._work_event.set()
+
+    def cancel(self):
+        self._stop_event.set()
+        self._work_event.set()
+
+    def run(self):
+        while True:
+            self._work_event.wait()
+            if self._stop_event.is_set():
+                return
+            self._work_event.clear()
+            self.build()
+            with self._lock:
+                if not self._work_event.is_set():
+                    self.idle.set()
+
+    def build(self):
+        """Executa uma rodada completa na thread atual."""
+        capture = cv2.VideoCapture(self.video_path)
+        try:
+            self._fill_protected(capture)
+            if not self.proxy.complete:
+                self._scan(capture)
+        except OSError as e:
+            print(f"Alerta: não foi possível gravar o proxy de frames: {e}")
+        finally:
+            capture.release()
+
+    def _fill_protected(self, capture):
+        missing = self.proxy.missing_protected()
+        position = None
+        for i, frame_num in enumerate(missing):
+            if self._stop_event.is_set():
+                return
+            if frame_num != position:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, int(frame_num))
+            ret, frame = capture.read()
+            position = frame_num + 1
+            if ret:
+                self.proxy.put(int(frame_num), frame)
+            self.progress = (i + 1) / len(missing)
+        if len(missing):
+            self.proxy.flush()
+
+    def _scan(self, capture):
+        print("Gerando proxy de frames em segundo plano...")
+        capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        total = self.proxy.total_frames
+        for frame_num in range(total):
+            if self._stop_event.is_set():
+                return
+            if not self.proxy.wants(frame_num):
+                if not capture.grab():
+                    break
+            else:
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                self.proxy.put(frame_num, frame)
+            self.progress = (frame_num + 1) / total
+        self.proxy.mark_complete()
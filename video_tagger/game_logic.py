@@ -1,30 +1,99 @@
+import numpy as np
+
+# Códigos dos jogadores; nos arrays, o jogador é o índice nesta tupla (-1 = nenhum)
+PLAYER_CODES = ("A", "B")
+# Códigos que encerram um ponto
+END_CODES = ("W", "E")
+
+
+def point_winner(server: int, num_events: int, last_code: str) -> int:
+    """
+    Regra do vencedor de um ponto, única fonte usada por determine_winner e
+    (via tabela) por point_outcomes.
+
+    Args:
+        server: Índice do sacador em PLAYER_CODES (-1 = indeterminado).
+        num_events: Número de eventos do ponto, contando a marcação do sacador.
+        last_code: Código do último evento.
+    Returns:
+        O índice do vencedor em PLAYER_CODES, ou -1 se não for possível determinar.
+    """
+    if server not in (0, 1) or last_code not in END_CODES:
+        return -1
+    # O último golpe foi do sacador se o número de eventos for ímpar
+    last_shot_by_server = num_events % 2 == 1
+    # Winner de quem bateu o último golpe ou erro do adversário
+    return server if (last_code == "W") == last_shot_by_server else 1 - server
+
+
+# Vencedor por [sacador, paridade do número de eventos, índice do último código em END_CODES]
+_WINNER_TABLE = np.array([[[point_winner(server, parity, code) for code in END_CODES]
+                           for parity in (0, 1)] for server in (0, 1)], dtype=np.int8)
+
+
+def point_offsets(point_ids: np.ndarray) -> np.ndarray:
+    """
+    Converte os point_id de cada evento (já agrupados por ponto) nos offsets
+    de início de cada ponto: os eventos do ponto i são [offsets[i], offsets[i+1]).
+    """
+    point_ids = np.asarray(point_ids)
+    if len(point_ids) == 0:
+        return np.zeros(1, dtype=np.int64)
+    starts = np.flatnonzero(point_ids[1:] != point_ids[:-1]) + 1
+    return np.concatenate(([0], starts, [len(point_ids)])).astype(np.int64)
+
+
+def point_outcomes(event_codes: np.ndarray, offsets: np.ndarray):
+    """
+    Núcleo vetorizado do resultado dos pontos, usado tanto pelo marcador
+    quanto pelo relatório de estatísticas.
+
+    Args:
+        event_codes: Códigos de todos os eventos, ponto após ponto.
+        offsets: Início de cada ponto em event_codes (ver point_offsets).
+    Returns:
+        (servers, winners): arrays int8 com o índice do sacador e do vencedor
+        de cada ponto (0 = A, 1 = B, -1 = indeterminado).
+    """
+    event_codes = np.asarray(event_codes)
+    offsets = np.asarray(offsets)
+    starts, ends = offsets[:-1], offsets[1:]
+    counts = ends - starts
+    if len(event_codes) == 0:
+        undetermined = np.full(len(counts), -1, dtype=np.int8)
+        return undetermined, undetermined.copy()
+    has_events = counts > 0
+
+    first = np.where(has_events, event_codes[np.minimum(starts, len(event_codes) - 1)], "")
+    last = np.where(has_events, event_codes[np.maximum(ends - 1, 0)], "")
+
+    # O sacador é definido pelo primeiro evento do ponto
+    servers = np.where(first == "A", 0, np.where(first == "B", 1, -1)).astype(np.int8)
+    last_index = np.where(last == "W", 0, np.where(last == "E", 1, -1))
+
+    winners = np.full(len(counts), -1, dtype=np.int8)
+    decided = (servers >= 0) & (last_index >= 0)
+    winners[decided] = _WINNER_TABLE[servers[decided], counts[decided] % 2, last_index[decided]]
+    return servers, winners
+
+
 def determine_winner(point_data: dict) -> str:
     """
     Lógica de negócio centralizada para determinar o vencedor de um ponto
-    com base em sua lista de eventos.
+    com base em sua lista de eventos. Para muitos pontos de uma vez, use
+    point_outcomes.
 
     Args:
-        point_data: Dicionário contendo os eventos do ponto. 
+        point_data: Dicionário contendo os eventos do ponto.
     Returns:
         O código do jogador vencedor ('A' ou 'B') ou None se não for possível determinar.
     """
     if not point_data or not point_data.get("events"):
         return None
-        
+
     events = point_data["events"]
-    # O sacador é definido pelo primeiro evento do ponto
     server = events[0]["event_code"]
-    receiver = "B" if server == "A" else "A"
-    
-    num_shots = len(events)
-    # O último golpe foi do sacador se o número de eventos for ímpar
-    last_shot_by_server = (num_shots % 2 == 1)
-    
-    last_event_code = events[-1]["event_code"]
-
-    if last_event_code == "W":  # Winner
-        return server if last_shot_by_server else receiver
-    elif last_event_code == "E":  # Error
-        return receiver if last_shot_by_server else server
-    
-    return None
\ No newline at end of file
+    if server not in PLAYER_CODES:
+        return None
+    winner = point_winner(PLAYER_CODES.index(server), len(events), events[-1]["event_code"])
+    return PLAYER_CODES[winner] if winner >= 0 else None
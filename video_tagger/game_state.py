@@ -0,0 +1,221 @@
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+# Campos da chave de um estado do placar (inteiros; os três últimos são 0/1)
+STATE_FIELDS = ("points_a", "points_b", "games_a", "games_b", "sets_a", "sets_b",
+                "server", "is_tiebreak", "is_super_tiebreak", "match_over")
+# Com os dois jogadores nesta pontuação, todos os alvos (4, 7 e 10) já foram
+# alcançados: só a diferença e a paridade dos pontos importam. Acima dela o
+# estado é normalizado e o excesso fica no deslocamento (GameState.offset),
+# o que mantém a tabela finita mesmo com iguais (deuce) intermináveis.
+DEUCE_BASE = 9
+
+# Cada transição é um inteiro: próximo código << 3 | fecha set | zera pontos | deslocamento
+CLOSES_SET = 4
+RESETS_POINTS = 2
+SHIFT_MASK = 1
+
+
+def _apply_point(key: Tuple[int, ...], winner: int) -> Tuple[int, ...]:
+    """
+    Regras da partida (melhor de 3 sets, super tie-break no 3º) sobre a chave
+    de um estado, sem normalização. É a referência usada para montar a tabela.
+    """
+    pa, pb, ga, gb, sa, sb, server, tiebreak, super_tiebreak, match_over = key
+    if match_over:
+        return key
+    points, games, sets = [pa, pb], [ga, gb], [sa, sb]
+    points[winner] += 1
+    mine, theirs = points[winner], points[1 - winner]
+    won_set = False
+
+    if tiebreak or super_tiebreak:
+        # Os pontos do tie-break não são zerados ao fim do set (como sempre foi)
+        if (points[0] + points[1]) % 2 == 1:
+            server = 1 - server
+        if mine >= (10 if super_tiebreak else 7) and mine - theirs >= 2:
+            games[winner] += 1
+            won_set = True
+    elif mine >= 4 and mine - theirs >= 2:
+        games[winner] += 1
+        points = [0, 0]
+        server = 1 - server
+        if games[winner] >= 6 and games[winner] - games[1 - winner] >= 2:
+            won_set = True
+        elif games == [6, 6]:
+            tiebreak = 1
+
+    if won_set:
+        sets[winner] += 1
+        games = [0, 0]
+        tiebreak = super_tiebreak = 0
+        if sets == [1, 1]:
+            super_tiebreak = 1
+        if sets[winner] == 2:
+            match_over = 1
+    return (points[0], points[1], games[0], games[1], sets[0], sets[1],
+            server, tiebreak, super_tiebreak, match_over)
+
+
+def _normalize(key: Tuple[int, ...]) -> Tuple[Tuple[int, ...], int]:
+    """Desconta dos dois jogadores os pontos acima de DEUCE_BASE."""
+    shift = max(0, min(key[0], key[1]) - DEUCE_BASE)
+    if shift:
+        key = (key[0] - shift, key[1] - shift) + key[2:]
+    return key, shift
+
+
+class TransitionTable(NamedTuple):
+    """
+    Máquina de estados do placar, pré-calculada. Os estados são numerados
+    (códigos) e cada linha dos arrays corresponde a um código.
+    """
+    keys: list                # código -> chave do estado normalizado
+    index: dict               # chave normalizada -> código
+    transitions: list         # transitions[código][vencedor] -> transição empacotada
+    states: np.ndarray        # (n, len(STATE_FIELDS)) campos de cada estado
+    next_state: np.ndarray    # (n, 2) próximo código por vencedor do ponto
+    closes_set: np.ndarray    # (n, 2) o ponto fecha um set
+    game_point: np.ndarray    # jogador que fecha o game com o próximo ponto (-1 = nenhum)
+    set_point: np.ndarray
+    match_point: np.ndarray
+    break_point: np.ndarray   # game point do recebedor fora de tie-break
+
+
+@lru_cache(maxsize=None)
+def transition_table() -> TransitionTable:
+    """
+    Enumera todos os estados alcançáveis a partir do início da partida (com
+    qualquer um dos sacadores) e pré-calcula as transições e os marcadores de
+    game/set/match point de cada um. Montada uma única vez, na primeira chamada.
+    """
+    # Os códigos 0 e 1 são o início da partida com A ou B sacando
+    keys = [(0, 0, 0, 0, 0, 0, server, 0, 0, 0) for server in (0, 1)]
+    index = {key: code for code, key in enumerate(keys)}
+    transitions, markers = [], []
+
+    code = 0
+    while code < len(keys):
+        key = keys[code]
+        row = []
+        game_point = set_point = match_point = -1
+        for winner in (0, 1):
+            after = _apply_point(key, winner)
+            normalized, shift = _normalize(after)
+            next_code = index.get(normalized)
+            if next_code is None:
+                next_code = index[normalized] = len(keys)
+                keys.append(normalized)
+            closes_set = after[4] + after[5] > key[4] + key[5]
+            resets = after[0] + after[1] < key[0] + key[1]
+            row.append(next_code << 3 | closes_set * CLOSES_SET | resets * RESETS_POINTS | shift)
+
+            if not key[9]:
+                if closes_set or after[2 + winner] > key[2 + winner]:
+                    game_point = winner
+                if closes_set:
+                    set_point = winner
+                if after[9]:
+                    match_point = winner
+        in_tiebreak = key[7] or key[8]
+        break_point = game_point >= 0 and game_point != key[6] and not in_tiebreak
+        transitions.append(row)
+        markers.append((game_point, set_point, match_point, break_point))
+        code += 1
+
+    packed = np.array(transitions, dtype=np.int64)
+    markers = np.array(markers, dtype=np.int8)
+    return TransitionTable(
+        keys=keys,
+        index=index,
+        transitions=transitions,
+        states=np.array(keys, dtype=np.int16),
+        next_state=(packed >> 3).astype(np.int32),
+        closes_set=(packed & CLOSES_SET).astype(bool),
+        game_point=markers[:, 0],
+        set_point=markers[:, 1],
+        match_point=markers[:, 2],
+        break_point=markers[:, 3].astype(bool),
+    )
+
+
+class GameState(NamedTuple):
+    """
+    Estado compacto e imutável do placar: o código do estado na tabela de
+    transições, o deslocamento dos pontos em disputas longas de iguais e o
+    histórico dos sets. É hashable e pode ser compartilhado sem cópia;
+    aplicar um ponto é uma consulta à tabela e devolve um novo GameState.
+    Jogadores são índices (0 = A, 1 = B).
+    """
+    code: int
+    offset: int = 0
+    sets_history: Tuple[Tuple[int, int], ...] = ()
+
+    @classmethod
+    def initial(cls, server: int = 0) -> "GameState":
+        return cls(server)
+
+    @classmethod
+    def from_fields(cls, points, games, sets, server: int, is_tiebreak: bool,
+                    is_super_tiebreak: bool, match_over: bool, sets_history=()) -> "GameState":
+        """Monta o estado a partir dos campos do placar (ex.: de um ScoreSnapshot)."""
+        key = (int(points[0]), int(points[1]), int(games[0]), int(games[1]), int(sets[0]), int(sets[1]),
+               int(server), int(is_tiebreak), int(is_super_tiebreak), int(match_over))
+        normalized, shift = _normalize(key)
+        code = transition_table().index.get(normalized)
+        if code is None:
+            raise ValueError(f"Placar impossível pelas regras da partida: {key}")
+        return cls(code, shift, tuple((int(a), int(b)) for a, b in sets_history))
+
+    def won_by(self, winner: int) -> "GameState":
+        """O estado após o jogador 'winner' ganhar um ponto."""
+        transition = transition_table().transitions[self.code][winner]
+        history = self.sets_history
+        if transition & CLOSES_SET:
+            games = self.games
+            history += ((games[0] + (winner == 0), games[1] + (winner == 1)),)
+        offset = 0 if transition & RESETS_POINTS else self.offset + (transition & SHIFT_MASK)
+        return GameState(transition >> 3, offset, history)
+
+    @property
+    def key(self) -> Tuple[int, ...]:
+        return transition_table().keys[self.code]
+
+    @property
+    def points(self) -> Tuple[int, int]:
+        key = self.key
+        return key[0] + self.offset, key[1] + self.offset
+
+    @property
+    def games(self) -> Tuple[int, int]:
+        return self.key[2:4]
+
+    @property
+    def sets(self) -> Tuple[int, int]:
+        return self.key[4:6]
+
+    @property
+    def server(self) -> int:
+        return self.key[6]
+
+    @property
+    def is_tiebreak(self) -> bool:
+        return bool(self.key[7])
+
+    @property
+    def is_super_tiebreak(self) -> bool:
+        return bool(self.key[8])
+
+    @property
+    def match_over(self) -> bool:
+        return bool(self.key[9])
+
+    @property
+    def match_winner(self) -> int:
+        """Vencedor da partida (-1 enquanto ela não terminou)."""
+        key = self.key
+        if not key[9]:
+            return -1
+        return 0 if key[4] > key[5] else 1
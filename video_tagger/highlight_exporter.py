@@ -0,0 +1,296 @@
+import os
+import time
+import queue
+import argparse
+import subprocess
+import tempfile
+import threading
+from typing import Dict, List, NamedTuple
+
+import cv2
+import numpy as np
+
+from csv_handler import CSVHandler
+from game_logic import point_outcomes
+from score_replay import replay_scores
+from transcoder import ffmpeg_available
+
+# Memória para frames aguardando codificação, dividida entre os escritores.
+# Permite que a leitura avance para os próximos pontos (de outros escritores)
+# enquanto um trecho ainda está sendo codificado.
+WRITER_QUEUE_MB = 512
+FOURCC = "mp4v"
+
+
+class ClipSpec(NamedTuple):
+    """Trecho do vídeo de um ponto: frames [start, end], inclusive."""
+    point_id: int
+    start: int
+    end: int
+    path: str
+
+
+def select_points(all_points_data: List[Dict], initial_server: str = "A", winners_only: bool = False,
+                  min_shots: int = None, break_points: bool = False) -> List[Dict]:
+    """
+    Filtra os pontos marcados: só winners, ralis com mais de min_shots golpes
+    (saque incluído) e/ou pontos disputados em break point. Pontos sem
+    vencedor definido ficam de fora.
+    """
+    codes = np.array([e["event_code"] for p in all_points_data for e in p["events"]], dtype=object)
+    offsets = np.cumsum([0] + [len(p["events"]) for p in all_points_data])
+    _, winners = point_outcomes(codes, offsets)
+    counts = np.diff(offsets)
+
+    keep = winners >= 0
+    if winners_only:
+        last = np.array([p["events"][-1]["event_code"] if p["events"] else "" for p in all_points_data])
+        keep &= last == "W"
+    if min_shots is not None:
+        # Golpes do rali: os eventos sem a marcação do sacador e do resultado
+        keep &= counts - 2 > min_shots
+    if break_points:
+        # Marcador do placar antes de cada ponto (a última linha é o placar final)
+        keep &= replay_scores(winners, initial_server)["break_point"][:-1]
+    return [point for point, selected in zip(all_points_data, keep) if selected]
+
+
+def plan_clips(points: List[Dict], output_dir: str, fps: float, total_frames: int,
+               pad_before: float = 2.0, pad_after: float = 2.0) -> List[ClipSpec]:
+    """Um trecho por ponto, do primeiro ao último evento, com a margem pedida."""
+    clips = []
+    for point in points:
+        frames = [e["event_frame"] for e in point["events"]]
+        if not frames:
+            continue
+        start = max(0, int(min(frames) - pad_before * fps))
+        end = min(total_frames - 1, int(max(frames) + pad_after * fps))
+        path = os.path.join(output_dir, f"ponto_{point['point_id']:03d}.mp4")
+        clips.append(ClipSpec(point["point_id"], start, end, path))
+    return sorted(clips, key=lambda clip: clip.start)
+
+
+class ClipWriterPool:
+    """
+    Escritores em threads (o OpenCV libera o GIL ao redimensionar e codificar).
+    Cada trecho fica sempre com o mesmo escritor, de modo que seus frames são
+    gravados em ordem, e cada escritor tem uma fila limitada de frames.
+    """
+
+    def __init__(self, workers: int, fps: float, scale_percent: int = 100, queue_frames: int = 32):
+        self.fps = fps
+        self.scale_percent = scale_percent
+        self.frames_written = 0
+        self.errors = []
+        self._lock = threading.Lock()
+        self._queues = [queue.Queue(maxsize=queue_frames) for _ in range(max(1, workers))]
+        self._threads = [threading.Thread(target=self._worker, args=(q,), daemon=True) for q in self._queues]
+        for thread in self._threads:
+            thread.start()
+
+    def _queue_for(self, clip_index: int) -> queue.Queue:
+        return self._queues[clip_index % len(self._queues)]
+
+    def open(self, clip_index: int, clip: ClipSpec):
+        self._queue_for(clip_index).put(("open", clip_index, clip))
+
+    def write(self, clip_index: int, frame):
+        self._queue_for(clip_index).put(("frame", clip_index, frame))
+
+    def close(self, clip_index: int):
+        self._queue_for(clip_index).put(("close", clip_index, None))
+
+    def _worker(self, jobs: queue.Queue):
+        writers = {}
+        while True:
+            kind, clip_index, payload = jobs.get()
+            if kind == "stop":
+                break
+            try:
+                if kind == "open":
+                    writers[clip_index] = [payload.path, None]
+                elif kind == "frame":
+                    writer = writers[clip_index]
+                    frame = payload
+                    if self.scale_percent < 100:
+                        size = (int(frame.shape[1] * self.scale_percent / 100),
+                                int(frame.shape[0] * self.scale_percent / 100))
+                        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                    if writer[1] is None:
+                        # O tamanho do trecho só é conhecido no primeiro frame
+                        writer[1] = cv2.VideoWriter(writer[0], cv2.VideoWriter_fourcc(*FOURCC), self.fps,
+                                                    (frame.shape[1], frame.shape[0]))
+                    writer[1].write(frame)
+                    with self._lock:
+                        self.frames_written += 1
+                elif kind == "close":
+                    writer = writers.pop(clip_index)
+                    if writer[1] is not None:
+                        writer[1].release()
+            except Exception as e:
+                self.errors.append(f"{type(e).__name__}: {e}")
+        for _, writer in writers.values():
+            if writer is not None:
+                writer.release()
+
+    def shutdown(self):
+        """Espera os escritores gravarem tudo o que está nas filas."""
+        for jobs in self._queues:
+            jobs.put(("stop", None, None))
+        for thread in self._threads:
+            thread.join()
+
+
+class HighlightExporter:
+    """
+    Exporta os trechos dos pontos em uma única passada sequencial pelo vídeo:
+    uma busca até o início do primeiro trecho, depois os frames são lidos em
+    ordem (entre trechos, apenas avançados com grab, sem converter a imagem) e
+    entregues a todos os trechos que os contêm. A codificação roda no
+    ClipWriterPool, em paralelo à decodificação.
+    """
+
+    def __init__(self, video_path: str, workers: int = None, scale_percent: int = 100):
+        self.video_path = video_path
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.scale_percent = scale_percent
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            raise FileNotFoundError(f"Não foi possível abrir o vídeo em: {video_path}")
+        self.fps = capture.get(cv2.CAP_PROP_FPS) or 30
+        self.total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        frame_bytes = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH) * capture.get(cv2.CAP_PROP_FRAME_HEIGHT) * 3)
+        self.queue_frames = max(8, WRITER_QUEUE_MB * 1024 * 1024 // max(1, frame_bytes) // self.workers)
+        capture.release()
+
+    def export(self, clips: List[ClipSpec]) -> Dict:
+        """Grava os trechos e retorna contadores da exportação."""
+        start_time = time.perf_counter()
+        stats = {"clips": len(clips), "frames_decoded": 0, "frames_skipped": 0}
+        if not clips:
+            stats.update(frames_written=0, elapsed_sec=0.0)
+            return stats
+
+        pool = ClipWriterPool(self.workers, self.fps, self.scale_percent, self.queue_frames)
+        capture = cv2.VideoCapture(self.video_path)
+        frame_num = self._seek(capture, clips[0].start)
+        next_clip, active = 0, []
+        try:
+            while next_clip < len(clips) or active:
+                while next_clip < len(clips) and clips[next_clip].start <= frame_num:
+                    pool.open(next_clip, clips[next_clip])
+                    active.append(next_clip)
+                    next_clip += 1
+                if active:
+                    ret, frame = capture.read()
+                    stats["frames_decoded"] += 1
+                else:
+                    ret, frame = capture.grab(), None
+                    stats["frames_skipped"] += 1
+                if not ret:
+                    break
+                for clip_index in active:
+                    # O mesmo array vai para todos os trechos: read() aloca um novo a cada frame
+                    pool.write(clip_index, frame)
+                for clip_index in [i for i in active if clips[i].end <= frame_num]:
+                    pool.close(clip_index)
+                    active.remove(clip_index)
+                frame_num += 1
+        finally:
+            for clip_index in active:
+                pool.close(clip_index)
+            capture.release()
+            pool.shutdown()
+
+        stats["frames_written"] = pool.frames_written
+        stats["elapsed_sec"] = time.perf_counter() - start_time
+        if pool.errors:
+            stats["errors"] = pool.errors
+        return stats
+
+    @staticmethod
+    def _seek(capture, frame_num: int) -> int:
+        """
+        Posiciona o vídeo no frame (ou antes dele, avançando com grab) e
+        retorna a posição em que a leitura sequencial começa.
+        """
+        if frame_num > 0:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+            if int(capture.get(cv2.CAP_PROP_POS_FRAMES)) != frame_num:
+                # Busca imprecisa: volta ao início e a passada segue do frame 0
+                capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                return 0
+        return frame_num
+
+
+def concatenate_clips(clip_paths: List[str], reel_path: str):
+    """
+    Junta os trechos em um único vídeo. Com ffmpeg, apenas copia os fluxos
+    (sem recodificar); sem ele, relê os trechos (não o vídeo original).
+    """
+    if ffmpeg_available():
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+            for path in clip_paths:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+            list_path = f.name
+        try:
+            subprocess.run(["ffmpeg", "-y", "-v", "error", "-f", "concat", "-safe", "0",
+                            "-i", list_path, "-c", "copy", reel_path], check=True)
+        finally:
+            os.remove(list_path)
+        return
+
+    writer = None
+    for path in clip_paths:
+        capture = cv2.VideoCapture(path)
+        while True:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            if writer is None:
+                fps = capture.get(cv2.CAP_PROP_FPS) or 30
+                writer = cv2.VideoWriter(reel_path, cv2.VideoWriter_fourcc(*FOURCC), fps,
+                                         (frame.shape[1], frame.shape[0]))
+            writer.write(frame)
+        capture.release()
+    if writer is not None:
+        writer.release()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta os melhores momentos (um vídeo por ponto) sem abrir a interface.")
+    parser.add_argument("video_path", help="Caminho para o arquivo de vídeo.")
+    parser.add_argument("csv_path", help="CSV da sessão de análise.")
+    parser.add_argument("-o", "--output-dir", help="Pasta dos trechos. Padrão: '<vídeo>_highlights'.")
+    parser.add_argument("--server", choices=["A", "B"], default="A", help="Jogador que inicia sacando. Padrão: A")
+    parser.add_argument("--winners", action="store_true", help="Somente pontos terminados em winner.")
+    parser.add_argument("--min-shots", type=int, help="Somente ralis com mais de N golpes (saque incluído).")
+    parser.add_argument("--break-points", action="store_true", help="Somente pontos disputados em break point.")
+    parser.add_argument("--pad-before", type=float, default=2.0, help="Segundos antes do primeiro evento. Padrão: 2")
+    parser.add_argument("--pad-after", type=float, default=2.0, help="Segundos após o último evento. Padrão: 2")
+    parser.add_argument("--scale", type=int, default=100, help="Escala dos trechos em %%. Padrão: 100")
+    parser.add_argument("--workers", type=int, help="Escritores em paralelo. Padrão: até 4.")
+    parser.add_argument("--reel", action="store_true", help="Gera também 'melhores_momentos.mp4' com todos os trechos.")
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or os.path.splitext(args.video_path)[0] + "_highlights"
+    os.makedirs(output_dir, exist_ok=True)
+
+    exporter = HighlightExporter(args.video_path, workers=args.workers, scale_percent=args.scale)
+    points = select_points(CSVHandler(args.csv_path).load_csv(), args.server, winners_only=args.winners,
+                           min_shots=args.min_shots, break_points=args.break_points)
+    clips = plan_clips(points, output_dir, exporter.fps, exporter.total_frames, args.pad_before, args.pad_after)
+    print(f"{len(clips)} pontos selecionados.")
+
+    result = exporter.export(clips)
+    for error in result.get("errors", []):
+        print(f"ERRO ao gravar: {error}")
+    elapsed = result["elapsed_sec"]
+    decoded = result["frames_decoded"] + result["frames_skipped"]
+    print(f"{result['clips']} trechos em {output_dir} ({elapsed:.1f} s, "
+          f"{decoded / elapsed if elapsed else 0:.0f} frames/s na passada pelo vídeo).")
+
+    if args.reel and clips:
+        reel_path = os.path.join(output_dir, "melhores_momentos.mp4")
+        concatenate_clips([clip.path for clip in sorted(clips, key=lambda clip: clip.point_id)], reel_path)
+        print(f"Vídeo com todos os trechos: {reel_path}")
@@ -0,0 +1,126 @@
+from collections import defaultdict
+from typing import Dict, List
+
+from game_logic import PLAYER_CODES, determine_winner
+
+# Contadores por jogador, com os mesmos nomes do StatisticsGenerator
+COUNTER_KEYS = (
+    "total_points_played", "points_won", "points_won_serving", "points_won_receiving",
+    "serves_total", "1st_serves_in", "2nd_serves_in", "1st_serve_pts_won", "2nd_serve_pts_won",
+    "return_pts_won_vs_1st_serve", "return_pts_won_vs_2nd_serve", "aces", "double_faults",
+)
+STROKE_KEYS = ("winners_by_stroke", "errors_forced_by_stroke")
+
+
+class LiveStats:
+    """
+    Estatísticas da partida mantidas durante a marcação. Cada ponto concluído
+    é somado (ou subtraído, ao apagar/desfazer) em O(1), sem reprocessar o CSV.
+    As regras são as mesmas do relatório do StatisticsGenerator.
+
+    'version' muda a cada alteração, para que a interface só redesenhe o
+    painel quando os números mudarem.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.stats = {code: self._empty_player() for code in PLAYER_CODES}
+        self.rally_shots = 0
+        self.rally_points = 0
+        self.version = 0
+
+    @staticmethod
+    def _empty_player():
+        player = {key: 0 for key in COUNTER_KEYS}
+        for key in STROKE_KEYS:
+            player[key] = defaultdict(int)
+        return player
+
+    def rebuild(self, all_points_data: List[Dict]):
+        """Recalcula tudo a partir dos pontos (apenas ao carregar uma sessão)."""
+        self.reset()
+        for point in all_points_data:
+            self._apply(point, 1)
+        self.version += 1
+
+    def add_point(self, point_data: Dict):
+        if self._apply(point_data, 1):
+            self.version += 1
+
+    def remove_point(self, point_data: Dict):
+        if self._apply(point_data, -1):
+            self.version += 1
+
+    def _apply(self, point_data: Dict, sign: int) -> bool:
+        """Soma (sign=1) ou subtrai (sign=-1) a contribuição de um ponto."""
+        winner = determine_winner(point_data)
+        if winner is None:
+            return False
+
+        events = point_data["events"]
+        server = events[0]["event_code"]
+        receiver = "B" if server == "A" else "A"
+        # O rali são os eventos após a marcação do sacador: saque, golpes e resultado
+        rally = events[1:]
+        serve_type = rally[0]["event_code"]
+
+        updates = [("A", "total_points_played"), ("B", "total_points_played"),
+                   (winner, "points_won"), (server, "serves_total"),
+                   (winner, "points_won_serving" if winner == server else "points_won_receiving")]
+        if serve_type in ("1", "2"):
+            label = "1st" if serve_type == "1" else "2nd"
+            updates.append((server, f"{label}_serves_in"))
+            if winner == server:
+                updates.append((server, f"{label}_serve_pts_won"))
+            else:
+                updates.append((receiver, f"return_pts_won_vs_{label}_serve"))
+        if len(rally) == 2:
+            # Saque seguido diretamente do resultado
+            if serve_type == "1":
+                updates.append((server, "aces"))
+            elif serve_type == "2":
+                updates.append((server, "double_faults"))
+        for code, key in updates:
+            self.stats[code][key] += sign
+
+        if len(rally) > 2:
+            stroke = rally[-2]["event_code"]
+            key = "winners_by_stroke" if rally[-1]["event_code"] == "W" else "errors_forced_by_stroke"
+            counter = self.stats[winner][key]
+            counter[stroke] += sign
+            if counter[stroke] == 0:
+                del counter[stroke]
+
+        # Golpes do rali, sem contar a marcação do resultado (W/E)
+        self.rally_shots += sign * (len(rally) - 1)
+        self.rally_points += sign
+        return True
+
+    @property
+    def average_rally(self) -> float:
+        return self.rally_shots / self.rally_points if self.rally_points else 0.0
+
+    def summary_lines(self, player_names: Dict[str, str]) -> List[List[str]]:
+        """Linhas do painel: [rótulo, valor de A, valor de B]."""
+        a, b = self.stats["A"], self.stats["B"]
+
+        def serve(player, label):
+            served = player[f"{label}_serves_in"]
+            won = player[f"{label}_serve_pts_won"]
+            return f"{won}/{served} {won / served:.0%}" if served else "-"
+
+        def strokes(counter):
+            return " ".join(f"{stroke}{count}" for stroke, count in counter.items()) or "-"
+
+        return [
+            ["", player_names["A"][:12], player_names["B"][:12]],
+            ["Pontos", str(a["points_won"]), str(b["points_won"])],
+            ["Pts 1o saque", serve(a, "1st"), serve(b, "1st")],
+            ["Pts 2o saque", serve(a, "2nd"), serve(b, "2nd")],
+            ["Aces/DF", f"{a['aces']}/{a['double_faults']}", f"{b['aces']}/{b['double_faults']}"],
+            ["Winners", strokes(a["winners_by_stroke"]), strokes(b["winners_by_stroke"])],
+            ["Erros", strokes(a["errors_forced_by_stroke"]), strokes(b["errors_forced_by_stroke"])],
+            ["Rali medio", f"{self.average_rally:.1f}", ""],
+        ]
@@ -1,30 +1,39 @@
-import cv2
 import time
+# Marca o início do processo antes das importações pesadas (cv2/numpy), para
+# medir o tempo de inicialização até o primeiro frame exibido
+PROCESS_START = time.perf_counter()
+
+import cv2
 import os
-import subprocess
-import copy
 import argparse # Importa a biblioteca de argumentos
 
 # Importações dos módulos do projeto
 from config import CONFIG
 from video_stream import VideoStream
-from scoreboard import Scoreboard
 from ui_handler import UIHandler
+from display_pipeline import DisplayPipeline
 from csv_handler import CSVHandler
+from event_journal import EventJournal
+from match_archive import MatchArchive
 from app_state import AppState
-from commands import StartPointCommand, AddEventCommand, EndPointCommand, DeleteLastPointCommand
-from game_logic import determine_winner
+from frame_profiler import FrameProfiler
+from thumbnail_index import ThumbnailIndex, ThumbnailBuilder, point_ranges
+from transcoder import BackgroundTranscoder, ffmpeg_available, optimized_video_path
+from commands import StartPointCommand, AddEventCommand, EndPointCommand, DeleteLastPointCommand, CommandHistory
 
 class TennisVideoAnalyzer:
     def __init__(self, config, args):
         self.config = config
         self.args = args # Armazena todos os argumentos da linha de comando
 
+        self.transcoder = None
         self._transcode_video()
 
         self.window_name = config["WINDOW_NAME"]
         self.csv_handler = CSVHandler(self.args.output_csv_path)
-        self.vs = VideoStream(self.video_path)
+        self.journal = EventJournal(self.csv_handler, batch_size=config["JOURNAL_FSYNC_BATCH"],
+                                    compact_every=config["JOURNAL_COMPACT_EVERY"])
+        self.vs = self._open_video_stream(self.video_path)
         
         self.total_frames = self.vs.total_frames or 1
         self.fps = self.vs.fps
@@ -37,27 +46,124 @@ class TennisVideoAnalyzer:
             initial_server=self.args.server
         )
         self.state.fps = self.fps
-        self.scoreboard_presenter = Scoreboard()
+        self.state.timestamp_provider = self.vs.timestamp_for_frame
+        self.state.journal = self.journal
+        self.history = CommandHistory(self.state)
         self.ui_handler = UIHandler(self.window_name)
+        cv2.setMouseCallback(self.window_name, self._on_mouse)
+        self.hover_x = None
+        self._ranges_cache = (None, [])
+        self.thumbnails = None
+        self.thumbnail_builder = None
+        self._load_thumbnails()
+        # Usa a escala e o código de flip fornecidos como argumento
+        self.display_pipeline = DisplayPipeline(self.args.scale, self.args.flip,
+                                                source_size=(self.vs.width, self.vs.height))
+        self.cold_start_ms = None
+        self.profiler = FrameProfiler(self.fps, trace_path=self.args.profile_out)
+        self.show_profiler = False
+
+    def _open_video_stream(self, video_path):
+        return VideoStream(
+            video_path,
+            threaded=self.config["THREADED_DECODE"],
+            prefetch_size=self.config["PREFETCH_FRAMES"],
+            replay_buffer_mb=self.config["REPLAY_BUFFER_MB"],
+            replay_buffer_seconds=self.config["REPLAY_BUFFER_SECONDS"],
+            use_frame_index=self.config["FRAME_INDEX"],
+            proxy_mb=self.args.proxy_mb if self.args.proxy_mb is not None else self.config["PROXY_DISK_MB"],
+            proxy_scale_percent=self.args.scale,
+            proxy_margin_sec=self.config["PROXY_POINT_MARGIN_SEC"],
+        )
+
+    def _load_thumbnails(self):
+        """Usa as miniaturas salvas do vídeo ou as gera em segundo plano."""
+        if not self.config["THUMBNAILS"]:
+            return
+        self.thumbnails = ThumbnailIndex.load(self.video_path)
+        if self.thumbnails is None:
+            self.thumbnail_builder = ThumbnailBuilder(self.video_path, self._set_thumbnails,
+                                                      self.config["THUMBNAIL_INTERVAL_SEC"])
+            self.thumbnail_builder.start()
+
+    def _set_thumbnails(self, thumbnails):
+        # Chamado pela thread do ThumbnailBuilder: só troca a referência
+        self.thumbnails = thumbnails
+        self.thumbnail_builder = None
+
+    def _on_mouse(self, event, x, y, flags, param):
+        """
+        Linha do tempo: passar o mouse (ou arrastar) mostra a miniatura da
+        posição; soltar o botão pula para o frame.
+        """
+        if not self.state.show_timeline:
+            self.hover_x = None
+            return
+        dragging = flags & cv2.EVENT_FLAG_LBUTTON
+        if self.ui_handler.timeline_contains(x, y) or dragging or event == cv2.EVENT_LBUTTONUP:
+            self.hover_x = x
+            if event == cv2.EVENT_LBUTTONUP:
+                self.state.set_jump_target(self.ui_handler.timeline_frame_at(x))
+        else:
+            self.hover_x = None
+
+    def _point_ranges(self):
+        """
+        Intervalos dos pontos, recalculados só quando os pontos mudam. As
+        regiões também são repassadas ao proxy de frames, que as preserva.
+        """
+        version = self.state.live_stats.version
+        if self._ranges_cache[0] != version:
+            self._ranges_cache = (version, point_ranges(self.state.all_points_data))
+            self.vs.set_protected_ranges(self._ranges_cache[1])
+        return self._ranges_cache
 
     def _transcode_video(self):
+        """
+        Usa a versão otimizada se ela já existir. Caso contrário, inicia a
+        transcodificação em segundo plano e começa com o vídeo original.
+        """
         original_video_path = self.args.video_path
-        video_dir = os.path.dirname(original_video_path)
-        video_filename = os.path.basename(original_video_path)
-        video_name, _ = os.path.splitext(video_filename)
-        optimized_video_path = os.path.join(video_dir, f"{video_name}_optimized_720p.mp4")
+        optimized_path = optimized_video_path(original_video_path)
         self.video_path = original_video_path
 
-        if not os.path.exists(optimized_video_path):
-            print(f"Versão otimizada não encontrada. Transcodificando...")
-            try:
-                command = ["ffmpeg", "-i", original_video_path, "-c:v", "libx264", "-preset", "fast", "-crf", "23", "-c:a", "copy", "-vf", "scale=-1:720", optimized_video_path]
-                subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-                self.video_path = optimized_video_path
-            except Exception as e:
-                print(f"\nERRO ao transcodificar: {e}\nContinuando com o vídeo original.\n")
+        if os.path.exists(optimized_path):
+            self.video_path = optimized_path
+        elif ffmpeg_available():
+            print(f"Versão otimizada não encontrada. Transcodificando em segundo plano...")
+            capture = cv2.VideoCapture(original_video_path)
+            fps = capture.get(cv2.CAP_PROP_FPS) or 30
+            duration_sec = capture.get(cv2.CAP_PROP_FRAME_COUNT) / fps
+            capture.release()
+            self.transcoder = BackgroundTranscoder(original_video_path, optimized_path, duration_sec,
+                                                   profile=self.config["TRANSCODE_PROFILE"])
+            self.transcoder.start()
         else:
-            self.video_path = optimized_video_path
+            print("\nERRO ao transcodificar: ffmpeg não encontrado.\nContinuando com o vídeo original.\n")
+        print(f"Usando vídeo: {self.video_path}")
+
+    def _swap_to_optimized_video(self):
+        """
+        Troca para o vídeo otimizado assim que a transcodificação termina,
+        mantendo a posição atual (a transcodificação preserva os frames).
+        """
+        optimized_path = self.transcoder.output_path
+        self.transcoder = None
+        try:
+            new_vs = self._open_video_stream(optimized_path)
+        except FileNotFoundError as e:
+            print(f"Alerta: {e}. Continuando com o vídeo original.")
+            return
+        self.vs.stop()
+        self.vs = new_vs
+        self.video_path = optimized_path
+        # A escala de exibição passa a ser calculada sobre a resolução do novo arquivo
+        self.display_pipeline.source_size = (self.vs.width, self.vs.height)
+        self.state.timestamp_provider = self.vs.timestamp_for_frame
+        self.vs.set_protected_ranges(self._ranges_cache[1])
+        # Relê o frame atual no novo arquivo, sem alterar o estado de pausa
+        self.state.jump_target = min(self.state.current_frame_num, self.vs.total_frames - 1)
+        self.state.last_event_info = "Vídeo otimizado carregado."
         print(f"Usando vídeo: {self.video_path}")
 
     def _get_command(self, key):
@@ -71,29 +177,50 @@ class TennisVideoAnalyzer:
         return None
 
     def load_from_csv(self):
-        loaded_points = self.csv_handler.load_csv()
-        if not loaded_points: return
+        archive = None
+        if self.args.archive:
+            # Arquivo binário .tmatch: traz os placares prontos, sem reprocessar a partida
+            archive = MatchArchive(self.args.archive)
+            loaded_points = archive.to_points()
+            print(f"Arquivo de partida carregado de: {self.args.archive}")
+        else:
+            loaded_points = self.csv_handler.load_csv()
+        current_point = None
+        journal_had_records = self.journal.has_records()
+        if journal_had_records:
+            # Reaplica as ações registradas após a última compactação do CSV
+            loaded_points, current_point = self.journal.replay(loaded_points)
+            print(f"Diário reaplicado: {len(loaded_points)} pontos"
+                  f"{' e 1 ponto em andamento' if current_point else ''}.")
+            self.journal.compact(loaded_points, current_point)
+        if not loaded_points and not current_point: return
 
         self.state.all_points_data = loaded_points
-        self.state.game.reset_match()
-        self.state.game_history = []
-
-        for point_data in self.state.all_points_data:
-            winner = determine_winner(point_data)
-            if winner:
-                self.state.game.point_won_by(winner)
-                frame_of_point_end = point_data["events"][-1]["event_frame"]
-                self.state.game_history.append((frame_of_point_end, copy.deepcopy(self.state.game)))
+        if archive is not None and not journal_had_records and archive.initial_server == self.args.server:
+            self.state.load_score_history(*archive.score_checkpoints())
+        else:
+            self.state.rebuild_history()
         
-        if self.state.all_points_data:
-            latest_frame = max(event["event_frame"] for p in self.state.all_points_data for event in p["events"])
-            self.state.current_frame_num = min(latest_frame, self.total_frames - 1)
-            self.state.point_counter = max((p["point_id"] for p in self.state.all_points_data), default=0)
-            self.state.last_event_info = f"Carregado do CSV. {len(self.state.all_points_data)} pontos."
-            print(f"Estado carregado. Iniciando do frame {self.state.current_frame_num}.")
+        all_events = [event for p in self.state.all_points_data for event in p["events"]]
+        if current_point:
+            all_events += current_point["events"]
+            self.state.current_point_data = current_point
+            self.state.current_state = "RECORDING_POINT"
+            # Os golpes se alternam a partir do sacador (primeiro evento do ponto)
+            server = current_point["events"][0]["event_code"]
+            receiver = "B" if server == "A" else "A"
+            self.state.current_player = server if len(current_point["events"]) % 2 == 0 else receiver
+
+        latest_frame = max(event["event_frame"] for event in all_events)
+        self.state.current_frame_num = min(latest_frame, self.total_frames - 1)
+        self.state.point_counter = max([p["point_id"] for p in self.state.all_points_data] +
+                                       [current_point["point_id"] if current_point else 0])
+        source = "do arquivo .tmatch" if archive is not None else "do CSV"
+        if journal_had_records: source += " e do diário"
+        self.state.last_event_info = f"Carregado {source}. {len(self.state.all_points_data)} pontos."
+        print(f"Estado carregado. Iniciando do frame {self.state.current_frame_num}.")
 
     def run(self):
-        scale_percent = self.args.scale # Usa a escala fornecida como argumento
         self.load_from_csv()
         ret, frame = self.vs.read_at_frame(self.state.current_frame_num)
         if not ret:
@@ -102,12 +229,20 @@ class TennisVideoAnalyzer:
 
         while True:
             start_time = time.time()
+            self.profiler.start_frame()
+            if self.transcoder is not None and self.transcoder.done:
+                self._swap_to_optimized_video()
+            elif self.transcoder is not None and self.transcoder.error is not None:
+                self.transcoder = None
+            if self.vs.total_frames != self.total_frames:
+                # O índice de frames ficou pronto com a contagem exata
+                self.total_frames = self.state.total_frames = self.vs.total_frames
             if self.state.jump_target != -1:
                 ret, frame = self.vs.read_at_frame(self.state.jump_target)
                 if ret: self.state.current_frame_num = self.state.jump_target
                 self.state.jump_target = -1
             elif not self.state.is_paused:
-                for _ in range(self.state.frame_increment - 1): self.vs.stream.grab()
+                self.vs.skip(self.state.frame_increment - 1)
                 ret, frame = self.vs.read_sequential()
                 if ret: self.state.current_frame_num += self.state.frame_increment
                 else: self.state.is_paused = True
@@ -116,27 +251,48 @@ class TennisVideoAnalyzer:
                 key = cv2.waitKey(0) & 0xFF
                 if key == ord('x'): break
                 continue
+            self.profiler.mark("decode")
 
             self.state.update_display_game_for_frame()
+            ranges_version, ranges = self._point_ranges()
+            self.profiler.mark("score")
 
-            display_frame = frame.copy()
-            if scale_percent < 100:
-                width = int(display_frame.shape[1] * scale_percent / 100)
-                height = int(display_frame.shape[0] * scale_percent / 100)
-                display_frame = cv2.resize(display_frame, (width, height), interpolation=cv2.INTER_AREA)
-            
-            # Usa o código de flip fornecido como argumento
-            if self.args.flip is not None:
-                display_frame = cv2.flip(display_frame, self.args.flip)
+            # Redimensiona e inverte direto no buffer reutilizado da pipeline
+            display_frame = self.display_pipeline.process(frame)
+            self.profiler.mark("resize")
 
-            self.ui_handler.draw_overlay(display_frame, self.state.current_state, self.state.is_paused, self.state.frame_increment, self.state.last_event_info, f"Frame: {self.state.current_frame_num}/{self.total_frames}")
-            score_data = self.scoreboard_presenter.get_score_data(self.state.display_game)
-            self.ui_handler.draw_scoreboard(display_frame, score_data)
+            background_info = None
+            thumbnail_builder = self.thumbnail_builder
+            if self.transcoder is not None:
+                background_info = f"Otimizando video: {self.transcoder.progress:.0%}"
+            elif self.vs.proxy_builder is not None and not self.vs.proxy_builder.idle.is_set():
+                background_info = f"Gerando proxy: {self.vs.proxy_builder.progress:.0%}"
+            elif thumbnail_builder is not None:
+                background_info = f"Gerando miniaturas: {thumbnail_builder.progress:.0%}"
+            self.ui_handler.draw_overlay(display_frame, self.state.current_state, self.state.is_paused, self.state.frame_increment, self.state.last_event_info, f"Frame: {self.state.current_frame_num}/{self.total_frames}", background_info)
+            scoreboard_margin = 20
+            if self.state.show_timeline:
+                scoreboard_margin += self.ui_handler.draw_timeline(
+                    display_frame, self.thumbnails, ranges, ranges_version,
+                    self.state.current_frame_num, self.total_frames, self.hover_x)
+            self.ui_handler.draw_scoreboard(display_frame, self.state.display_score_data, scoreboard_margin)
+            if self.state.show_stats_panel:
+                self.ui_handler.draw_stats_panel(display_frame, self.state.live_stats, self.state.game.player_names)
+            if self.show_profiler:
+                self.ui_handler.draw_profiler_panel(display_frame, self.profiler)
+            self.profiler.mark("overlay")
             self.ui_handler.show_frame(display_frame)
+            if self.cold_start_ms is None:
+                self._report_cold_start()
+            self.profiler.mark("imshow")
+            playing = not self.state.is_paused
 
             elapsed_ms = (time.time() - start_time) * 1000
             target_duration_ms = (1000 / self.fps) if self.fps > 0 else 0
             wait_time = max(1, int(target_duration_ms - elapsed_ms)) if not self.state.is_paused else 0
+            if self.state.is_paused and self.state.show_timeline:
+                # Pausado com a linha do tempo visível: redesenha para acompanhar o mouse
+                wait_time = 30
             key = cv2.waitKey(wait_time) & 0xFF
             
             if key == ord("x"): break
@@ -147,16 +303,72 @@ class TennisVideoAnalyzer:
             elif key in [ord("k"), ord("K"), ord("j"), ord("l"), ord("J"), ord("L")]:
                 jump_map = {ord("k"): 1, ord("K"): -1, ord("j"): -10, ord("l"): 10, ord("J"): -int(self.fps * 3), ord("L"): int(self.fps * 3)}
                 self.state.set_jump_target(self.state.current_frame_num + jump_map.get(key, 0))
+            elif key == ord("r"):
+                self.state.replay_last_point()
             elif key == ord("z"):
-                DeleteLastPointCommand(self.state).execute()
+                self.history.execute(DeleteLastPointCommand(self.state))
+            elif key == ord("u"):
+                self.history.undo()
+            elif key == ord("y"):
+                self.history.redo()
+            elif key == ord("t"):
+                self.state.show_stats_panel = not self.state.show_stats_panel
+            elif key == ord("g"):
+                self.state.show_timeline = not self.state.show_timeline
+                self.hover_x = None
+            elif key == ord("i"):
+                self.show_profiler = not self.show_profiler
             else:
                 command = self._get_command(key)
-                if command: command.execute()
+                if command: self.history.execute(command)
+
+            if self.journal.should_compact():
+                self.journal.compact(self.state.all_points_data, self.state.current_point_data)
+            # Espera por tecla e tratamento do comando
+            self.profiler.mark("input")
+            self.profiler.end_frame(self.state.current_frame_num, playing)
 
         self.stop_analyzer()
 
+    def _report_cold_start(self):
+        """Mede o tempo da abertura do programa até o primeiro frame exibido."""
+        self.cold_start_ms = (time.perf_counter() - PROCESS_START) * 1000
+        budget_ms = self.config["COLD_START_BUDGET_MS"]
+        status = "dentro do" if self.cold_start_ms <= budget_ms else "ACIMA do"
+        print(f"Inicialização: primeiro frame em {self.cold_start_ms:.0f} ms ({status} orçamento de {budget_ms} ms).")
+
     def stop_analyzer(self):
-        self.csv_handler.save_csv(self.state.all_points_data)
+        # Salva o CSV completo; o ponto em andamento fica no diário para a próxima sessão
+        self.journal.compact(self.state.all_points_data, self.state.current_point_data, background=False)
+        self.journal.close()
+        if self.transcoder is not None:
+            self.transcoder.cancel()
+        thumbnail_builder = self.thumbnail_builder
+        if thumbnail_builder is not None:
+            thumbnail_builder.cancel()
+        if self.vs.threaded:
+            stats = self.vs.get_stats()
+            print(f"Prefetch: {stats['consumer_stalls']} esperas da UI pela decodificação, "
+                  f"{stats['producer_stalls']} esperas do decodificador por espaço no anel.")
+        summary = self.profiler.summary()
+        if summary["frames"]:
+            stages = ", ".join(f"{stage} {values['mean_ms']:.1f}" for stage, values in summary["stages"].items())
+            print(f"Tempo médio por etapa (ms, últimos {summary['window']} frames): {stages}. "
+                  f"{summary['late_frames']} frames atrasados, {summary['dropped_frames']} perdidos.")
+        self.profiler.close()
+        if self.args.profile_out:
+            print(f"Traços por frame gravados em: {self.args.profile_out}")
+        stats = self.display_pipeline.get_stats()
+        print(f"Exibição: {stats['allocations']} alocações de frame em {stats['frames']} frames "
+              f"({stats['allocations_per_frame']:.4f} por frame).")
+        if self.vs.replay_buffer is not None:
+            stats = self.vs.replay_buffer.get_stats()
+            print(f"Buffer de replay: {stats['hits']} acertos, {stats['misses']} falhas "
+                  f"({stats['frames']} frames, {stats['memory_mb']:.0f} MB).")
+        if self.vs.proxy is not None:
+            stats = self.vs.proxy.get_stats()
+            print(f"Proxy de frames: {stats['hits']} acertos, {stats['misses']} falhas "
+                  f"({stats['frames']}/{stats['capacity']} frames, {stats['disk_mb']:.0f} MB em disco).")
         self.vs.stop()
         cv2.destroyAllWindows()
 
@@ -170,6 +382,9 @@ if __name__ == "__main__":
     parser.add_argument("--player_b", default="JOGADOR B", help="Nome do Jogador B. Padrão: 'JOGADOR B'")
     parser.add_argument("--scale", type=int, default=100, help="Escala do vídeo em %% para análise (ex: 50). Padrão: 60")
     parser.add_argument("--flip", type=int, choices=[0, 1], help="Inverter vídeo verticalmente (0) ou horizontalmente (1).")
+    parser.add_argument("--proxy-mb", dest="proxy_mb", type=float, help="Disco máximo (MB) do proxy de frames sem compressão. Padrão: PROXY_DISK_MB do config")
+    parser.add_argument("--profile-out", dest="profile_out", help="Grava o tempo de cada etapa por frame em um arquivo JSON lines.")
+    parser.add_argument("--archive", help="Carrega a análise de um arquivo de partida .tmatch em vez do CSV.")
     
     args = parser.parse_args()
 
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import shutil
+from typing import Dict, List
+
+import numpy as np
+
+from game import ScoreSnapshot
+from game_logic import point_outcomes
+from score_replay import SCORE_STATE_DTYPE, replay_scores, snapshot_from_record
+
+# Tabelas colunares do arquivo .tmatch (arrays estruturados do NumPy)
+POINT_DTYPE = np.dtype([
+    ("point_id", np.int32),
+    ("first_event", np.int32),   # Índice do primeiro evento do ponto em events.npy
+    ("event_count", np.int32),
+    ("winner", np.int8),         # 0 = A, 1 = B, -1 = sem vencedor
+    ("end_frame", np.int64),
+])
+EVENT_DTYPE = np.dtype([
+    ("point_index", np.int32),   # Linha do ponto em points.npy
+    ("code", np.uint8),          # Índice no dicionário de códigos (meta.json)
+    ("frame", np.int64),
+    ("timestamp", np.float64),
+])
+# Placar logo após cada ponto (checkpoint), para abrir sem reprocessar a partida
+SCORE_DTYPE = SCORE_STATE_DTYPE
+
+
+def archive_path_for(csv_path: str) -> str:
+    """Caminho padrão do arquivo .tmatch correspondente a um CSV de sessão."""
+    return f"{os.path.splitext(csv_path)[0]}.tmatch"
+
+
+class MatchArchive:
+    """
+    Arquivo binário colunar de uma partida (diretório <nome>.tmatch).
+
+    Contém points.npy, events.npy e scores.npy (arrays estruturados) e um
+    meta.json com o dicionário de códigos de evento e o sacador inicial.
+    Os arrays são abertos com memory-map, então abrir milhares de partidas
+    não lê os dados do disco até que sejam usados. scores.npy guarda o placar
+    após cada ponto, de modo que carregar a partida não reprocessa o TennisGame.
+    """
+    VERSION = 1
+
+    def __init__(self, path: str, mmap: bool = True):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != self.VERSION:
+            raise ValueError(f"Versão de arquivo de partida não suportada: {self.meta.get('version')}")
+        mmap_mode = "r" if mmap else None
+        self.points = np.load(os.path.join(path, "points.npy"), mmap_mode=mmap_mode)
+        self.events = np.load(os.path.join(path, "events.npy"), mmap_mode=mmap_mode)
+        self.scores = np.load(os.path.join(path, "scores.npy"), mmap_mode=mmap_mode)
+        self.event_codes: List[str] = self.meta["event_codes"]
+        self.initial_server: str = self.meta["initial_server"]
+
+    def __len__(self):
+        return len(self.points)
+
+    @classmethod
+    def write(cls, path: str, all_points_data: List[Dict], initial_server: str = "A") -> "MatchArchive":
+        """
+        Grava os pontos no formato colunar, calculando os checkpoints de placar
+        uma única vez (com o replay em lote do score_replay). A escrita é feita
+        em um diretório temporário e trocada no final, para nunca deixar um
+        arquivo pela metade.
+        """
+        all_codes = [e["event_code"] for p in all_points_data for e in p["events"]]
+        event_codes = sorted(set(all_codes))
+        code_index = {code: i for i, code in enumerate(event_codes)}
+        num_events = len(all_codes)
+
+        points = np.zeros(len(all_points_data), dtype=POINT_DTYPE)
+        events = np.zeros(num_events, dtype=EVENT_DTYPE)
+        scores = np.zeros(len(all_points_data), dtype=SCORE_DTYPE)
+
+        offsets = np.cumsum([0] + [len(p["events"]) for p in all_points_data])
+        _, winners = point_outcomes(np.array(all_codes, dtype=object), offsets)
+        table = replay_scores(winners, initial_server)
+        for name in SCORE_DTYPE.names:
+            scores[name] = table[name][1:]
+
+        event_pos = 0
+        for i, point in enumerate(all_points_data):
+            point_events = point["events"]
+            record = points[i]
+            record["point_id"] = point["point_id"]
+            record["first_event"] = event_pos
+            record["event_count"] = len(point_events)
+            record["winner"] = winners[i]
+            record["end_frame"] = point_events[-1]["event_frame"] if point_events else -1
+            for event in point_events:
+                events[event_pos] = (i, code_index[event["event_code"]], event["event_frame"],
+                                     event.get("event_timestamp_sec") or 0.0)
+                event_pos += 1
+
+        meta = {"version": cls.VERSION, "event_codes": event_codes, "initial_server": initial_server}
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, "points.npy"), points)
+        np.save(os.path.join(tmp_path, "events.npy"), events)
+        np.save(os.path.join(tmp_path, "scores.npy"), scores)
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    # --- ACESSO ---
+
+    def event_code_array(self) -> np.ndarray:
+        """Códigos de evento como array de strings, na ordem dos eventos."""
+        return np.asarray(self.event_codes, dtype=object)[self.events["code"]]
+
+    def point_ids_per_event(self) -> np.ndarray:
+        return self.points["point_id"][self.events["point_index"]]
+
+    def to_points(self) -> List[Dict]:
+        """Converte para a lista de pontos usada pelo analisador (como CSVHandler.load_csv)."""
+        codes = self.event_codes
+        all_points = []
+        for point in self.points:
+            start = int(point["first_event"])
+            point_id = int(point["point_id"])
+            events = [
+                {
+                    "point_id": point_id,
+                    "event_code": codes[event["code"]],
+                    "event_frame": int(event["frame"]),
+                    "event_timestamp_sec": float(event["timestamp"]),
+                }
+                for event in self.events[start:start + int(point["event_count"])]
+            ]
+            all_points.append({
+                "point_id": point_id,
+                "server": events[0]["event_code"] if events else None,
+                "events": events,
+            })
+        return all_points
+
+    def snapshot(self, point_index: int) -> ScoreSnapshot:
+        """Placar logo após o ponto informado (checkpoint gravado)."""
+        return snapshot_from_record(self.scores[point_index])
+
+    def score_checkpoints(self):
+        """
+        Retorna (frames, snapshots) para alimentar o ScoreTimeline: um par por
+        ponto com vencedor, como AppState.rebuild_history produziria.
+        """
+        indices = np.flatnonzero(self.points["winner"] >= 0)
+        frames = self.points["end_frame"][indices].tolist()
+        snapshots = [self.snapshot(i) for i in indices]
+        return frames, snapshots
+
+
+if __name__ == "__main__":
+    from csv_handler import CSVHandler
+
+    parser = argparse.ArgumentParser(description="Converte CSVs de análise para o formato binário .tmatch.")
+    parser.add_argument("csv_paths", nargs="+", help="Arquivos CSV gerados pela análise.")
+    parser.add_argument("--server", choices=["A", "B"], default="A", help="Jogador que inicia sacando. Padrão: A")
+    args = parser.parse_args()
+
+    for csv_path in args.csv_paths:
+        archive_path = CSVHandler(csv_path).export_archive(initial_server=args.server)
+        if archive_path:
+            print(f"{csv_path} -> {archive_path}")
@@ -0,0 +1,205 @@
+import time
+import argparse
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from game_logic import PLAYER_CODES, point_outcomes
+from game_state import GameState, transition_table
+from statistics_generator import load_event_arrays
+
+# Partidas simuladas por lote (arrays pequenos o bastante para ficar no cache)
+CHUNK_SIZE = 1 << 16
+# Taxa usada quando um jogador não tem pontos de saque marcados
+DEFAULT_RATE = 0.5
+
+
+class ServeModel(NamedTuple):
+    """
+    Probabilidades de cada sacador (índice 0 = A, 1 = B). A chance de um
+    jogador ganhar um ponto na devolução é o complemento da do sacador.
+    """
+    first_serve_in: Tuple[float, float]    # fração dos pontos jogados com o 1º saque
+    first_serve_won: Tuple[float, float]   # pontos ganhos pelo sacador com o 1º saque
+    second_serve_won: Tuple[float, float]  # pontos ganhos pelo sacador com o 2º saque
+
+    @classmethod
+    def from_matches(cls, paths: List[str]) -> "ServeModel":
+        """Estima as taxas a partir de partidas marcadas (CSV ou .tmatch)."""
+        # Por sacador: pontos com o 1º saque, ganhos, pontos com o 2º, ganhos
+        counts = np.zeros((2, 4), dtype=np.int64)
+        for path in paths:
+            _, codes, offsets = load_event_arrays(path)
+            if len(codes) == 0:
+                continue
+            servers, winners = point_outcomes(codes, offsets)
+            starts, ends = offsets[:-1], offsets[1:]
+            serve_types = np.where(ends - starts > 1, codes[np.minimum(starts + 1, len(codes) - 1)], "")
+            for server in (0, 1):
+                served = (servers == server) & (winners >= 0)
+                for k, serve_type in enumerate(("1", "2")):
+                    points = served & (serve_types == serve_type)
+                    counts[server, 2 * k] += np.count_nonzero(points)
+                    counts[server, 2 * k + 1] += np.count_nonzero(points & (winners == server))
+
+        def rate(won, played):
+            return tuple(float(w / p) if p else DEFAULT_RATE for w, p in zip(won, played))
+
+        return cls(
+            first_serve_in=rate(counts[:, 0], counts[:, 0] + counts[:, 2]),
+            first_serve_won=rate(counts[:, 1], counts[:, 0]),
+            second_serve_won=rate(counts[:, 3], counts[:, 2]),
+        )
+
+    def adjusted(self, player: int, first_serve_won: float = 0.0, second_serve_won: float = 0.0) -> "ServeModel":
+        """Cenário hipotético: soma os deltas às taxas de saque de um jogador."""
+        def shift(rates, delta):
+            rates = list(rates)
+            rates[player] = min(1.0, max(0.0, rates[player] + delta))
+            return tuple(rates)
+
+        return self._replace(first_serve_won=shift(self.first_serve_won, first_serve_won),
+                             second_serve_won=shift(self.second_serve_won, second_serve_won))
+
+    def serve_win(self) -> np.ndarray:
+        """Probabilidade de cada jogador ganhar um ponto no próprio saque."""
+        first_in = np.asarray(self.first_serve_in)
+        return first_in * np.asarray(self.first_serve_won) + (1 - first_in) * np.asarray(self.second_serve_won)
+
+
+class SimulationResult(NamedTuple):
+    """Distribuições do ponto de vista do jogador A."""
+    matches: int
+    match_win: float              # A vence a partida
+    set_win: float                # A vence o set em andamento
+    game_win: float               # A vence o game em andamento (ou o tie-break)
+    set_scores: Dict[str, float]  # placar final em sets ("2-1") -> fração das partidas
+    current_set_scores: Dict[str, float]  # placar em games do set em andamento ("6-4")
+    average_points: float         # pontos jogados até o fim da partida
+
+
+def simulate_matches(serve_win, num_matches: int = 100_000, state: GameState = None,
+                     seed: int = None, chunk_size: int = CHUNK_SIZE) -> SimulationResult:
+    """
+    Joga num_matches partidas em paralelo, a partir de 'state' (padrão: início
+    da partida com A sacando), com as regras do TennisGame. Cada passo sorteia
+    um ponto para todas as partidas ainda em andamento e avança todas pela
+    tabela de transições de uma vez.
+
+    Args:
+        serve_win: Probabilidade de A e de B ganharem um ponto no próprio saque
+            (ver ServeModel.serve_win).
+    """
+    fsm = transition_table()
+    state = state if state is not None else GameState.initial()
+    if state.match_over:
+        raise ValueError("A partida já terminou.")
+    serve_win = np.asarray(serve_win, dtype=np.float64)
+    # Probabilidade de A ganhar o ponto em cada estado da tabela
+    a_wins_point = np.where(fsm.states[:, 6] == 0, serve_win[0], 1 - serve_win[1]).astype(np.float32)
+    over = fsm.states[:, 9].astype(bool)
+    # Tabelas por transição (código * 2 + vencedor do ponto): próximo estado,
+    # se fecha o game e o placar em games do set que ela fecha (-1 = nenhum)
+    winners = np.tile(np.arange(2), len(over))
+    next_state = fsm.next_state.ravel()
+    closes_game = np.repeat(fsm.game_point, 2) == winners
+    set_games = np.repeat(fsm.states[:, 2:4], 2, axis=0) + np.eye(2, dtype=np.int16)[winners]
+    closes_set = np.where(fsm.closes_set.ravel(), set_games[:, 0] * 16 + set_games[:, 1], -1).astype(np.int16)
+    rng = np.random.default_rng(seed)
+
+    final_sets, set_scores, game_winners, points_played = [], [], [], 0
+    for chunk_start in range(0, num_matches, chunk_size):
+        size = min(chunk_size, num_matches - chunk_start)
+        codes = np.full(size, state.code, dtype=np.int32)
+        game_winner = np.full(size, -1, dtype=np.int8)
+        set_score = np.full(size, -1, dtype=np.int16)
+        # Partidas cujo game / set em andamento ainda não terminou
+        open_games = open_sets = size
+        while codes.size:
+            # Partidas encerradas ficam paradas (a transição é o próprio estado)
+            # até a próxima compactação, que só ocorre quando metade terminou
+            live = codes.size
+            while True:
+                transition = 2 * codes + (rng.random(codes.size, dtype=np.float32) >= a_wins_point[codes])
+                # O primeiro game e o primeiro set fechados são os que estavam em andamento
+                if open_games:
+                    closing = closes_game[transition] & (game_winner < 0)
+                    game_winner[closing] = transition[closing] & 1
+                    open_games -= np.count_nonzero(closing)
+                if open_sets:
+                    closing = (closes_set[transition] >= 0) & (set_score < 0)
+                    set_score[closing] = closes_set[transition[closing]]
+                    open_sets -= np.count_nonzero(closing)
+                codes = next_state[transition]
+                points_played += live
+                finished = over[codes]
+                live = codes.size - np.count_nonzero(finished)
+                if live <= codes.size // 2:
+                    break
+            final_sets.append(fsm.states[codes[finished], 4] * 16 + fsm.states[codes[finished], 5])
+            set_scores.append(set_score[finished])
+            game_winners.append(game_winner[finished])
+            codes, game_winner, set_score = codes[~finished], game_winner[~finished], set_score[~finished]
+
+    final_sets = np.concatenate(final_sets)
+    set_scores = np.concatenate(set_scores)
+
+    def distribution(packed):
+        values, counts = np.unique(packed, return_counts=True)
+        return {f"{value // 16}-{value % 16}": count / num_matches for value, count in zip(values, counts)}
+
+    return SimulationResult(
+        matches=num_matches,
+        match_win=float(np.mean(final_sets // 16 > final_sets % 16)),
+        set_win=float(np.mean(set_scores // 16 > set_scores % 16)),
+        game_win=float(np.mean(np.concatenate(game_winners) == 0)),
+        set_scores=distribution(final_sets),
+        current_set_scores=distribution(set_scores),
+        average_points=points_played / num_matches,
+    )
+
+
+def format_result(result: SimulationResult, player_names: Dict[str, str]) -> str:
+    name_a = player_names["A"]
+    lines = [
+        f"Vitória de {name_a}: partida {result.match_win:.1%} | set atual {result.set_win:.1%} "
+        f"| game atual {result.game_win:.1%}",
+        "Placar em sets: " + ", ".join(f"{score} {share:.1%}" for score, share in sorted(result.set_scores.items())),
+        "Set atual: " + ", ".join(f"{score} {share:.1%}" for score, share in
+                                  sorted(result.current_set_scores.items(), key=lambda item: -item[1])[:8]),
+        f"Pontos por partida: {result.average_points:.1f}",
+    ]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Simula partidas com as taxas de saque estimadas das partidas marcadas.")
+    parser.add_argument("paths", nargs="+", help="Arquivos CSV/.tmatch usados para estimar as taxas.")
+    parser.add_argument("-n", "--matches", type=int, default=1_000_000, help="Partidas simuladas. Padrão: 1000000")
+    parser.add_argument("--server", choices=["A", "B"], default="A", help="Jogador que inicia sacando. Padrão: A")
+    parser.add_argument("--player", choices=["A", "B"], default="A", help="Jogador do cenário hipotético.")
+    parser.add_argument("--first-serve-delta", type=float, default=0.0,
+                        help="Variação nos pontos ganhos com o 1º saque (ex.: 0.05 = +5 pontos percentuais).")
+    parser.add_argument("--second-serve-delta", type=float, default=0.0,
+                        help="Variação nos pontos ganhos com o 2º saque.")
+    parser.add_argument("--seed", type=int, help="Semente do sorteio (resultados reproduzíveis).")
+    args = parser.parse_args()
+
+    names = {"A": "Player A", "B": "Player B"}
+    start = GameState.initial(PLAYER_CODES.index(args.server))
+    model = ServeModel.from_matches(args.paths)
+    scenarios = [("Taxas observadas", model)]
+    if args.first_serve_delta or args.second_serve_delta:
+        scenarios.append(("Cenário hipotético", model.adjusted(
+            PLAYER_CODES.index(args.player), args.first_serve_delta, args.second_serve_delta)))
+
+    for title, scenario in scenarios:
+        serve_win = scenario.serve_win()
+        print(f"\n=== {title} ===")
+        print(f"Pontos ganhos no saque: A {serve_win[0]:.1%} | B {serve_win[1]:.1%}")
+        sim_start = time.perf_counter()
+        result = simulate_matches(serve_win, args.matches, state=start, seed=args.seed)
+        elapsed = time.perf_counter() - sim_start
+        print(format_result(result, names))
+        print(f"{result.matches} partidas em {elapsed:.2f} s ({result.matches / elapsed:,.0f} partidas/s)")
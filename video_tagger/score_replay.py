@@ -0,0 +1,118 @@
+import numpy as np
+
+from game import ScoreSnapshot
+from game_logic import PLAYER_CODES
+from game_state import RESETS_POINTS, SHIFT_MASK, GameState, transition_table
+
+MAX_SETS = 5
+# Estado do placar (o mesmo formato dos checkpoints do arquivo .tmatch)
+SCORE_STATE_FIELDS = [
+    ("points", np.uint16, (2,)),
+    ("games", np.uint8, (2,)),
+    ("sets", np.uint8, (2,)),
+    ("sets_history", np.uint8, (MAX_SETS, 2)),
+    ("set_count", np.uint8),
+    ("server", np.int8),
+    ("is_tiebreak", np.bool_),
+    ("is_super_tiebreak", np.bool_),
+    ("match_over", np.bool_),
+    ("winner_code", np.int8),
+]
+SCORE_STATE_DTYPE = np.dtype(SCORE_STATE_FIELDS)
+# Marcadores de pressão do ponto a ser jogado (jogador que fecha com o ponto, -1 = nenhum)
+SCORE_TABLE_DTYPE = np.dtype(SCORE_STATE_FIELDS + [
+    ("game_point", np.int8),
+    ("break_point", np.bool_),
+    ("set_point", np.int8),
+    ("match_point", np.int8),
+])
+
+
+def snapshot_from_record(record) -> ScoreSnapshot:
+    """Converte uma linha da tabela de placares em ScoreSnapshot."""
+    history = record["sets_history"][:record["set_count"]]
+    return ScoreSnapshot(
+        points=(int(record["points"][0]), int(record["points"][1])),
+        games=(int(record["games"][0]), int(record["games"][1])),
+        sets=(int(record["sets"][0]), int(record["sets"][1])),
+        sets_history=tuple((int(a), int(b)) for a, b in history),
+        server=PLAYER_CODES[record["server"]],
+        is_tiebreak=bool(record["is_tiebreak"]),
+        is_super_tiebreak=bool(record["is_super_tiebreak"]),
+        match_over=bool(record["match_over"]),
+        winner_code=PLAYER_CODES[record["winner_code"]] if record["winner_code"] >= 0 else None,
+    )
+
+
+def replay_codes(winners, initial_server: str = "A"):
+    """
+    Percorre a tabela de transições (game_state.py) com os vencedores dos
+    pontos (0 = A, 1 = B, -1 = ponto sem vencedor, que não altera o placar).
+
+    Returns:
+        (codes, offsets): código do estado e deslocamento dos pontos antes de
+        cada ponto, mais o estado final (len(winners) + 1 posições).
+    """
+    transitions = transition_table().transitions
+    codes, offsets = [], []
+    code, offset = GameState.initial(PLAYER_CODES.index(initial_server)).code, 0
+    for winner in np.asarray(winners, dtype=np.int8).tolist():
+        codes.append(code)
+        offsets.append(offset)
+        if winner < 0:
+            continue
+        transition = transitions[code][winner]
+        offset = 0 if transition & RESETS_POINTS else offset + (transition & SHIFT_MASK)
+        code = transition >> 3
+    codes.append(code)
+    offsets.append(offset)
+    return np.array(codes, dtype=np.int32), np.array(offsets, dtype=np.int32)
+
+
+def replay_scores(winners, initial_server: str = "A") -> np.ndarray:
+    """
+    Reprocessa uma partida inteira de uma vez a partir dos vencedores dos
+    pontos (0 = A, 1 = B, -1 = ponto sem vencedor, que não altera o placar).
+
+    Retorna uma tabela com len(winners) + 1 linhas (SCORE_TABLE_DTYPE): a linha
+    i é o placar antes do ponto i, com os marcadores de game/break/set/match
+    point desse ponto, e a última linha é o placar final. As regras são as
+    mesmas do TennisGame: a mesma tabela de transições (game_state.py).
+    """
+    winners = np.asarray(winners, dtype=np.int8)
+    fsm = transition_table()
+    # O laço só percorre a tabela de transições; o resto é decodificado em lote
+    codes, offsets = replay_codes(winners, initial_server)
+
+    state = fsm.states[codes]
+    table = np.zeros(len(codes), dtype=SCORE_TABLE_DTYPE)
+    table["points"] = state[:, 0:2] + offsets[:, None]
+    table["games"] = state[:, 2:4]
+    table["sets"] = state[:, 4:6]
+    table["server"] = state[:, 6]
+    table["is_tiebreak"] = state[:, 7]
+    table["is_super_tiebreak"] = state[:, 8]
+    table["match_over"] = state[:, 9]
+    table["winner_code"] = np.where(state[:, 9] == 1, (state[:, 5] > state[:, 4]).astype(np.int8), -1)
+    for field in ("game_point", "break_point", "set_point", "match_point"):
+        table[field] = getattr(fsm, field)[codes]
+
+    # Os sets só se acumulam: o histórico de cada linha é um prefixo do final.
+    # Cada set fechado registra os games antes do ponto, mais o do vencedor.
+    decided = np.flatnonzero(winners >= 0)
+    closing = decided[fsm.closes_set[codes[decided], winners[decided]]]
+    history = state[closing, 2:4] + np.eye(2, dtype=np.int16)[winners[closing]]
+    set_count = state[:, 4] + state[:, 5]
+    table["set_count"] = set_count
+    for k, set_score in enumerate(history[:MAX_SETS]):
+        table["sets_history"][set_count > k, k] = set_score
+    return table
+
+
+def snapshots_after_points(table: np.ndarray, winners) -> list:
+    """
+    Os (índice, ScoreSnapshot) logo após cada ponto com vencedor, como o
+    AppState.rebuild_history registra no histórico de placares.
+    """
+    decided = np.flatnonzero(np.asarray(winners) >= 0)
+    return [(int(i), snapshot_from_record(table[i + 1])) for i in decided]
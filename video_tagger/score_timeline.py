@@ -0,0 +1,88 @@
+from bisect import bisect_right, insort
+from typing import Dict, List
+
+from scoreboard import Scoreboard
+
+
+class ScoreTimeline:
+    """
+    Índice ordenado de placares por frame. Cada ponto concluído guarda o frame
+    em que terminou e um ScoreSnapshot imutável do placar logo após o ponto.
+    A busca pelo placar de um frame é feita por bisect, e o dicionário já
+    formatado pelo Scoreboard só é recalculado quando o ponto exibido muda.
+    """
+
+    def __init__(self, game, scoreboard: Scoreboard = None):
+        self.player_names = dict(game.player_names)
+        self.scoreboard = scoreboard or Scoreboard()
+        self.initial_snapshot = game.snapshot()
+        self.frames: List[int] = []
+        self.snapshots = []
+        # Registros na ordem em que foram adicionados (pop remove o mais recente)
+        self._appended = []
+        self._cached_index = None
+        self._cached_data = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def append(self, frame: int, snapshot):
+        """Registra o placar ao final de um ponto terminado no frame informado."""
+        if not self.frames or frame >= self.frames[-1]:
+            self.frames.append(frame)
+            self.snapshots.append(snapshot)
+        else:
+            # Ponto marcado antes de outro já existente: mantém o índice ordenado
+            position = bisect_right(self.frames, frame)
+            insort(self.frames, frame)
+            self.snapshots.insert(position, snapshot)
+        self._appended.append((frame, snapshot))
+        self._cached_index = None
+
+    def pop(self):
+        """Remove o último registro adicionado e o retorna como (frame, snapshot)."""
+        frame, snapshot = self._appended.pop()
+        position = bisect_right(self.frames, frame) - 1
+        while self.snapshots[position] is not snapshot:
+            position -= 1
+        del self.frames[position]
+        del self.snapshots[position]
+        self._cached_index = None
+        return frame, snapshot
+
+    def last_snapshot(self):
+        """Placar após o último ponto adicionado (ou o inicial, se não houver)."""
+        return self._appended[-1][1] if self._appended else self.initial_snapshot
+
+    def clear(self):
+        """Remove todos os registros (antes de recalcular a partida inteira)."""
+        self.frames = []
+        self.snapshots = []
+        self._appended = []
+        self._cached_index = None
+
+    def set_win_model(self, win_model):
+        """Troca o modelo de probabilidade de vitória exibido no placar."""
+        self.scoreboard.win_model = win_model
+        self._cached_index = None
+
+    def index_for_frame(self, frame_num: int) -> int:
+        """Índice do último ponto encerrado até o frame, ou -1 antes do primeiro ponto."""
+        return bisect_right(self.frames, frame_num) - 1
+
+    def snapshot_for_frame(self, frame_num: int):
+        """Retorna o ScoreSnapshot válido para o frame informado."""
+        index = self.index_for_frame(frame_num)
+        return self.snapshots[index] if index >= 0 else self.initial_snapshot
+
+    def score_data_for_frame(self, frame_num: int) -> Dict:
+        """
+        Retorna os dados de placar formatados para o frame. O resultado é
+        reaproveitado enquanto o frame estiver dentro do mesmo ponto.
+        """
+        index = self.index_for_frame(frame_num)
+        if index != self._cached_index:
+            snapshot = self.snapshots[index] if index >= 0 else self.initial_snapshot
+            self._cached_data = self.scoreboard.get_snapshot_data(snapshot, self.player_names)
+            self._cached_index = index
+        return self._cached_data
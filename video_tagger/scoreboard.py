@@ -1,51 +1,63 @@
 class Scoreboard:
     """
     Formata os dados de um objeto TennisGame para exibição.
-    É uma classe de apresentação (Presenter) e não contém estado próprio.
+    É uma classe de apresentação (Presenter): não guarda o placar, apenas a
+    configuração de formatação. Se 'win_model' (WinProbability) for definido,
+    inclui a probabilidade de vitória de A ("win_prob"), lida da tabela
+    pré-calculada.
     """
 
     def __init__(self):
         self.point_map = {0: "0", 1: "15", 2: "30", 3: "40"}
+        self.win_model = None
 
     def get_score_data(self, game):
         """
         Recebe um objeto TennisGame e retorna um dicionário com os dados
         formatados para serem desenhados na tela.
         """
-        if game.match_over:
-            return {"match_over": True, "winner": game.winner}
+        return self.get_snapshot_data(game.snapshot(), game.player_names)
 
-        pA, pB = game.scores["A"], game.scores["B"]
+    def get_snapshot_data(self, snapshot, player_names):
+        """
+        Formata um ScoreSnapshot (placar imutável) usando os nomes dos jogadores.
+        """
+        if snapshot.match_over:
+            return {"match_over": True, "winner": player_names[snapshot.winner_code]}
+
+        pA, pB = snapshot.points
 
-        if game.is_tiebreak or game.is_super_tiebreak:
-            pA_pts, pB_pts = str(pA["points"]), str(pB["points"])
+        if snapshot.is_tiebreak or snapshot.is_super_tiebreak:
+            pA_pts, pB_pts = str(pA), str(pB)
         else:
-            if pA["points"] >= 3 and pB["points"] >= 3:
-                if pA["points"] == pB["points"]:
+            if pA >= 3 and pB >= 3:
+                if pA == pB:
                     pA_pts, pB_pts = "40", "40"
-                elif pA["points"] > pB["points"]:
+                elif pA > pB:
                     pA_pts, pB_pts = "AD", ""
                 else:
                     pA_pts, pB_pts = "", "AD"
             else:
-                pA_pts = self.point_map.get(pA["points"])
-                pB_pts = self.point_map.get(pB["points"])
+                pA_pts = self.point_map.get(pA)
+                pB_pts = self.point_map.get(pB)
 
         data = {
             "match_over": False,
             "pA": {
-                "name": game.player_names["A"],
-                "sets_hist": [s[0] for s in game.sets_history],
-                "games": pA["games"],
+                "name": player_names["A"],
+                "sets_hist": [s[0] for s in snapshot.sets_history],
+                "games": snapshot.games[0],
                 "points_str": pA_pts,
-                "is_server": game.server == "A",
+                "is_server": snapshot.server == "A",
             },
             "pB": {
-                "name": game.player_names["B"],
-                "sets_hist": [s[1] for s in game.sets_history],
-                "games": pB["games"],
+                "name": player_names["B"],
+                "sets_hist": [s[1] for s in snapshot.sets_history],
+                "games": snapshot.games[1],
                 "points_str": pB_pts,
-                "is_server": game.server == "B",
+                "is_server": snapshot.server == "B",
             },
         }
+        if self.win_model is not None:
+            data["win_prob"] = self.win_model.for_snapshot(snapshot)
         return data
@@ -1,8 +1,43 @@
-import pandas as pd
-import matplotlib.pyplot as plt
 import os
 import argparse
 from collections import defaultdict
+import numpy as np
+from game_logic import PLAYER_CODES, point_offsets, point_outcomes
+
+def _load_csv_columns(csv_path):
+    """Reads the point_id and event_code columns of a session CSV."""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, sep=";", dtype=str, usecols=['point_id', 'event_code'])
+    df['point_id'] = pd.to_numeric(df['point_id'], errors='coerce')
+    df.dropna(subset=['point_id'], inplace=True)
+    return df['point_id'].to_numpy(dtype=np.int64), df['event_code'].to_numpy(dtype=object)
+
+
+def _load_archive_columns(archive_path):
+    """Reads the same columns from a memory-mapped .tmatch archive."""
+    from match_archive import MatchArchive
+
+    archive = MatchArchive(archive_path)
+    return archive.point_ids_per_event(), archive.event_code_array()
+
+
+def load_event_arrays(path: str):
+    """
+    Loads a match (CSV or .tmatch archive) as flat arrays: the id of each point,
+    the event codes grouped by point (stable, keeping the event order within
+    each point) and the offset where each point starts in the codes.
+    """
+    if os.path.isdir(path):
+        # Binary .tmatch match archive: columns are read straight from the arrays
+        point_ids, event_codes = _load_archive_columns(path)
+    else:
+        point_ids, event_codes = _load_csv_columns(path)
+    order = np.argsort(point_ids, kind='stable')
+    point_ids = point_ids[order]
+    offsets = point_offsets(point_ids)
+    return point_ids[offsets[:-1]], event_codes[order], offsets
+
 
 class StatisticsGenerator:
     """
@@ -12,9 +47,7 @@ class StatisticsGenerator:
         if not os.path.exists(csv_path):
             raise FileNotFoundError(f"Analysis file not found: {csv_path}")
         
-        self.df = pd.read_csv(csv_path, sep=";", dtype=str)
-        self.df['point_id'] = pd.to_numeric(self.df['point_id'], errors='coerce')
-        self.df.dropna(subset=['point_id'], inplace=True)
+        _, self.event_codes, self.point_offsets = load_event_arrays(csv_path)
 
         self.csv_path = csv_path
         
@@ -39,81 +72,68 @@ class StatisticsGenerator:
                 'return_pts_won_vs_2nd_serve': 0
             }
 
-    def _determine_winner_and_server(self, point_events):
-        """Determines the server and winner of a point from its events."""
-        server = point_events.iloc[0]['event_code']
-        receiver = 'B' if server == 'A' else 'A'
-        
-        rally_events = point_events.iloc[1:]
-        if rally_events.empty: return None, server
-        
-        last_event = rally_events.iloc[-1]
-        num_shots_in_rally = len(rally_events)
-        
-        # **BUG FIX 1**: The logic for who hit the last shot was inverted.
-        # 1 shot (serve) -> server. 2 shots (serve, return) -> receiver.
-        # An odd number of shots means the server hit last.
-        last_player_is_server = (num_shots_in_rally % 2 == 0)
-
-        if last_event['event_code'] == 'W': winner = server if last_player_is_server else receiver
-        elif last_event['event_code'] == 'E': winner = receiver if last_player_is_server else server
-        else: winner = None
-            
-        return winner, server
+    @staticmethod
+    def _count_strokes(counter, strokes):
+        """Adds stroke counts to counter, keeping the order of first appearance."""
+        if len(strokes) == 0:
+            return
+        codes, first_seen, counts = np.unique(strokes, return_index=True, return_counts=True)
+        for i in np.argsort(first_seen):
+            counter[codes[i]] += int(counts[i])
 
     def _calculate_stats(self):
-        """Processes each point to calculate the full set of statistics."""
-        points = self.df.groupby('point_id')
-        
-        for _, point_df in points:
-            winner, server = self._determine_winner_and_server(point_df)
-            if not winner: continue
+        """
+        Computes the full set of statistics at once over the event arrays,
+        using the same point-outcome kernel as the tagger.
+        """
+        codes = self.event_codes
+        servers, winners = point_outcomes(codes, self.point_offsets)
 
-            loser = 'B' if winner == 'A' else 'A'
-            receiver = loser if server == winner else winner
+        # Points without a winner (incomplete or untagged) are not counted
+        decided = winners >= 0
+        starts = self.point_offsets[:-1][decided]
+        ends = self.point_offsets[1:][decided]
+        server = servers[decided]
+        winner = winners[decided]
+        receiver = 1 - server
+        won_serving = winner == server
 
-            self.stats['A']['total_points_played'] += 1
-            self.stats['B']['total_points_played'] += 1
-            
-            self.stats[winner]['points_won'] += 1
-            if winner == server: self.stats[winner]['points_won_serving'] += 1
-            else: self.stats[winner]['points_won_receiving'] += 1
-                
-            rally_events = point_df.iloc[1:]
-            if rally_events.empty: continue
-            
-            serve_type = rally_events.iloc[0]['event_code']
-            self.stats[server]['serves_total'] += 1
-
-            if serve_type == '1':
-                self.stats[server]['1st_serves_in'] += 1
-                if winner == server: self.stats[server]['1st_serve_pts_won'] += 1
-                else: self.stats[receiver]['return_pts_won_vs_1st_serve'] += 1
-            elif serve_type == '2':
-                self.stats[server]['2nd_serves_in'] += 1
-                if winner == server: self.stats[server]['2nd_serve_pts_won'] += 1
-                else: self.stats[receiver]['return_pts_won_vs_2nd_serve'] += 1
-                    
-            last_event = rally_events.iloc[-1]
-            # A point must have at least a serve and an outcome (W/E) to have a stroke.
-            if len(rally_events) == 2:
-                if serve_type == '1':
-                    self.stats[server]['aces'] += 1
-                    
-                elif serve_type == '2':
-                    self.stats[server]['double_faults'] += 1
-                    
-            if len(rally_events) > 2:
-                stroke_event = rally_events.iloc[-2]['event_code']
-                
-                if last_event['event_code'] == 'W':
-                    self.stats[winner]['winners_by_stroke'][stroke_event] += 1
-                    # Check for Ace: 1st serve, winner, exactly 2 events in rally (serve + W)
-                   
-                elif last_event['event_code'] == 'E':
-                    self.stats[winner]['errors_forced_by_stroke'][stroke_event] += 1
-   
-    def _format_dict_stats(self, stats_dict):
+        # The rally is every event after the server tag: serve, strokes, outcome
+        rally_length = ends - starts - 1
+        serve_type = codes[starts + 1]
+        last_code = codes[ends - 1]
+        # The stroke that produced the outcome (needs serve + stroke + outcome)
+        has_stroke = rally_length > 2
+        stroke_code = codes[np.where(has_stroke, ends - 2, starts)]
+
+        for player, code in enumerate(PLAYER_CODES):
+            stats = self.stats[code]
+            won = winner == player
+            serving = server == player
+            receiving = receiver == player
+
+            stats['total_points_played'] += int(decided.sum())
+            stats['points_won'] += int(won.sum())
+            stats['points_won_serving'] += int((won & won_serving).sum())
+            stats['points_won_receiving'] += int((won & ~won_serving).sum())
+            stats['serves_total'] += int(serving.sum())
+
+            for serve, label in (('1', '1st'), ('2', '2nd')):
+                this_serve = serve_type == serve
+                stats[f'{label}_serves_in'] += int((serving & this_serve).sum())
+                stats[f'{label}_serve_pts_won'] += int((serving & this_serve & won_serving).sum())
+                stats[f'return_pts_won_vs_{label}_serve'] += int((receiving & this_serve & ~won_serving).sum())
+
+            # Serve followed directly by the outcome
+            direct = serving & (rally_length == 2)
+            stats['aces'] += int((direct & (serve_type == '1')).sum())
+            stats['double_faults'] += int((direct & (serve_type == '2')).sum())
+
+            self._count_strokes(stats['winners_by_stroke'], stroke_code[won & has_stroke & (last_code == 'W')])
+            self._count_strokes(stats['errors_forced_by_stroke'], stroke_code[won & has_stroke & (last_code == 'E')])
+
+    @staticmethod
+    def _format_dict_stats(stats_dict):
         """Formats a dictionary of stats into a readable string."""
         if not stats_dict: return "0"
         return ", ".join([f"{k}: {v}" for k, v in stats_dict.items()])
@@ -121,15 +141,21 @@ class StatisticsGenerator:
     def generate_report(self):
         """Generates and prints the complete, formatted report."""
         self._calculate_stats()
-        
-        report = f"\n--- Relatório Estatístico da Partida ---\n"
-        report += f"{self.stats['A']['name']} vs. {self.stats['B']['name']}\n"
+        report = self.format_report(self.stats)
+        print(report)
+        return report
+
+    @classmethod
+    def format_report(cls, stats, title="Relatório Estatístico da Partida"):
+        """Formats the stats of both players ({'A': ..., 'B': ...}) as a text report."""
+        report = f"\n--- {title} ---\n"
+        report += f"{stats['A']['name']} vs. {stats['B']['name']}\n"
         
         for code in ['A', 'B']:
-            p_stats = self.stats[code]
+            p_stats = stats[code]
             s_stats = p_stats
             receiver_code = 'B' if code == 'A' else 'A'
-            opp_s_stats = self.stats[receiver_code]
+            opp_s_stats = stats[receiver_code]
 
             report += "\n" + "="*50 + "\n"
             report += f" JOGADOR: {p_stats['name']}\n"
@@ -141,9 +167,9 @@ class StatisticsGenerator:
             report += f"- Pontos Ganhos: {p_stats['points_won']} de {total_played} ({win_perc:.1f}%)\n"
             report += f"- Pontos sacando: {p_stats['points_won_serving']}\n"
             report += f"- Pontos recebendo: {p_stats['points_won_receiving']}\n"
-            report += f"- Winners: {self._format_dict_stats(p_stats['winners_by_stroke'])}\n"
+            report += f"- Winners: {cls._format_dict_stats(p_stats['winners_by_stroke'])}\n"
             # **CLARITY FIX**: Changed label to avoid confusion. An error for player X is a point for player Y.
-            report += f"- Erros: {self._format_dict_stats(p_stats['errors_forced_by_stroke'])}\n"
+            report += f"- Erros: {cls._format_dict_stats(p_stats['errors_forced_by_stroke'])}\n"
             
             report += "\n-- SAQUE --\n"
             report += f"- Aces: {s_stats['aces']}\n"
@@ -164,8 +190,6 @@ class StatisticsGenerator:
                 perc = (p_stats['return_pts_won_vs_2nd_serve'] / opp_s_stats['2nd_serves_in'] * 100)
                 report += f"- % Pontos Ganhos vs 2º Saque: {perc:.1f}% ({p_stats['return_pts_won_vs_2nd_serve']}/{opp_s_stats['2nd_serves_in']})\n"
 
-
-        print(report)
         return report
 
     def plot_summary_chart(self):
@@ -173,7 +197,7 @@ class StatisticsGenerator:
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Gerador de Estatísticas Detalhadas de Partida de Tênis.")
-    parser.add_argument("csv_path", help="Caminho para o arquivo CSV gerado pela análise.")
+    parser.add_argument("csv_path", help="Caminho para o arquivo CSV (ou .tmatch) gerado pela análise.")
     parser.add_argument("--player_a", default="JOGADOR A", help="Nome do Jogador A.")
     parser.add_argument("--player_b", default="JOGADOR B", help="Nome do Jogador B.")
     args = parser.parse_args()
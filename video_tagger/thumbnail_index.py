@@ -0,0 +1,193 @@
+import os
+import json
+import threading
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+# Intervalo entre miniaturas e largura do nível 0 da pirâmide (os demais têm
+# metade da largura do anterior)
+INTERVAL_SEC = 0.5
+THUMB_WIDTH = 160
+LEVELS = 3
+
+
+class ThumbnailIndex:
+    """
+    Miniaturas do vídeo amostradas a intervalo fixo (ex.: uma a cada 0,5 s),
+    em uma pirâmide de resoluções. Os níveis ficam em um único arquivo bruto
+    ao lado do vídeo, mapeado em memória: ler uma miniatura é só um acesso ao
+    array (o sistema carrega as páginas sob demanda), sem decodificar vídeo.
+    """
+    VERSION = 1
+
+    def __init__(self, data: np.ndarray, meta: Dict):
+        self.step = meta["step"]
+        self.count = meta["count"]
+        self.levels = []
+        offset = 0
+        for width, height in meta["sizes"]:
+            size = meta["capacity"] * height * width * 3
+            level = data[offset:offset + size].reshape(meta["capacity"], height, width, 3)
+            self.levels.append(level[:self.count])
+            offset += size
+
+    @staticmethod
+    def sidecar_path(video_path: str) -> str:
+        return f"{video_path}.thumbs"
+
+    @staticmethod
+    def _meta_path(video_path: str) -> str:
+        return f"{video_path}.thumbs.json"
+
+    @staticmethod
+    def _video_signature(video_path: str):
+        stat = os.stat(video_path)
+        return [ThumbnailIndex.VERSION, stat.st_size, stat.st_mtime_ns]
+
+    @classmethod
+    def load(cls, video_path: str):
+        """Mapeia as miniaturas salvas, se existirem e corresponderem ao vídeo atual."""
+        meta_path = cls._meta_path(video_path)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["signature"] != cls._video_signature(video_path) or meta["count"] == 0:
+                return None
+            data = np.memmap(cls.sidecar_path(video_path), dtype=np.uint8, mode="r")
+            return cls(data, meta)
+        except Exception as e:
+            print(f"Miniaturas inválidas ({e}); serão reconstruídas.")
+            return None
+
+    @classmethod
+    def build(cls, video_path: str, interval_sec: float = INTERVAL_SEC, width: int = THUMB_WIDTH,
+              levels: int = LEVELS, progress=None, stop_event: threading.Event = None):
+        """
+        Percorre o vídeo uma vez, convertendo só os frames amostrados (os demais
+        são apenas avançados com grab), e grava as miniaturas direto no arquivo
+        mapeado. O arquivo final só aparece quando está completo.
+        Retorna None se o vídeo não puder ser lido ou a construção for interrompida.
+        """
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            return None
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30
+        total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        frame_w = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        frame_h = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if total_frames <= 0 or frame_w <= 0 or frame_h <= 0:
+            capture.release()
+            return None
+
+        step = max(1, round(fps * interval_sec))
+        capacity = (total_frames + step - 1) // step
+        sizes = []
+        for level in range(levels):
+            level_w = max(2, width >> level)
+            sizes.append((level_w, max(2, round(level_w * frame_h / frame_w))))
+        meta = {"signature": cls._video_signature(video_path), "step": step, "capacity": capacity,
+                "count": capacity, "sizes": sizes}
+
+        path = cls.sidecar_path(video_path)
+        tmp_path = f"{path}.tmp"
+        data = np.memmap(tmp_path, dtype=np.uint8, mode="w+",
+                         shape=(sum(capacity * h * w * 3 for w, h in sizes),))
+        index = cls(data, meta)
+        count = 0
+        try:
+            for frame_num in range(total_frames):
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                if frame_num % step:
+                    if not capture.grab():
+                        break
+                    continue
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                # Cada nível é reduzido a partir do anterior (já pequeno)
+                image = frame
+                for level, (level_w, level_h) in zip(index.levels, sizes):
+                    image = cv2.resize(image, (level_w, level_h), interpolation=cv2.INTER_AREA)
+                    level[count] = image
+                count += 1
+                if progress is not None:
+                    progress(count / capacity)
+            data.flush()
+        finally:
+            capture.release()
+            del index, data
+            if count == 0 or (stop_event is not None and stop_event.is_set()):
+                os.remove(tmp_path)
+
+        if count == 0:
+            return None
+        # O CAP_PROP_FRAME_COUNT pode superestimar: vale o que foi de fato lido
+        meta["count"] = count
+        os.replace(tmp_path, path)
+        meta_tmp_path = f"{cls._meta_path(video_path)}.tmp"
+        with open(meta_tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        # Os metadados são gravados por último: marcam as miniaturas como válidas
+        os.replace(meta_tmp_path, cls._meta_path(video_path))
+        return cls.load(video_path)
+
+    def index_for_frame(self, frame_num: int) -> int:
+        """Miniatura que representa o frame (a amostrada mais recente até ele)."""
+        return min(max(frame_num, 0) // self.step, self.count - 1)
+
+    def frame_for_index(self, index: int) -> int:
+        return index * self.step
+
+    def thumbnail(self, frame_num: int, level: int = 0) -> np.ndarray:
+        """Miniatura do frame no nível pedido (view do arquivo mapeado, somente leitura)."""
+        return self.levels[level][self.index_for_frame(frame_num)]
+
+    def level_for_width(self, width: int) -> int:
+        """Menor nível cuja largura ainda cobre a largura pedida."""
+        for level in range(len(self.levels) - 1, -1, -1):
+            if self.levels[level].shape[2] >= width:
+                return level
+        return 0
+
+
+class ThumbnailBuilder(threading.Thread):
+    """
+    Gera as miniaturas em segundo plano, chamando on_ready(index) quando
+    estiverem disponíveis. 'progress' vai de 0 a 1 durante a construção.
+    """
+
+    def __init__(self, video_path: str, on_ready, interval_sec: float = INTERVAL_SEC):
+        super().__init__(daemon=True)
+        self.video_path = video_path
+        self.on_ready = on_ready
+        self.interval_sec = interval_sec
+        self.progress = 0.0
+        self._stop_event = threading.Event()
+
+    def cancel(self):
+        self._stop_event.set()
+
+    def _set_progress(self, value: float):
+        self.progress = value
+
+    def run(self):
+        print("Gerando miniaturas do vídeo em segundo plano...")
+        try:
+            index = ThumbnailIndex.build(self.video_path, self.interval_sec,
+                                         progress=self._set_progress, stop_event=self._stop_event)
+        except OSError as e:
+            print(f"Alerta: não foi possível gerar as miniaturas: {e}")
+            return
+        if index is not None:
+            self.on_ready(index)
+
+
+def point_ranges(all_points_data: List[Dict]) -> List[tuple]:
+    """Intervalos (primeiro frame, último frame) de cada ponto marcado."""
+    return [(p["events"][0]["event_frame"], p["events"][-1]["event_frame"])
+            for p in all_points_data if p["events"]]
@@ -0,0 +1,81 @@
+import os
+import shutil
+import subprocess
+import threading
+
+# Perfis de codificação do ffmpeg. O perfil "scrub" usa GOPs curtos (um keyframe
+# a cada 15 frames, sem keyframes extras em cortes de cena), o que deixa as
+# buscas para qualquer frame baratas ao custo de um arquivo um pouco maior.
+TRANSCODE_PROFILES = {
+    "default": ["-c:v", "libx264", "-preset", "fast", "-crf", "23"],
+    "scrub": ["-c:v", "libx264", "-preset", "fast", "-crf", "23",
+              "-g", "15", "-keyint_min", "15", "-sc_threshold", "0", "-tune", "fastdecode"],
+}
+
+
+def optimized_video_path(video_path: str) -> str:
+    """Caminho da versão otimizada (720p) de um vídeo."""
+    video_dir = os.path.dirname(video_path)
+    video_name, _ = os.path.splitext(os.path.basename(video_path))
+    return os.path.join(video_dir, f"{video_name}_optimized_720p.mp4")
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+class BackgroundTranscoder(threading.Thread):
+    """
+    Executa o ffmpeg em segundo plano e acompanha o progresso pela saída
+    "-progress". O arquivo é gerado com um nome temporário e só é renomeado
+    para o caminho final quando a transcodificação termina com sucesso.
+    """
+
+    def __init__(self, source_path: str, output_path: str, duration_sec: float, profile: str = "scrub"):
+        super().__init__(daemon=True)
+        self.source_path = source_path
+        self.output_path = output_path
+        self.duration_sec = duration_sec
+        self.profile = profile
+        self.progress = 0.0
+        self.done = False
+        self.error = None
+        self._process = None
+        self._cancelled = False
+
+    @property
+    def tmp_path(self) -> str:
+        base, ext = os.path.splitext(self.output_path)
+        return f"{base}.part{ext}"
+
+    def run(self):
+        command = ["ffmpeg", "-y", "-v", "error", "-i", self.source_path,
+                   *TRANSCODE_PROFILES[self.profile],
+                   "-c:a", "copy", "-vf", "scale=-1:720",
+                   "-progress", "pipe:1", "-nostats", self.tmp_path]
+        try:
+            self._process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            for line in self._process.stdout:
+                key, _, value = line.strip().partition("=")
+                # Apesar do nome, out_time_ms é informado em microssegundos
+                if key == "out_time_ms" and value.isdigit() and self.duration_sec > 0:
+                    self.progress = min(1.0, int(value) / 1e6 / self.duration_sec)
+            stderr = self._process.stderr.read()
+            if self._process.wait() != 0:
+                raise RuntimeError(stderr.strip() or f"ffmpeg terminou com código {self._process.returncode}")
+            os.replace(self.tmp_path, self.output_path)
+            self.progress = 1.0
+            self.done = True
+        except Exception as e:
+            if not self._cancelled:
+                self.error = e
+                print(f"\nERRO ao transcodificar: {e}\nContinuando com o vídeo original.\n")
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+    def cancel(self):
+        """Interrompe o ffmpeg (ex.: ao fechar o programa) e descarta o arquivo parcial."""
+        self._cancelled = True
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+        self.join(timeout=5)
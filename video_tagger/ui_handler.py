@@ -1,14 +1,61 @@
 import cv2
-from typing import Dict
+from typing import Dict, List
 import numpy as np
 
 
+class Sprite:
+    """
+    Imagem pré-renderizada com transparência, guardada já pré-multiplicada
+    pelo alfa (em escala 0-256) para compor rapidamente sobre o frame.
+    """
+
+    def __init__(self, bgr, alpha, premultiplied: bool = False):
+        a = alpha.astype(np.uint16)[..., None]
+        a = a + (a >> 7)  # 0-255 -> 0-256, para dividir por 256 com shift
+        if premultiplied:
+            self.premul = bgr.astype(np.uint16) << 8
+        else:
+            self.premul = bgr.astype(np.uint16) * a
+        self.inv_alpha = 256 - a
+        self.height, self.width = bgr.shape[:2]
+
+    def blend_onto(self, frame, x: int, y: int):
+        """Compõe o sprite sobre o frame, alterando apenas a região de interesse."""
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + self.width, frame_w), min(y + self.height, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        roi = frame[y0:y1, x0:x1]
+        sx, sy = x0 - x, y0 - y
+        premul = self.premul[sy:sy + (y1 - y0), sx:sx + (x1 - x0)]
+        inv_alpha = self.inv_alpha[sy:sy + (y1 - y0), sx:sx + (x1 - x0)]
+        roi[:] = (roi * inv_alpha + premul + 128) >> 8
+
+
 class UIHandler:
     """Gerencia a interface do usuário, incluindo o desenho do placar e sobreposição."""
 
-    def __init__(self, window_name: str):
+    def __init__(self, window_name: str = None):
+        # Sem nome de janela (modo headless, ex.: renderização em lote), nenhuma
+        # janela é criada e apenas os métodos de desenho são usados
         self.window_name = window_name
-        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+        if window_name is not None:
+            cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+        # Sprites em cache: só são redesenhados quando o conteúdo muda
+        self._hud_key = None
+        self._hud_sprite = None
+        self._scoreboard_data = None
+        self._scoreboard_sprite = None
+        self._stats_version = None
+        self._stats_sprite = None
+        self._timeline_key = None
+        self._timeline_sprite = None
+        # Área da linha do tempo no último frame desenhado (x, y, largura, altura)
+        self.timeline_rect = None
+        self._timeline_total_frames = 1
+        self._profiler_key = None
+        self._profiler_sprite = None
 
     def draw_overlay(
         self,
@@ -18,61 +65,86 @@ class UIHandler:
         frame_increment: int,
         last_event_info: str,
         frame_info: str,
+        background_info: str = None,
     ):
         """Desenha a sobreposição de informações no frame."""
         font = cv2.FONT_HERSHEY_SIMPLEX
-        y_pos = 30
-
-        def draw_text(text, pos, color=(255, 255, 255), scale=0.7):
-            cv2.putText(frame, text, pos, font, scale, color, 2, cv2.LINE_AA)
 
         status_text = f"ESTADO: {'GRAVANDO PONTO' if current_state == 'RECORDING_POINT' else 'AGUARDANDO'}"
         status_color = (
             (0, 255, 0) if current_state == "RECORDING_POINT" else (0, 255, 255)
         )
         playback_info = "(PAUSADO)" if is_paused else f"({frame_increment}x)"
-        draw_text(f"{status_text} {playback_info}", (20, y_pos), status_color, scale=1.0)
-        y_pos += 40
+        hud_key = (f"{status_text} {playback_info}", status_color, last_event_info)
+        if hud_key != self._hud_key:
+            self._hud_sprite = self._render_hud_sprite(*hud_key)
+            self._hud_key = hud_key
+        self._hud_sprite.blend_onto(frame, 0, 0)
+
+        # As linhas abaixo mudam a cada frame e são desenhadas diretamente
+        y_pos = 110 if last_event_info else 70
+        cv2.putText(frame, frame_info, (20, y_pos), font, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
+
+        if background_info:
+            # Tarefas em segundo plano (ex.: progresso da transcodificação)
+            cv2.putText(frame, background_info, (20, y_pos + 40), font, 0.6, (200, 200, 200), 2, cv2.LINE_AA)
 
+    def _render_hud_sprite(self, status_line: str, status_color, last_event_info: str) -> Sprite:
+        """Renderiza as linhas de estado e último evento em um sprite transparente."""
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        lines = [(status_line, (20, 30), status_color, 1.0)]
         if last_event_info:
-            draw_text(f"Ultimo: {last_event_info}", (20, y_pos), (50, 205, 255), scale=0.8)
-            y_pos += 40
+            lines.append((f"Ultimo: {last_event_info}", (20, 70), (50, 205, 255), 0.8))
+
+        width = max(20 + cv2.getTextSize(text, font, scale, 2)[0][0] for text, _, _, scale in lines) + 10
+        height = lines[-1][1][1] + 15
+        bgr = np.zeros((height, width, 3), dtype=np.uint8)
+        alpha = np.zeros((height, width), dtype=np.uint8)
+        for text, pos, color, scale in lines:
+            cv2.putText(bgr, text, pos, font, scale, color, 2, cv2.LINE_AA)
+            cv2.putText(alpha, text, pos, font, scale, 255, 2, cv2.LINE_AA)
+        # Sobre fundo preto, o anti-aliasing já deixa a cor pré-multiplicada pelo alfa
+        return Sprite(bgr, alpha, premultiplied=True)
 
-        draw_text(frame_info, (20, y_pos), (255, 255, 255))
+    def draw_scoreboard(self, frame, score_data: Dict, bottom_margin: int = 20):
+        """Desenha o placar no frame, bottom_margin pixels acima da borda inferior."""
+        if score_data is not self._scoreboard_data and score_data != self._scoreboard_data:
+            self._scoreboard_sprite = self._render_scoreboard_sprite(score_data)
+        self._scoreboard_data = score_data
 
-    def draw_scoreboard(self, frame, score_data: Dict):
-        """Desenha o placar no frame."""
+        frame_h = frame.shape[0]
+        start_x = 20
+        start_y = frame_h - self._scoreboard_sprite.height - bottom_margin
+        self._scoreboard_sprite.blend_onto(frame, start_x, start_y)
+
+    def _render_scoreboard_sprite(self, score_data: Dict) -> Sprite:
+        """Renderiza o placar completo (fundo semitransparente e textos) em um sprite."""
         WIMBLEDON_GREEN = (44, 88, 0)
         WHITE = (255, 255, 255)
         YELLOW = (0, 255, 255)
         FONT = cv2.FONT_HERSHEY_DUPLEX
 
-        frame_h, frame_w, _ = frame.shape
-        board_h = 85
+        # Linha extra com a probabilidade de vitória, quando disponível
+        board_h = 110 if "win_prob" in score_data else 85
         board_w = 450
-        start_x = 20
-        start_y = frame_h - board_h - 20
-
-        overlay = frame.copy()
-        cv2.rectangle(
-            overlay,
-            (start_x, start_y),
-            (start_x + board_w, start_y + board_h),
-            WIMBLEDON_GREEN,
-            -1,
-        )
-        alpha = 0.8
-        cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
+        start_x = 0
+        start_y = 0
+
+        sprite = np.empty((board_h, board_w, 3), dtype=np.uint8)
+        sprite[:] = WIMBLEDON_GREEN
+        alpha = np.full((board_h, board_w), int(0.8 * 255), dtype=np.uint8)
+
+        def put_text(text, pos, scale, color, thickness):
+            cv2.putText(sprite, text, pos, FONT, scale, color, thickness, cv2.LINE_AA)
+            cv2.putText(alpha, text, pos, FONT, scale, 255, thickness, cv2.LINE_AA)
 
         if score_data.get("match_over"):
             winner_text = f"VENCEDOR: {score_data['winner']}"
             (w, h), _ = cv2.getTextSize(winner_text, FONT, 0.8, 2)
             text_x = start_x + (board_w - w) // 2
             text_y = start_y + (board_h + h) // 2
-            cv2.putText(
-                frame, winner_text, (text_x, text_y), FONT, 0.8, YELLOW, 2, cv2.LINE_AA
-            )
-            return
+            put_text(winner_text, (text_x, text_y), 0.8, YELLOW, 2)
+            return Sprite(sprite, alpha)
 
         col_name = start_x + 25
         col_sets_start = col_name + 150
@@ -80,54 +152,194 @@ class UIHandler:
         col_points = col_games + 60
 
         def draw_player_row(y_pos, player_data):
-            cv2.putText(
-                frame,
-                player_data["name"],
-                (col_name, y_pos),
-                FONT,
-                0.6,
-                WHITE,
-                1,
-                cv2.LINE_AA,
-            )
+            put_text(player_data["name"], (col_name, y_pos), 0.6, WHITE, 1)
             set_x_offset = 0
             for s in player_data["sets_hist"]:
-                cv2.putText(
-                    frame,
-                    str(s),
-                    (col_sets_start + set_x_offset, y_pos),
-                    FONT,
-                    0.7,
-                    WHITE,
-                    2,
-                    cv2.LINE_AA,
-                )
+                put_text(str(s), (col_sets_start + set_x_offset, y_pos), 0.7, WHITE, 2)
                 set_x_offset += 35
-            cv2.putText(
-                frame,
-                str(player_data["games"]),
-                (col_games, y_pos),
-                FONT,
-                0.7,
-                WHITE,
-                2,
-                cv2.LINE_AA,
-            )
-            cv2.putText(
-                frame,
-                player_data["points_str"],
-                (col_points, y_pos),
-                FONT,
-                0.7,
-                YELLOW,
-                2,
-                cv2.LINE_AA,
-            )
+            put_text(str(player_data["games"]), (col_games, y_pos), 0.7, WHITE, 2)
+            put_text(player_data["points_str"], (col_points, y_pos), 0.7, YELLOW, 2)
             if player_data["is_server"]:
-                cv2.circle(frame, (col_name - 15, y_pos - 5), 4, YELLOW, -1)
+                cv2.circle(sprite, (col_name - 15, y_pos - 5), 4, YELLOW, -1)
+                cv2.circle(alpha, (col_name - 15, y_pos - 5), 4, 255, -1)
 
         draw_player_row(start_y + 35, score_data["pA"])
         draw_player_row(start_y + 70, score_data["pB"])
+        if "win_prob" in score_data:
+            prob_a = score_data["win_prob"]
+            text = (f"Prob. vitoria: {score_data['pA']['name'][:12]} {prob_a:.0%}"
+                    f" | {score_data['pB']['name'][:12]} {1 - prob_a:.0%}")
+            put_text(text, (col_name, start_y + 98), 0.45, WHITE, 1)
+        return Sprite(sprite, alpha)
+
+    def draw_stats_panel(self, frame, live_stats, player_names: Dict):
+        """
+        Desenha o painel de estatísticas no canto superior direito. O sprite só
+        é renderizado de novo quando os números mudam (live_stats.version).
+        """
+        if live_stats.version != self._stats_version or self._stats_sprite is None:
+            self._stats_sprite = self._render_stats_sprite(live_stats.summary_lines(player_names))
+            self._stats_version = live_stats.version
+
+        start_x = max(0, frame.shape[1] - self._stats_sprite.width - 20)
+        self._stats_sprite.blend_onto(frame, start_x, 20)
+
+    def _render_stats_sprite(self, lines) -> Sprite:
+        """Renderiza a tabela de estatísticas (rótulo, jogador A, jogador B) em um sprite."""
+        FONT = cv2.FONT_HERSHEY_SIMPLEX
+        WHITE = (255, 255, 255)
+        YELLOW = (0, 255, 255)
+        scale, thickness, line_h, pad = 0.5, 1, 24, 12
+
+        col_widths = [max(cv2.getTextSize(row[i], FONT, scale, thickness)[0][0] for row in lines) + 20
+                      for i in range(3)]
+        board_w = sum(col_widths) + 2 * pad
+        board_h = line_h * len(lines) + pad
+
+        sprite = np.zeros((board_h, board_w, 3), dtype=np.uint8)
+        alpha = np.full((board_h, board_w), int(0.75 * 255), dtype=np.uint8)
+        for row_index, row in enumerate(lines):
+            y_pos = pad + line_h * (row_index + 1) - 6
+            x_pos = pad
+            for col_index, text in enumerate(row):
+                color = YELLOW if row_index == 0 or col_index == 0 else WHITE
+                cv2.putText(sprite, text, (x_pos, y_pos), FONT, scale, color, thickness, cv2.LINE_AA)
+                cv2.putText(alpha, text, (x_pos, y_pos), FONT, scale, 255, thickness, cv2.LINE_AA)
+                x_pos += col_widths[col_index]
+        return Sprite(sprite, alpha)
+
+    def draw_timeline(self, frame, thumbnails, ranges: List[tuple], ranges_version, current_frame: int,
+                      total_frames: int, hover_x: int = None) -> int:
+        """
+        Desenha a linha do tempo na base do frame: miniaturas do vídeo com os
+        pontos marcados por cima e o cursor no frame atual. Com hover_x, mostra
+        a miniatura da posição do mouse lida direto do ThumbnailIndex (sem
+        decodificar). Retorna a altura ocupada, para o placar ficar acima dela.
+        """
+        frame_h, frame_w = frame.shape[:2]
+        total_frames = max(total_frames, 1)
+        count = thumbnails.count if thumbnails is not None else 0
+        key = (frame_w, id(thumbnails), count, ranges_version, total_frames)
+        if key != self._timeline_key:
+            self._timeline_sprite = self._render_timeline_sprite(frame_w, thumbnails, ranges, total_frames)
+            self._timeline_key = key
+        sprite = self._timeline_sprite
+        y0 = frame_h - sprite.height
+        sprite.blend_onto(frame, 0, y0)
+        self.timeline_rect = (0, y0, frame_w, sprite.height)
+        self._timeline_total_frames = total_frames
+
+        cursor_x = min(frame_w - 1, current_frame * frame_w // total_frames)
+        cv2.line(frame, (cursor_x, y0), (cursor_x, frame_h - 1), (0, 0, 255), 2)
+
+        if hover_x is not None and 0 <= hover_x < frame_w:
+            hover_frame = self.timeline_frame_at(hover_x)
+            cv2.line(frame, (hover_x, y0), (hover_x, frame_h - 1), (255, 255, 255), 1)
+            if thumbnails is not None:
+                preview = thumbnails.thumbnail(hover_frame, 0)
+                prev_h, prev_w = preview.shape[:2]
+                px = min(max(hover_x - prev_w // 2, 0), max(frame_w - prev_w, 0))
+                py = y0 - prev_h - 4
+                if py >= 0 and px + prev_w <= frame_w:
+                    frame[py:py + prev_h, px:px + prev_w] = preview
+                    cv2.rectangle(frame, (px - 1, py - 1), (px + prev_w, py + prev_h), (255, 255, 255), 1)
+                    cv2.putText(frame, f"{hover_frame}", (px + 4, py + 16), cv2.FONT_HERSHEY_SIMPLEX,
+                                0.45, (255, 255, 255), 1, cv2.LINE_AA)
+        return sprite.height
+
+    def timeline_frame_at(self, x: int) -> int:
+        """Frame do vídeo na posição horizontal x da linha do tempo."""
+        frame_w = self.timeline_rect[2] if self.timeline_rect else 1
+        x = min(max(x, 0), frame_w - 1)
+        return x * self._timeline_total_frames // frame_w
+
+    def timeline_contains(self, x: int, y: int) -> bool:
+        if self.timeline_rect is None:
+            return False
+        rx, ry, rw, rh = self.timeline_rect
+        return rx <= x < rx + rw and ry <= y < ry + rh
+
+    def _render_timeline_sprite(self, frame_w: int, thumbnails, ranges: List[tuple], total_frames: int) -> Sprite:
+        """Renderiza a faixa de miniaturas e as marcas dos pontos em um sprite."""
+        band_h = 8
+        level = thumbnails.level_for_width(64) if thumbnails is not None else 0
+        tile_h, tile_w = thumbnails.levels[level].shape[1:3] if thumbnails is not None else (0, 0)
+        height = tile_h + band_h if tile_h else 2 * band_h
+
+        sprite = np.zeros((height, frame_w, 3), dtype=np.uint8)
+        alpha = np.full((height, frame_w), int(0.85 * 255), dtype=np.uint8)
+        if tile_w:
+            # Cada bloco mostra a miniatura do frame no centro do trecho que ele cobre
+            for x in range(0, frame_w, tile_w):
+                center = min(x + tile_w // 2, frame_w - 1) * total_frames // frame_w
+                tile = thumbnails.thumbnail(center, level)
+                width = min(tile_w, frame_w - x)
+                sprite[band_h:, x:x + width] = tile[:, :width]
+
+        colors = [(0, 200, 255), (0, 255, 120)]
+        for i, (start, end) in enumerate(ranges):
+            x0 = start * frame_w // total_frames
+            x1 = max(x0 + 1, end * frame_w // total_frames)
+            sprite[:band_h, x0:x1] = colors[i % 2]
+            # Início do ponto marcado também sobre as miniaturas
+            sprite[band_h:, x0] = colors[i % 2]
+        return Sprite(sprite, alpha)
+
+    def draw_profiler_panel(self, frame, profiler, refresh_frames: int = 15):
+        """
+        Desenha o painel de instrumentação (tempos por etapa, histogramas e
+        contadores) à esquerda, abaixo do HUD. Os números são atualizados a
+        cada refresh_frames frames, para o painel não pesar no próprio laço.
+        """
+        key = profiler.frames // refresh_frames
+        if key != self._profiler_key or self._profiler_sprite is None:
+            self._profiler_sprite = self._render_profiler_sprite(profiler.summary())
+            self._profiler_key = key
+        self._profiler_sprite.blend_onto(frame, 20, 160)
+
+    def _render_profiler_sprite(self, summary: Dict) -> Sprite:
+        """Renderiza a tabela de etapas com um mini-histograma por linha."""
+        FONT = cv2.FONT_HERSHEY_SIMPLEX
+        WHITE = (255, 255, 255)
+        YELLOW = (0, 255, 255)
+        RED = (60, 60, 255)
+        scale, line_h, pad = 0.45, 20, 10
+        col_stage, col_mean, col_p95, col_hist = pad, pad + 80, pad + 145, pad + 210
+        bar_w, bar_h = 6, 14
+        stages = summary["stages"]
+        num_bins = len(next(iter(stages.values()))["histogram"])
+        board_w = col_hist + num_bins * (bar_w + 2) + pad
+        board_h = line_h * (len(stages) + 3) + pad
+
+        sprite = np.zeros((board_h, board_w, 3), dtype=np.uint8)
+        alpha = np.full((board_h, board_w), int(0.75 * 255), dtype=np.uint8)
+
+        def put_text(text, pos, color):
+            cv2.putText(sprite, text, pos, FONT, scale, color, 1, cv2.LINE_AA)
+            cv2.putText(alpha, text, pos, FONT, scale, 255, 1, cv2.LINE_AA)
+
+        budget = summary["frame_budget_ms"]
+        y_pos = pad + line_h - 6
+        for text, x_pos in (("Etapa", col_stage), ("media", col_mean), ("p95", col_p95), ("ms", col_hist)):
+            put_text(text, (x_pos, y_pos), YELLOW)
+        for stage, values in stages.items():
+            y_pos += line_h
+            put_text(stage, (col_stage, y_pos), YELLOW)
+            put_text(f"{values['mean_ms']:.1f}", (col_mean, y_pos), WHITE)
+            put_text(f"{values['p95_ms']:.1f}", (col_p95, y_pos), RED if stage != "input" and budget and values["p95_ms"] > budget else WHITE)
+            peak = max(values["histogram"]) or 1
+            for i, count in enumerate(values["histogram"]):
+                height = int(round(bar_h * count / peak))
+                if height:
+                    x0 = col_hist + i * (bar_w + 2)
+                    cv2.rectangle(sprite, (x0, y_pos - height + 1), (x0 + bar_w - 1, y_pos), WHITE, -1)
+                    cv2.rectangle(alpha, (x0, y_pos - height + 1), (x0 + bar_w - 1, y_pos), 255, -1)
+        y_pos += line_h
+        work_color = RED if budget and summary["work_mean_ms"] > budget else WHITE
+        put_text(f"Trabalho: {summary['work_mean_ms']:.1f} / {budget:.1f} ms por frame", (col_stage, y_pos), work_color)
+        y_pos += line_h
+        put_text(f"Atrasados: {summary['late_frames']}  Perdidos: {summary['dropped_frames']}", (col_stage, y_pos), WHITE)
+        return Sprite(sprite, alpha)
 
     def show_frame(self, frame):
         """Exibe o frame na janela."""
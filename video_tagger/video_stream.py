@@ -1,44 +1,368 @@
+import threading
 import cv2
+import numpy as np
+from frame_cache import FrameReplayBuffer
+from frame_index import FrameIndex, FrameIndexBuilder
+from frame_proxy import FrameProxy, ProxyBuilder
 
 class VideoStream:
     """
-    Wrapper síncrono para o cv2.VideoCapture com leitura otimizada.
+    Wrapper para o cv2.VideoCapture com leitura otimizada.
+
+    No modo com thread (threaded=True), uma thread produtora decodifica os
+    próximos frames em um anel limitado de buffers pré-alocados, de modo que a
+    decodificação ocorre em paralelo ao desenho e à exibição na thread da UI.
+
+    Com replay_buffer_mb e/ou replay_buffer_seconds, os frames decodificados
+    ficam guardados em RAM (FrameReplayBuffer) e os saltos para trás são
+    servidos sem decodificar.
+
+    Com use_frame_index=True, um índice de frames (FrameIndex) salvo ao lado do
+    vídeo fornece a contagem exata de frames, os keyframes usados nas buscas e
+    os timestamps reais de cada frame. Se ainda não existir, ele é construído
+    em segundo plano e passa a ser usado assim que fica pronto.
+
+    Com proxy_mb, os frames também são guardados já na escala de exibição em
+    um proxy sem compressão (FrameProxy) mapeado em memória, preenchido em
+    segundo plano a partir de set_protected_ranges. Buscas e reprodução
+    passam a ler dele sempre que o frame está guardado; o decodificador só é
+    usado nos frames ausentes.
     """
-    def __init__(self, path):
+    def __init__(self, path, threaded: bool = False, prefetch_size: int = 8,
+                 replay_buffer_mb: float = None, replay_buffer_seconds: float = None,
+                 use_frame_index: bool = False, proxy_mb: float = None, proxy_scale_percent: int = 100,
+                 proxy_margin_sec: float = 2.0):
         self.stream = cv2.VideoCapture(path)
         if not self.stream.isOpened():
             raise FileNotFoundError(f"Não foi possível abrir o vídeo em: {path}")
 
         self.total_frames = int(self.stream.get(cv2.CAP_PROP_FRAME_COUNT))
         self.fps = self.stream.get(cv2.CAP_PROP_FPS) or 30
+        self.width = int(self.stream.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.stream.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        self.frame_index = None
+        if use_frame_index:
+            index = FrameIndex.load(path)
+            if index is not None:
+                self._apply_frame_index(index)
+            else:
+                FrameIndexBuilder(path, self._apply_frame_index).start()
+
+        self.threaded = threaded
+        self.replay_buffer = None
+        if replay_buffer_mb or replay_buffer_seconds:
+            self.replay_buffer = FrameReplayBuffer(
+                max_mb=replay_buffer_mb or None,
+                max_seconds=replay_buffer_seconds or None,
+                fps=self.fps,
+            )
+        # Próximo frame a ser entregue por read_sequential
+        self.next_frame = 0
+        # Próximo frame que o decodificador entregaria sem precisar de busca
+        self._decoder_pos = 0
+        self._cached_view = None
+
+        self.proxy = None
+        self.proxy_builder = None
+        self._proxy_frame = None
+        if proxy_mb:
+            # Mesma escala do DisplayPipeline: o frame do proxy vai direto para a tela
+            size = (int(self.width * proxy_scale_percent / 100), int(self.height * proxy_scale_percent / 100))
+            try:
+                self.proxy = FrameProxy(path, size, self.total_frames, proxy_mb,
+                                        margin_frames=int(proxy_margin_sec * self.fps))
+            except OSError as e:
+                print(f"Alerta: proxy de frames desativado: {e}")
+            if self.proxy is not None:
+                # Iniciado em set_protected_ranges, para priorizar as regiões dos pontos
+                self.proxy_builder = ProxyBuilder(path, self.proxy)
+
+        # --- PREFETCH EM THREAD ---
+        # O anel precisa de ao menos 2 posições: uma fica com o consumidor.
+        self.prefetch_size = max(2, prefetch_size)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._eof = False
+        self._ring = []
+        self._ring_frame_nums = [0] * self.prefetch_size
+        self._head = 0          # próxima posição a ser consumida
+        self._count = 0         # posições preenchidas aguardando consumo
+        self._held = None       # posição do frame entregue ao consumidor
+        self.consumer_stalls = 0  # UI esperou a decodificação (gargalo: decode)
+        self.producer_stalls = 0  # anel cheio, produtor esperou (gargalo: render)
+
+        if self.threaded:
+            self._allocate_ring()
+            self._start_prefetch()
+
+    def _apply_frame_index(self, index):
+        """Passa a usar o índice de frames (pode ser chamado pela thread do FrameIndexBuilder)."""
+        self.total_frames = index.frame_count
+        self.frame_index = index
+
+    def timestamp_for_frame(self, frame_num):
+        """Timestamp do frame em segundos: PTS real se houver índice, senão frame / fps."""
+        index = self.frame_index
+        if index is not None:
+            return index.timestamp(frame_num)
+        return frame_num / self.fps if self.fps > 0 else 0
+
+    def set_protected_ranges(self, ranges):
+        """
+        Regiões (início, fim) dos pontos marcados, que o proxy guarda primeiro e
+        preserva quando o disco acaba. A primeira chamada inicia o preenchimento
+        do proxy; as seguintes agendam o preenchimento das regiões novas.
+        """
+        if self.proxy is None:
+            return
+        self.proxy.set_protected_ranges(ranges)
+        if self.proxy_builder.is_alive():
+            self.proxy_builder.requeue()
+        elif self.proxy_builder.ident is None:
+            self.proxy_builder.start()
+
+    def _read_proxy(self, frame_num):
+        """Frame do proxy em um buffer reutilizado, ou None se ele não estiver guardado."""
+        if self.proxy is None:
+            return None
+        frame = self.proxy.get(frame_num, self._proxy_frame)
+        if frame is not None:
+            self._proxy_frame = frame
+        return frame
+
+    def _allocate_ring(self):
+        """Pré-aloca os buffers do anel com as dimensões declaradas do vídeo."""
+        self._ring = [np.empty((self.height, self.width, 3), dtype=np.uint8) for _ in range(self.prefetch_size)]
+
+    def _start_prefetch(self):
+        """Inicia a thread produtora a partir da posição atual do decodificador."""
+        with self._cond:
+            self._head = 0
+            self._count = 0
+            self._held = None
+            self._eof = False
+            self._running = True
+        self._thread = threading.Thread(target=self._prefetch_loop, args=(self.next_frame,), daemon=True)
+        self._thread.start()
+
+    def _stop_prefetch(self):
+        """Para a thread produtora e descarta os frames ainda não consumidos."""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join()
+        self._thread = None
+
+    def _prefetch_loop(self, frame_num):
+        """Laço da thread produtora: decodifica à frente enquanto houver espaço no anel."""
+        while True:
+            with self._cond:
+                if self._running and self._free_slots() == 0:
+                    self.producer_stalls += 1
+                    while self._running and self._free_slots() == 0:
+                        self._cond.wait()
+                if not self._running:
+                    return
+                slot = (self._head + self._count) % self.prefetch_size
+
+            # A decodificação ocorre fora do lock, direto no buffer pré-alocado
+            ret, frame = self._fetch(frame_num, self._ring[slot])
+
+            with self._cond:
+                if not self._running:
+                    return
+                if not ret:
+                    self._eof = True
+                    self._running = False
+                    self._cond.notify_all()
+                    return
+                # Se as dimensões reais diferirem das declaradas, o OpenCV aloca
+                # um novo array; ele passa a ser o buffer daquela posição.
+                self._ring[slot] = frame
+                self._ring_frame_nums[slot] = frame_num
+                self._count += 1
+                self._cond.notify_all()
+            frame_num += 1
+
+    def _free_slots(self):
+        held = 1 if self._held is not None else 0
+        return self.prefetch_size - self._count - held
+
+    @property
+    def queue_depth(self):
+        """Número de frames decodificados aguardando consumo."""
+        return self._count
+
+    def get_stats(self):
+        """Retorna os contadores do prefetch para diagnosticar o gargalo."""
+        return {
+            "queue_depth": self._count,
+            "prefetch_size": self.prefetch_size,
+            "consumer_stalls": self.consumer_stalls,
+            "producer_stalls": self.producer_stalls,
+        }
 
     def read_sequential(self):
         """
         Lê o próximo frame sequencialmente. Mais rápido para playback.
         Retorna (True, frame) ou (False, None).
         """
-        return self.stream.read()
+        if self._thread is None:
+            # Sem prefetch em andamento (ex.: após uma busca servida pelo proxy)
+            frame = self._read_proxy(self.next_frame)
+            if frame is not None:
+                self.next_frame += 1
+                return True, frame
+            if self.threaded:
+                self._start_prefetch()
+
+        if not self.threaded:
+            ret, frame = self._fetch(self.next_frame)
+            if ret:
+                self.next_frame += 1
+            return ret, frame
+
+        with self._cond:
+            # O frame entregue na chamada anterior pode ser reaproveitado
+            self._held = None
+            self._cond.notify_all()
+            if self._count == 0 and not self._eof:
+                self.consumer_stalls += 1
+                while self._count == 0 and not self._eof:
+                    self._cond.wait()
+            if self._count == 0:
+                return False, None
+            slot = self._head
+            self._head = (self._head + 1) % self.prefetch_size
+            self._count -= 1
+            self._held = slot
+            self.next_frame = self._ring_frame_nums[slot] + 1
+            self._cond.notify_all()
+            return True, self._ring[slot]
+
+    def skip(self, num_frames):
+        """Descarta os próximos frames (usado na reprodução acelerada)."""
+        for _ in range(num_frames):
+            if self.threaded:
+                ret, _ = self.read_sequential()
+            elif self._decoder_pos == self.next_frame:
+                ret = self.stream.grab()
+                if ret:
+                    self.next_frame += 1
+                    self._decoder_pos += 1
+            else:
+                # Decodificador fora de posição: a próxima leitura busca o frame
+                ret = self.next_frame + 1 < self.total_frames
+                if ret:
+                    self.next_frame += 1
+            if not ret:
+                return
 
     def read_at_frame(self, frame_number):
         """
         Pula para um frame específico e o lê. Mais lento, use para saltos.
+        No modo com thread, o anel é esvaziado e reabastecido a partir do frame seguinte.
         Retorna (True, frame) ou (False, None).
         """
         if not 0 <= frame_number < self.total_frames:
             return False, None  # Frame fora do intervalo
-        
+
+        self._stop_prefetch()
+        frame = self._read_proxy(frame_number)
+        if frame is not None:
+            # O prefetch só é retomado se a leitura sequencial sair do proxy
+            self.next_frame = frame_number + 1
+            return True, frame
+
+        ret, frame = self._fetch(frame_number)
+        if ret:
+            self.next_frame = frame_number + 1
+            if frame is self._cached_view:
+                # O anel de replay pode sobrescrever esse buffer depois
+                frame = frame.copy()
+        else:
+            self.next_frame = self._decoder_pos
+        if self.threaded:
+            self._start_prefetch()
+        return ret, frame
+
+    def _fetch(self, frame_num, out=None):
+        """
+        Obtém um frame específico. Se o decodificador já está na posição, apenas
+        decodifica o próximo; caso contrário, tenta o buffer de replay antes de
+        fazer uma busca no arquivo.
+        """
+        self._cached_view = None
+        if self._decoder_pos != frame_num and self.replay_buffer is not None:
+            cached = self.replay_buffer.get(frame_num)
+            if cached is not None:
+                if out is not None and out.shape == cached.shape:
+                    np.copyto(out, cached)
+                    return True, out
+                self._cached_view = cached
+                return True, cached
+
+        if self._decoder_pos != frame_num:
+            ret, frame = self._seek_and_read(frame_num, out)
+        else:
+            ret, frame = self.stream.read(out) if out is not None else self.stream.read()
+
+        if ret:
+            self._decoder_pos = frame_num + 1
+            if self.replay_buffer is not None:
+                self.replay_buffer.put(frame_num, frame)
+            if self.proxy is not None and self.proxy.wants(frame_num):
+                # Completa o proxy com frames decodificados na sessão (ex.: pontos novos)
+                self.proxy.put(frame_num, frame)
+        else:
+            self._decoder_pos = int(self.stream.get(cv2.CAP_PROP_POS_FRAMES))
+        return ret, frame
+
+    def _seek_and_read(self, frame_number, out=None):
+        index = self.frame_index
+        if index is not None and len(index.keyframes) > 0:
+            ret, frame = self._seek_via_keyframe(index, frame_number, out)
+            if ret is not None:
+                return ret, frame
+
         self.stream.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
         current_pos = int(self.stream.get(cv2.CAP_PROP_POS_FRAMES))
-        
+
         # A busca pode não ser precisa, então lemos até chegar lá, se necessário
         if current_pos != frame_number:
             # Se a diferença for grande, a busca falhou de forma mais séria
             if abs(current_pos - frame_number) > 10:
                  print(f"Alerta: Falha ao buscar precisamente o frame {frame_number}. Posição atual: {current_pos}")
                  return False, None
-        
-        return self.stream.read()
+
+        return self.stream.read(out) if out is not None else self.stream.read()
+
+    def _seek_via_keyframe(self, index, frame_number, out=None):
+        """
+        Busca determinística: posiciona no keyframe anterior e decodifica para
+        frente um número conhecido de frames. Retorna (None, None) se o
+        decodificador não parar exatamente no keyframe.
+        """
+        keyframe = index.keyframe_before(frame_number)
+        self.stream.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+        if int(self.stream.get(cv2.CAP_PROP_POS_FRAMES)) != keyframe:
+            return None, None
+        for _ in range(frame_number - keyframe):
+            if not self.stream.grab():
+                return False, None
+        return self.stream.read(out) if out is not None else self.stream.read()
 
     def stop(self):
         """Libera o recurso de vídeo."""
-        self.stream.release()
\ No newline at end of file
+        self._stop_prefetch()
+        if self.proxy_builder is not None:
+            self.proxy_builder.cancel()
+            if self.proxy_builder.is_alive():
+                self.proxy_builder.join()
+        if self.proxy is not None:
+            self.proxy.flush()
+        self.stream.release()
@@ -0,0 +1,220 @@
+import os
+import csv
+import argparse
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+from game_logic import PLAYER_CODES, point_outcomes
+from game_state import DEUCE_BASE, GameState, transition_table
+from score_replay import replay_codes
+from statistics_generator import load_event_arrays
+
+# Taxa de pontos ganhos no saque assumida antes de haver pontos marcados, e
+# quantos pontos essa estimativa "vale" ao ser combinada com os observados
+PRIOR_SERVE_WIN = 0.6
+PRIOR_POINTS = 20
+
+
+def _is_tied(key) -> bool:
+    """Iguais normalizados: o único ponto da tabela onde o placar volta a si mesmo."""
+    return key[0] == key[1] == DEUCE_BASE and not key[9]
+
+
+@lru_cache(maxsize=None)
+def _evaluation_plan():
+    """
+    Ordem de cálculo dos estados (dependências antes) e, para cada um, como
+    obter sua probabilidade. Os iguais normalizados formam o único ciclo da
+    tabela: dois pontos depois o placar sai do ciclo ou volta aos iguais
+    (com o mesmo sacador no game normal, com o outro no tie-break). Esses
+    estados são resolvidos em forma fechada, junto com o parceiro de ciclo.
+    """
+    fsm = transition_table()
+    next_state = fsm.next_state.tolist()
+    keys = fsm.keys
+
+    plans = {}
+    for code, key in enumerate(keys):
+        if key[9]:
+            plans[code] = ("over", 1.0 if key[4] > key[5] else 0.0)
+        elif _is_tied(key):
+            # Caminhos de dois pontos: (w1, intermediário, w2, destino)
+            paths = [(w1, next_state[code][w1], w2, next_state[next_state[code][w1]][w2])
+                     for w1 in (0, 1) for w2 in (0, 1)]
+            returns = {dest for _, _, _, dest in paths if _is_tied(keys[dest])}
+            if len(returns) != 1:
+                raise RuntimeError(f"Ciclo inesperado na tabela de transições: {key}")
+            plans[code] = ("tied", paths, returns.pop())
+        else:
+            plans[code] = ("point", next_state[code][0], next_state[code][1])
+
+    def dependencies(code):
+        plan = plans[code]
+        if plan[0] == "point":
+            return plan[1:]
+        if plan[0] == "tied":
+            partners = {code, plan[2]}
+            return [dest for partner in partners for _, _, _, dest in plans[partner][1] if dest not in partners]
+        return ()
+
+    # Pós-ordem iterativa (a partida pode ter centenas de pontos de profundidade)
+    order, visited = [], set()
+    for root in range(len(keys)):
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [(root, iter(dependencies(root)))]
+        while stack:
+            code, children = stack[-1]
+            for child in children:
+                if child not in visited:
+                    visited.add(child)
+                    stack.append((child, iter(dependencies(child))))
+                    break
+            else:
+                stack.pop()
+                order.append(code)
+    return order, plans
+
+
+@lru_cache(maxsize=32)
+def win_probabilities(serve_win_a: float, serve_win_b: float) -> np.ndarray:
+    """
+    Probabilidade exata de A vencer a partida a partir de cada estado da
+    tabela de transições (índice = GameState.code), com os pontos como cadeia
+    de Markov: cada jogador ganha um ponto no próprio saque com probabilidade
+    fixa. Memoizada por estado; o resultado fica em cache por par de taxas.
+    """
+    fsm = transition_table()
+    servers = fsm.states[:, 6].tolist()
+    # Probabilidade de A ganhar o ponto em cada estado
+    a_wins = [serve_win_a if server == 0 else 1 - serve_win_b for server in servers]
+    order, plans = _evaluation_plan()
+    values = [None] * len(order)
+
+    def two_point_terms(code):
+        """(saída, retorno): probabilidade ponderada de sair do ciclo e de voltar."""
+        exit_value = returning = 0.0
+        for w1, middle, w2, dest in plans[code][1]:
+            p1 = a_wins[code] if w1 == 0 else 1 - a_wins[code]
+            p2 = a_wins[middle] if w2 == 0 else 1 - a_wins[middle]
+            if _is_tied(fsm.keys[dest]):
+                returning += p1 * p2
+            else:
+                exit_value += p1 * p2 * values[dest]
+        return exit_value, returning
+
+    for code in order:
+        if values[code] is not None:
+            continue
+        plan = plans[code]
+        if plan[0] == "over":
+            values[code] = plan[1]
+        elif plan[0] == "point":
+            p = a_wins[code]
+            values[code] = p * values[plan[1]] + (1 - p) * values[plan[2]]
+        else:
+            partner = plan[2]
+            exit_1, return_1 = two_point_terms(code)
+            if partner == code:
+                exit_2, return_2 = 0.0, 1.0
+            else:
+                exit_2, return_2 = two_point_terms(partner)
+            denominator = 1 - return_1 * return_2
+            # Pontos que nunca saem do ciclo (taxas 0/1): sem vencedor definido
+            values[code] = (exit_1 + return_1 * exit_2) / denominator if denominator > 0 else 0.5
+            if partner != code:
+                values[partner] = (exit_2 + return_2 * exit_1) / denominator if denominator > 0 else 0.5
+    result = np.array(values, dtype=np.float64)
+    result.flags.writeable = False
+    return result
+
+
+def serve_win_from_stats(stats: Dict) -> Tuple[float, float]:
+    """
+    Taxa de pontos ganhos no saque de A e de B a partir dos contadores do
+    LiveStats/StatisticsGenerator, combinada com PRIOR_SERVE_WIN (no início
+    da partida há poucos pontos para confiar só nos observados). Arredondada
+    para que a tabela de probabilidades só seja recalculada quando mudar.
+    """
+    rates = []
+    for code in PLAYER_CODES:
+        won, served = stats[code]["points_won_serving"], stats[code]["serves_total"]
+        rates.append(round((won + PRIOR_SERVE_WIN * PRIOR_POINTS) / (served + PRIOR_POINTS), 3))
+    return tuple(rates)
+
+
+class WinProbability:
+    """
+    Probabilidade de vitória de A em qualquer placar, com taxas de saque
+    fixas. A tabela inteira é calculada uma vez; cada consulta é uma leitura.
+    """
+
+    def __init__(self, serve_win: Tuple[float, float]):
+        self.serve_win = tuple(float(rate) for rate in serve_win)
+        self.values = win_probabilities(*self.serve_win)
+
+    def for_state(self, state: GameState) -> float:
+        return float(self.values[state.code])
+
+    def for_snapshot(self, snapshot) -> float:
+        state = GameState.from_fields(
+            snapshot.points, snapshot.games, snapshot.sets, PLAYER_CODES.index(snapshot.server),
+            snapshot.is_tiebreak, snapshot.is_super_tiebreak, snapshot.match_over,
+        )
+        return self.for_state(state)
+
+    def curve(self, winners, initial_server: str = "A") -> np.ndarray:
+        """
+        Curva de probabilidade ao longo da partida: a posição i é a chance de
+        A vencer antes do ponto i, e a última é após o último ponto.
+        """
+        codes, _ = replay_codes(winners, initial_server)
+        return self.values[codes]
+
+
+def export_curve(path: str, initial_server: str = "A", output_path: str = None,
+                 serve_win: Tuple[float, float] = None) -> str:
+    """
+    Salva a curva de probabilidade de vitória de uma partida (CSV ou
+    .tmatch) em '<partida>_win_prob.csv', uma linha por ponto, com a chance
+    de A após o ponto. Sem taxas informadas, usa as da própria partida.
+    """
+    point_ids, codes, offsets = load_event_arrays(path)
+    _, winners = point_outcomes(codes, offsets)
+    if serve_win is None:
+        from match_simulator import ServeModel
+        serve_win = tuple(ServeModel.from_matches([path]).serve_win())
+    model = WinProbability(serve_win)
+    curve = model.curve(winners, initial_server)
+
+    if output_path is None:
+        output_path = os.path.splitext(path.rstrip("/\\"))[0] + "_win_prob.csv"
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["point_id", "winner", "win_prob_A", "win_prob_B"])
+        writer.writerow([0, "", _format_prob(curve[0]), _format_prob(1 - curve[0])])
+        for point_id, winner, prob in zip(point_ids.tolist(), winners.tolist(), curve[1:].tolist()):
+            writer.writerow([point_id, PLAYER_CODES[winner] if winner >= 0 else "",
+                             _format_prob(prob), _format_prob(1 - prob)])
+    return output_path
+
+
+def _format_prob(value: float) -> str:
+    # Mesmo formato numérico dos CSVs da análise (vírgula decimal)
+    return f"{value:.4f}".replace(".", ",")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta a curva de probabilidade de vitória de cada partida.")
+    parser.add_argument("paths", nargs="+", help="Arquivos CSV/.tmatch das partidas.")
+    parser.add_argument("--server", choices=["A", "B"], default="A", help="Jogador que inicia sacando. Padrão: A")
+    parser.add_argument("--serve-win", type=float, nargs=2, metavar=("A", "B"),
+                        help="Pontos ganhos no saque por A e B (padrão: estimados da própria partida).")
+    args = parser.parse_args()
+
+    for match_path in args.paths:
+        output = export_curve(match_path, args.server, serve_win=tuple(args.serve_win) if args.serve_win else None)
+        print(f"{match_path} -> {output}")